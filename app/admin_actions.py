@@ -1,14 +1,21 @@
 from collections import defaultdict
-from typing import Callable
+from typing import Callable, Optional
 from datetime import datetime
 from collections import defaultdict
-from app.data_store import get_users
+from app.data_store import get_users, get_user_by_id, delete_user
 from app.data_store import add_school
-from app.data_store import get_schools
+from app.data_store import get_schools, get_school_by_id, delete_school, update_school
 from app.data_store import get_next_school_id
 from app.system_log import log_event, log_error
-from app.reviews import COMMENTS, RATINGS
+from app.reviews import (
+    COMMENTS,
+    RATINGS,
+    get_comment_by_id,
+    delete_comment_record,
+)
 from app.school_actions import _calculate_average_ratings
+from app.snapshot_view import SnapshotView
+from app.metrics import metrics_snapshot
 from app.validation import (
     validate_school_name,
     validate_school_level,
@@ -59,22 +66,21 @@ def delete_user_by_id(user_id: int, print_func: Callable = print) -> bool:
         bool: True if deletion successful, False otherwise
     """
 
-    users = get_users()
+    user = get_user_by_id(user_id)
 
-    for i, user in enumerate(users):
-        if user.get("user_id") == user_id:
-            if user.get("role") == "admin":
-                log_error(f"Attempt to delete admin account (ID {user_id})")
-                print_func("Error: Admin accounts cannot be deleted.")
-                return False
+    if user is None:
+        print_func("Error: User does not exist.")
+        return False
 
-            deleted_user = users.pop(i)
-            print_func(f"User '{deleted_user['username']}' (ID {user_id}) has been deleted.")
-            log_event(f"User deleted: {deleted_user['username']} (ID {user_id})")
-            return True
+    if user.get("role") == "admin":
+        log_error("Attempt to delete admin account", event = "admin_delete_blocked", user_id = user_id)
+        print_func("Error: Admin accounts cannot be deleted.")
+        return False
 
-    print_func("Error: User does not exist.")
-    return False
+    deleted_user = delete_user(user_id)
+    print_func(f"User '{deleted_user['username']}' (ID {user_id}) has been deleted.")
+    log_event("User deleted", event = "user_deleted", user_id = user_id, username = deleted_user['username'])
+    return True
 
 
 def add_new_school(
@@ -258,13 +264,10 @@ def delete_school_by_id(
                 print_func(f"Error: {error_msg_id}")
                 continue
 
-            # Finds and deletes the school
-            for i, school in enumerate(schools):
-                if school.get("school_id") == school_id:
-                    deleted_school = schools.pop(i)
-                    deleted_any = True
-                    print_func(f"\n(ID {school_id}): '{deleted_school['name']}' has been deleted.")
-                    break
+            # Deletes the school
+            deleted_school = delete_school(school_id)
+            deleted_any = True
+            print_func(f"\n(ID {school_id}): '{deleted_school['name']}' has been deleted.")
 
             break
 
@@ -346,11 +349,7 @@ def update_school_by_id(
                 continue
 
             # Find the school to update
-            school_to_update = None
-            for school in schools:
-                if school.get("school_id") == school_id:
-                    school_to_update = school
-                    break
+            school_to_update = get_school_by_id(school_id)
 
             # Update school name
             while True:
@@ -436,8 +435,9 @@ def update_school_by_id(
                     continue
 
                 # Check for duplicate school (same name and location) excluding current school
-                other_schools = [s for s in schools if s.get("school_id") != school_id]
-                is_unique, err_msg_dupli = check_duplicate_school(other_schools, new_name, new_location)
+                is_unique, err_msg_dupli = check_duplicate_school(
+                    schools, new_name, new_location, exclude_school_id=school_id
+                )
                 if not is_unique:
                     print_func(f"Error: {err_msg_dupli}")
                     continue
@@ -445,9 +445,7 @@ def update_school_by_id(
                 break
 
             # Update the school
-            school_to_update["name"] = new_name
-            school_to_update["level"] = new_level
-            school_to_update["location"] = new_location
+            update_school(school_to_update, new_name, new_level, new_location)
             updated_any = True
 
             print_func(f"\nSchool (ID {school_id}) has been successfully updated.")
@@ -474,43 +472,63 @@ def delete_comment_by_id(
     Admins maintain quality by removing comments.
 
     Inputs:
-        comment_id (int): ID of comment in COMMENTS list (index+1)
+        comment_id (int): the comment's comment_id
         print_func (Callable): for testing
 
     Returns:
         bool: True if deletion successful, False if comment does not exist
     """
 
-    # Comments currently do not store IDs. We simulate ID = index+1.
-    for i, comment in enumerate(COMMENTS):
-        if (i + 1) == comment_id:
-            deleted = COMMENTS.pop(i)
-            print_func(f"Comment #{comment_id} from user {deleted['user_id']} has been deleted.")
-            return True
+    comment = get_comment_by_id(comment_id)
+    if comment is None:
+        print_func("Error: Comment does not exist.")
+        return False
 
-    print_func("Error: Comment does not exist.")
-    return False
+    deleted = delete_comment_record(comment)
+    print_func(f"Comment #{comment_id} from user {deleted.get('user_id')} has been deleted.")
+    return True
 
-def view_system_statistics(print_func=print) -> None:
+def view_system_statistics(print_func=print, snapshot: Optional[SnapshotView] = None) -> None:
     """
-    US35 – Admin views system-wide statistics
+    US35 – Admin views system-wide statistics, followed by the call counts and
+    p50/p95/p99 latencies of the timed actions (see app.metrics)
 
     Inputs:
         print_func (Any): print_func parameter
+        snapshot (Optional[SnapshotView]): count the records of a mapped binary
+            snapshot instead of the loaded stores
 
     Returns:
         None
     """
 
+    if snapshot is not None:
+        counts = [snapshot.count(name) for name in ("users", "schools", "ratings", "comments")]
+    else:
+        counts = [len(get_users()), len(get_schools()), len(RATINGS), len(COMMENTS)]
+
     print_func("\n=== System Statistics ===")
-    print_func(f"Total Users: {len(get_users())}")
-    print_func(f"Total Schools: {len(get_schools())}")
-    print_func(f"Total Ratings: {len(RATINGS)}")
-    print_func(f"Total Comments: {len(COMMENTS)}")
+    print_func(f"Total Users: {counts[0]}")
+    print_func(f"Total Schools: {counts[1]}")
+    print_func(f"Total Ratings: {counts[2]}")
+    print_func(f"Total Comments: {counts[3]}")
+
+    # Calls and latency of each timed action since startup, busiest first
+    actions = metrics_snapshot()
+    if not actions:
+        return
+
+    print_func("\n=== Action Latency (ms) ===")
+    for name, entry in sorted(actions.items(), key = lambda item: (-item[1]["total_ms"], item[0])):
+        print_func(
+            f"{name}: {entry['calls']} calls | p50 {entry['p50_ms']:.3f} | "
+            f"p95 {entry['p95_ms']:.3f} | p99 {entry['p99_ms']:.3f} | max {entry['max_ms']:.3f}"
+        )
 
 def view_top_contributors(
     limit: int = 5,
     print_func: Callable[[str], None] = print,
+    snapshot: Optional[SnapshotView] = None,
 ):
     """
     US37 – View users who contribute the most reviews/comments.
@@ -518,25 +536,29 @@ def view_top_contributors(
     Inputs:
     limit (int): number of users to return
     print_func (Callable[[str], None]): print_func parameter
+    snapshot (Optional[SnapshotView]): read a mapped binary snapshot instead of the loaded stores
     """
 
-    users = get_users()
+    users = snapshot.records("users") if snapshot is not None else get_users()
     if not users:
         print_func("No registered users found.")
         return
 
     # Count contributions per user
-    contribution_count = defaultdict(int)
+    if snapshot is not None:
+        contribution_count = snapshot.contribution_counts()
+    else:
+        contribution_count = defaultdict(int)
 
-    for rating in RATINGS:
-        uid = rating.get("user_id")
-        if uid is not None:
-            contribution_count[uid] += 1
+        for rating in RATINGS:
+            uid = rating.get("user_id")
+            if uid is not None:
+                contribution_count[uid] += 1
 
-    for comment in COMMENTS:
-        uid = comment.get("user_id")
-        if uid is not None:
-            contribution_count[uid] += 1
+        for comment in COMMENTS:
+            uid = comment.get("user_id")
+            if uid is not None:
+                contribution_count[uid] += 1
 
     # Build sortable list
     contributors = []
@@ -561,22 +583,27 @@ def view_top_contributors(
             f"(ID {user.get('user_id')}) - "
             f"Contributions: {score}"
         )
-def get_top_schools_summary(limit: int = 3):
+def get_top_schools_summary(limit: int = 3, snapshot: Optional[SnapshotView] = None):
     """
     Builds a structured summary of top schools per level.
 
     Inputs:
         limit (int): number of users to return
+        snapshot (Optional[SnapshotView]): read a mapped binary snapshot instead of the loaded stores
 
     Returns:
         Dict[str, List[Tuple[school_dict, avg_rating]]]
     """
-    schools = get_schools()
-    averages = _calculate_average_ratings()
+    if snapshot is not None:
+        schools = snapshot.records("schools")
+        averages = snapshot.average_ratings()
+    else:
+        schools = get_schools()
+        averages = _calculate_average_ratings()
     grouped = defaultdict(list)
 
     for school in schools:
-        avg = averages.get(str(school.get("school_id")), 0.0)
+        avg = averages.get(school.get("school_id"), 0.0)
         grouped[school.get("level", "unknown")].append((school, avg))
 
     for level in grouped:
@@ -589,6 +616,7 @@ def export_top_schools_report(
     file_path: str = "top_schools_report.txt",
     limit: int = 3,
     print_func: Callable[[str], None] = print,
+    snapshot: Optional[SnapshotView] = None,
 ) -> bool:
     """
     US13 – Export Top Schools Summary Report
@@ -599,12 +627,13 @@ def export_top_schools_report(
         file_path (str): path to file to write
         limit (int): number of users to return
         print_func (Callable[[str], None]): print_func parameter
+        snapshot (Optional[SnapshotView]): read a mapped binary snapshot instead of the loaded stores
 
     Returns:
         bool: True if export successful, False otherwise
     """
 
-    summary = get_top_schools_summary(limit)
+    summary = get_top_schools_summary(limit, snapshot)
 
     if not summary:
         print_func("No schools available to export.")
@@ -3,7 +3,7 @@ Authentication and registration logic for US21
 """
 
 from typing import Callable, Tuple, Optional, List, Dict
-from .data_store import get_users, add_user
+from .data_store import get_users, add_user, set_user_password, UserStore
 from .validation import validate_username_format, validate_password_format
 from app.system_log import log_event, log_error
 
@@ -12,6 +12,9 @@ def find_user_by_username(users: List[Dict], username: str):
     """
     Find a user by username
 
+    The global user list is looked up through its username index; any other
+    list of users is searched linearly.
+
     Inputs:
         users (List[Dict]): list of users dictionaries
         username (str): the username to search for
@@ -20,6 +23,9 @@ def find_user_by_username(users: List[Dict], username: str):
         Optional[Dict]: The matched user dictionary if found, else None
     """
 
+    if isinstance(users, UserStore):
+        return users.get_by_username(username)
+
     for user in users:
         if user['username'] == username:
             return user
@@ -30,6 +36,9 @@ def get_next_user_id(users: List[Dict]) -> int:
     """
     Gets the next available user ID based on the existing users
 
+    For the global list of users this is read from its ID sequence, so IDs
+    of deleted users are not handed out again.
+
     Inputs:
         users (List[Dict]): list of users dictionaries
 
@@ -37,6 +46,9 @@ def get_next_user_id(users: List[Dict]) -> int:
         int: next available user ID, assigned as max(existing IDs) + 1 or 1 if the list is empty
     """
 
+    if isinstance(users, UserStore):
+        return users.next_id()
+
     if not users:
         return 1
     existing_ids = [u.get("user_id", 0) for u in users]
@@ -142,7 +154,7 @@ def register_user(
     }
 
     add_user(new_user)
-    log_event(f"New user registered: {username} (ID {new_user['user_id']})")
+    log_event("New user registered", event = "user_registered", user_id = new_user['user_id'], username = username)
 
     print_func("Registration Successful: Welcome {}".format(username))
     return True, new_user
@@ -196,13 +208,13 @@ def login_user(
         if password != user.get("password"):
             print_func("\nLogin failed: Incorrect password")
             # Keeps the user in the loop and lets them try again
-            log_error(f"Login failed for username '{username}'")
+            log_error("Login failed", event = "login_failed", user_id = user.get("user_id"), username = username)
             continue
 
         # if log in is successful
         from .data_store import set_current_user
         set_current_user(user)
-        log_event(f"User logged in: {username}")
+        log_event("User logged in", event = "login", user_id = user.get("user_id"), username = username)
         print_func("\nLogin successful, welcome {}".format(username))
         return True, user
 
@@ -265,6 +277,6 @@ def reset_password(
             print_func(f"\nInvalid Password: {msg_pw}")
             continue
 
-        user["password"] = new_password
+        set_user_password(user, new_password)
         print_func("\nPassword reset successful.")
         return True, user
\ No newline at end of file
@@ -0,0 +1,247 @@
+"""
+Background autosave for US29 - Save System Data to File
+
+Without autosave the state is only written when the app exits, and that
+save blocks the menu while the whole snapshot is serialized. The autosave
+scheduler writes snapshots on a worker thread instead:
+- a save is due once `every` changes were made, or once `interval` seconds
+  have passed since the last save with at least one change made since
+- a burst of changes is coalesced into one save; changes made while a save
+  is being written are picked up by the next one
+- the copy of the stores (build_system_snapshot) is taken holding
+  STORE_LOCK, so the copy never sees a change half-way through
+- the size of the journal is taken with the copy, and once the copy is
+  written the journal is cut down to the changes made since; a journal
+  that passes its checkpoint size asks for a save here instead of
+  checkpointing on the menu thread
+
+Every function that changes a store (add_school, set_rating,
+add_comment_record, ...) holds STORE_LOCK only for the change itself, and
+the menu holds nothing while it waits for input, so the only thing an action
+can wait for is the in-memory copy, never the disk. Stopping the scheduler
+waits for the save being written, if any, but does not start another one.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Optional
+
+from app.data_store import STORE_LOCK, add_mutation_listener, remove_mutation_listener
+from app.persistence import capture_system_snapshot, write_system_snapshot, journal_offset_for
+from app.persistence import set_checkpoint_scheduler
+from app.system_log import log_event, log_error
+
+DEFAULT_AUTOSAVE_INTERVAL = 30.0
+DEFAULT_AUTOSAVE_EVERY = 50
+
+# How often a waiting save checks whether the scheduler is being stopped
+LOCK_POLL_SECONDS = 0.1
+
+
+class Autosave:
+    """
+    A worker thread that saves the system state to one snapshot file when a save is due
+    """
+
+    def __init__(
+            self,
+            file_path: str,
+            interval: float = DEFAULT_AUTOSAVE_INTERVAL,
+            every: int = DEFAULT_AUTOSAVE_EVERY,
+    ):
+        self.file_path = file_path
+        self.interval = interval
+        self.every = every
+        self.saves = 0
+        self._pending = 0
+        self._requested = False
+        self._stopping = False
+        self._last_save = time.monotonic()
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target = self._run, name = "autosave", daemon = True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """
+        The number of changes made since the last copy was taken
+        """
+
+        return self._pending
+
+    def record_change(self, *_: Any) -> None:
+        """
+        Counts one change (used as a mutation listener)
+
+        Inputs:
+            collection, action and record of the change (unused)
+
+        Returns:
+            None
+        """
+
+        with self._condition:
+            self._pending += 1
+            # the first change starts the interval, the every-th one makes a save due
+            if self._pending == 1 or self._pending >= self.every:
+                self._condition.notify()
+
+    def request(self) -> None:
+        """
+        Asks for a save as soon as the stores are idle, whatever the thresholds
+
+        Inputs:
+            None
+
+        Returns:
+            None
+        """
+
+        with self._condition:
+            self._requested = True
+            self._condition.notify()
+
+    def request_checkpoint(self, file_path: str) -> bool:
+        """
+        Takes over a journal checkpoint of file_path by asking for a save (used as the checkpoint scheduler)
+
+        Inputs:
+            file_path: path of the snapshot whose journal passed its size threshold
+
+        Returns:
+            bool: True if this scheduler saves to file_path, False otherwise
+        """
+
+        if file_path != self.file_path:
+            return False
+        self.request()
+        return True
+
+    def _seconds_until_due(self) -> Optional[float]:
+        """
+        Returns how long until a save is due (0 if it is due now, None if no change is waiting)
+        """
+
+        if self._requested or self._pending >= self.every:
+            return 0.0
+        if not self._pending:
+            return None
+        return max(0.0, self.interval - (time.monotonic() - self._last_save))
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                wait = self._seconds_until_due()
+                while not self._stopping and wait != 0.0:
+                    self._condition.wait(wait)
+                    wait = self._seconds_until_due()
+                if self._stopping:
+                    return
+
+            self._save()
+
+    def _save(self) -> None:
+        """
+        Copies the stores once they are idle and writes the copy
+        """
+
+        while not STORE_LOCK.acquire(timeout = LOCK_POLL_SECONDS):
+            if self._stopping:
+                return
+
+        try:
+            with self._condition:
+                changes = self._pending
+                self._pending = 0
+                self._requested = False
+            snapshot, versions = capture_system_snapshot()
+            journaled = journal_offset_for(self.file_path)
+        finally:
+            STORE_LOCK.release()
+
+        started = time.perf_counter()
+        try:
+            written = write_system_snapshot(self.file_path, snapshot, versions, journal_offset = journaled)
+        except Exception as error:
+            log_error("Autosave failed", event = "autosave_failed", path = self.file_path, error = str(error))
+            return
+        finally:
+            self._last_save = time.monotonic()
+
+        if written:
+            self.saves += 1
+            elapsed = time.perf_counter() - started
+            log_event(
+                "Autosaved", event = "autosave",
+                path = self.file_path, changes = changes, seconds = round(elapsed, 3),
+            )
+
+    def stop(self) -> None:
+        """
+        Stops the worker, waiting for the save being written (if any) to finish
+
+        Inputs:
+            None
+
+        Returns:
+            None
+        """
+
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join()
+
+
+# The running autosave scheduler (None when autosave is off)
+ACTIVE_AUTOSAVE: Optional[Autosave] = None
+
+
+def start_autosave(
+        file_path: str = "system_data.json",
+        interval: float = DEFAULT_AUTOSAVE_INTERVAL,
+        every: int = DEFAULT_AUTOSAVE_EVERY,
+) -> Autosave:
+    """
+    Starts saving the system state to file_path in the background
+
+    Inputs:
+        file_path: path of the snapshot to save to
+        interval: seconds after which a waiting change is saved
+        every: number of changes after which a save is started right away
+
+    Returns:
+        Autosave: the running scheduler
+    """
+
+    global ACTIVE_AUTOSAVE
+
+    stop_autosave()
+    ACTIVE_AUTOSAVE = Autosave(file_path, interval, every)
+    add_mutation_listener(ACTIVE_AUTOSAVE.record_change)
+    set_checkpoint_scheduler(ACTIVE_AUTOSAVE.request_checkpoint)
+    return ACTIVE_AUTOSAVE
+
+
+def stop_autosave() -> None:
+    """
+    Stops the background autosave, waiting only for a save that is being written
+
+    Inputs:
+        None
+
+    Returns:
+        None
+    """
+
+    global ACTIVE_AUTOSAVE
+
+    if ACTIVE_AUTOSAVE is None:
+        return
+
+    remove_mutation_listener(ACTIVE_AUTOSAVE.record_change)
+    set_checkpoint_scheduler(None)
+    ACTIVE_AUTOSAVE.stop()
+    ACTIVE_AUTOSAVE = None
@@ -0,0 +1,406 @@
+"""
+Binary snapshot format for US29/US30 persistence
+
+A faster-to-load alternative to the JSON snapshot. The file starts with the
+MAGIC bytes, followed by one section per collection:
+
+    u8 name length, name (utf-8), u8 kind, u64 payload length, payload
+
+Payload kinds:
+- KIND_RATINGS: fixed-width rows of (user_id i64, school i64, value i32)
+- KIND_FAVOURITES: fixed-width rows of (user_id i64, school i64, created_at)
+- KIND_COMMENTS: fixed-width rows of (comment_id i64, user_id i64, school i64,
+  created_at, text length u32) each followed by the utf-8 text
+- KIND_RECORDS: length-prefixed JSON records (users, schools, and any
+  collection whose records do not fit the fixed-width layout)
+- KIND_VALUE: a single JSON value (the ID sequences)
+
+Timestamps are stored as (microseconds since the epoch i64, UTC offset in
+seconds i32), so loading them needs no string parsing. School IDs that are
+not integers are kept in a string table in front of the rows and referenced
+by negative numbers. All integers are little-endian.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+MAGIC = b"SEPSNAP\x01"
+BINARY_SUFFIX = ".bin"
+
+KIND_RECORDS = 0
+KIND_VALUE = 1
+KIND_RATINGS = 2
+KIND_FAVOURITES = 3
+KIND_COMMENTS = 4
+
+# File layout, shared with the memory-mapped reader in app.snapshot_view:
+# each section is a SECTION_HEADER (kind, payload size), fixed-width
+# sections are rows of RATING_ROW / FAVOURITE_ROW / COMMENT_ROW, and
+# variable-length parts are prefixed with a LENGTH
+SECTION_HEADER = struct.Struct("<BQ")
+LENGTH = struct.Struct("<I")
+RATING_ROW = struct.Struct("<qqi")
+FAVOURITE_ROW = struct.Struct("<qqqi")
+COMMENT_ROW = struct.Struct("<qqqqiI")
+
+_INT64_MIN = -(2 ** 63)
+_INT64_MAX = 2 ** 63 - 1
+
+# created_at markers: NO_TIME for None, NAIVE_OFFSET for datetimes without a timezone
+NO_TIME = _INT64_MIN
+NAIVE_OFFSET = -(2 ** 31)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo = timezone.utc)
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds = 1)
+
+_RATING_FIELDS = {"user_id", "school_id", "value"}
+_FAVOURITE_FIELDS = {"user_id", "school_id", "created_at"}
+_COMMENT_FIELDS = {"comment_id", "user_id", "school_id", "text", "created_at"}
+
+
+class _DoesNotFit(Exception):
+    """
+    Raised while encoding a fixed-width section for a record it cannot hold
+    """
+
+
+def is_binary_snapshot_path(file_path: str) -> bool:
+    """
+    Tells whether a snapshot path names a binary snapshot (by its suffix)
+
+    Inputs:
+        file_path: path of the snapshot
+
+    Returns:
+        bool: True for binary snapshot paths
+    """
+
+    return file_path.endswith(BINARY_SUFFIX)
+
+
+def _int64(value: Any) -> int:
+    if type(value) is not int or not _INT64_MIN < value <= _INT64_MAX:
+        raise _DoesNotFit()
+    return value
+
+
+def encode_time(created_at: Optional[datetime]) -> Tuple[int, int]:
+    """
+    Encodes a timestamp as (microseconds since the epoch, UTC offset in seconds)
+
+    Inputs:
+        created_at: the timestamp, or None
+
+    Returns:
+        Tuple[int, int]: the encoded timestamp
+    """
+
+    if created_at is None:
+        return NO_TIME, 0
+    if not isinstance(created_at, datetime):
+        raise _DoesNotFit()
+
+    offset = created_at.utcoffset()
+    if offset is None:
+        return (created_at - _EPOCH_NAIVE) // _MICROSECOND, NAIVE_OFFSET
+    if offset % timedelta(seconds = 1):
+        raise _DoesNotFit()
+    return (created_at - _EPOCH) // _MICROSECOND, int(offset.total_seconds())
+
+
+def decode_time(micros: int, offset: int) -> Optional[datetime]:
+    """
+    Decodes a timestamp written by encode_time
+
+    Inputs:
+        micros: microseconds since the epoch (NO_TIME for None)
+        offset: UTC offset in seconds (NAIVE_OFFSET for a naive datetime)
+
+    Returns:
+        Optional[datetime]: the timestamp
+    """
+
+    if micros == NO_TIME:
+        return None
+    if offset == NAIVE_OFFSET:
+        return _EPOCH_NAIVE + micros * _MICROSECOND
+    tz = timezone.utc if offset == 0 else timezone(timedelta(seconds = offset))
+    return (_EPOCH + micros * _MICROSECOND).astimezone(tz)
+
+
+class _SchoolTable:
+    """
+    Maps school IDs to the i64 stored in a row: integers as themselves,
+    strings as -(position in the string table + 1)
+    """
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._refs: Dict[str, int] = {}
+
+    def ref(self, school_id: Any) -> int:
+        if type(school_id) is int and 0 <= school_id <= _INT64_MAX:
+            return school_id
+        if not isinstance(school_id, str):
+            raise _DoesNotFit()
+
+        ref = self._refs.get(school_id)
+        if ref is None:
+            self.strings.append(school_id)
+            ref = self._refs[school_id] = -len(self.strings)
+        return ref
+
+    def encode(self) -> bytes:
+        return _encode_records(self.strings)
+
+
+def _school_id(ref: int, strings: List[str]) -> Any:
+    return ref if ref >= 0 else strings[-ref - 1]
+
+
+def _encode_records(records: Iterable[Any]) -> bytes:
+    """
+    Encodes records as a u32 count followed by length-prefixed JSON
+    """
+
+    parts = []
+    for record in records:
+        data = json.dumps(record, ensure_ascii = False, separators = (",", ":"), default = _encode_json_value).encode("utf-8")
+        parts.append(LENGTH.pack(len(data)))
+        parts.append(data)
+    return LENGTH.pack(len(parts) // 2) + b"".join(parts)
+
+
+def _encode_json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def decode_records(payload: memoryview, pos: int = 0) -> Tuple[List[Any], int]:
+    """
+    Decodes records written by _encode_records starting at pos
+
+    Inputs:
+        payload (memoryview): the section payload
+        pos (int): offset of the record count
+
+    Returns:
+        Tuple[List[Any], int]: the records and the position after them
+    """
+
+    (count,) = LENGTH.unpack_from(payload, pos)
+    pos += LENGTH.size
+    records = []
+    for _ in range(count):
+        (length,) = LENGTH.unpack_from(payload, pos)
+        pos += LENGTH.size
+        records.append(json.loads(bytes(payload[pos:pos + length]).decode("utf-8")))
+        pos += length
+    return records, pos
+
+
+def _encode_ratings(ratings: Iterable[Dict]) -> bytes:
+    schools = _SchoolTable()
+    rows = bytearray()
+    for rating in ratings:
+        if rating.keys() != _RATING_FIELDS:
+            raise _DoesNotFit()
+        value = rating["value"]
+        if type(value) is not int or not -(2 ** 31) <= value < 2 ** 31:
+            raise _DoesNotFit()
+        rows += RATING_ROW.pack(_int64(rating["user_id"]), schools.ref(rating["school_id"]), value)
+    return schools.encode() + rows
+
+
+def _decode_ratings(payload: memoryview) -> Iterator[Dict]:
+    strings, pos = decode_records(payload)
+    for user_id, school, value in RATING_ROW.iter_unpack(payload[pos:]):
+        yield {"user_id": user_id, "school_id": _school_id(school, strings), "value": value}
+
+
+def _encode_favourites(favourites: Iterable[Dict]) -> bytes:
+    schools = _SchoolTable()
+    rows = bytearray()
+    for favourite in favourites:
+        if favourite.keys() != _FAVOURITE_FIELDS:
+            raise _DoesNotFit()
+        micros, offset = encode_time(favourite["created_at"])
+        rows += FAVOURITE_ROW.pack(_int64(favourite["user_id"]), schools.ref(favourite["school_id"]), micros, offset)
+    return schools.encode() + rows
+
+
+def _decode_favourites(payload: memoryview) -> Iterator[Dict]:
+    strings, pos = decode_records(payload)
+    for user_id, school, micros, offset in FAVOURITE_ROW.iter_unpack(payload[pos:]):
+        yield {
+            "user_id": user_id,
+            "school_id": _school_id(school, strings),
+            "created_at": decode_time(micros, offset),
+        }
+
+
+def _encode_comments(comments: Iterable[Dict]) -> bytes:
+    schools = _SchoolTable()
+    rows = bytearray()
+    for comment in comments:
+        if comment.keys() != _COMMENT_FIELDS or not isinstance(comment["text"], str):
+            raise _DoesNotFit()
+        text = comment["text"].encode("utf-8")
+        micros, offset = encode_time(comment["created_at"])
+        rows += COMMENT_ROW.pack(
+            _int64(comment["comment_id"]),
+            _int64(comment["user_id"]),
+            schools.ref(comment["school_id"]),
+            micros,
+            offset,
+            len(text),
+        )
+        rows += text
+    return schools.encode() + rows
+
+
+def _decode_comments(payload: memoryview) -> Iterator[Dict]:
+    strings, pos = decode_records(payload)
+    end = len(payload)
+    unpack_from = COMMENT_ROW.unpack_from
+    row_size = COMMENT_ROW.size
+
+    while pos < end:
+        comment_id, user_id, school, micros, offset, length = unpack_from(payload, pos)
+        pos += row_size
+        text = bytes(payload[pos:pos + length]).decode("utf-8")
+        pos += length
+        yield {
+            "comment_id": comment_id,
+            "user_id": user_id,
+            "school_id": _school_id(school, strings),
+            "text": text,
+            "created_at": decode_time(micros, offset),
+        }
+
+
+_FIXED_WIDTH = {
+    "ratings": (KIND_RATINGS, _encode_ratings),
+    "favourites": (KIND_FAVOURITES, _encode_favourites),
+    "comments": (KIND_COMMENTS, _encode_comments),
+}
+
+_DECODERS = {
+    KIND_RATINGS: _decode_ratings,
+    KIND_FAVOURITES: _decode_favourites,
+    KIND_COMMENTS: _decode_comments,
+}
+
+
+def encode_section(name: str, value: Any) -> Tuple[int, bytes]:
+    """
+    Encodes one snapshot section, using the fixed-width layout where every record fits it
+
+    Inputs:
+        name: name of the section
+        value: the section's records (list-like) or a single value (dict)
+
+    Returns:
+        Tuple[int, bytes]: the payload kind and the payload
+    """
+
+    if isinstance(value, dict):
+        return KIND_VALUE, json.dumps(value).encode("utf-8")
+
+    if name in _FIXED_WIDTH:
+        kind, encode = _FIXED_WIDTH[name]
+        try:
+            return kind, encode(value)
+        except _DoesNotFit:
+            pass
+
+    return KIND_RECORDS, _encode_records(value)
+
+
+def write_binary_snapshot(file: BinaryIO, sections: Iterable[Tuple[str, Any]]) -> None:
+    """
+    Writes snapshot sections to an open binary file
+
+    Inputs:
+        file: file opened for binary writing
+        sections: (name, records or value) pairs with records in their in-memory form
+
+    Returns:
+        None
+    """
+
+    file.write(MAGIC)
+    for name, value in sections:
+        kind, payload = encode_section(name, value)
+        encoded_name = name.encode("utf-8")
+        file.write(bytes([len(encoded_name)]) + encoded_name)
+        file.write(SECTION_HEADER.pack(kind, len(payload)))
+        file.write(payload)
+
+
+def decode_section(kind: int, payload: memoryview) -> Any:
+    """
+    Decodes one section payload
+
+    Inputs:
+        kind: the payload kind
+        payload: the payload bytes
+
+    Returns:
+        Any: an iterator over the section's records, or the decoded value for KIND_VALUE
+
+    Raises:
+        ValueError: If the kind is unknown
+    """
+
+    if kind == KIND_VALUE:
+        return json.loads(bytes(payload).decode("utf-8"))
+    if kind == KIND_RECORDS:
+        return iter(decode_records(payload)[0])
+    if kind in _DECODERS:
+        return _DECODERS[kind](payload)
+    raise ValueError(f"Invalid binary snapshot: unknown section kind {kind}")
+
+
+def _read_exactly(file: BinaryIO, size: int) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError("Invalid binary snapshot: file is truncated")
+    return data
+
+
+def read_binary_sections(file: BinaryIO) -> Iterator[Tuple[str, Any]]:
+    """
+    Yields each (name, value) section of an open binary snapshot in file order
+
+    Record sections are yielded as iterators over in-memory form records
+    (timestamps already datetimes); value sections as their decoded value.
+
+    Inputs:
+        file: file opened for binary reading
+
+    Returns:
+        Iterator[Tuple[str, Any]]: the snapshot sections
+
+    Raises:
+        ValueError: If the file is not a binary snapshot or is truncated
+    """
+
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Invalid binary snapshot: unknown file header")
+
+    while True:
+        name_length = file.read(1)
+        if not name_length:
+            return
+
+        name = _read_exactly(file, name_length[0]).decode("utf-8")
+        kind, length = SECTION_HEADER.unpack(_read_exactly(file, SECTION_HEADER.size))
+        payload = memoryview(_read_exactly(file, length))
+        yield name, decode_section(kind, payload)
@@ -0,0 +1,256 @@
+"""
+Lazily loaded comment text for US30 - Load System Data on Startup
+
+Comment text is most of the in-memory state, but it is only needed when
+comments are displayed or saved. With lazy loading, the text of each loaded
+comment is written to an anonymous temporary file and the comment keeps only
+its metadata (comment_id, user_id, school_id, created_at) plus the offset of
+its text. Reading comment["text"] pages the text back in, through a small
+LRU cache of recently viewed comments.
+
+Comments edited after loading (and new comments) hold their text normally.
+Other sources of comment text can subclass CachedCommentTexts to share
+the cache.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+# Number of recently read comment texts kept in memory
+BODY_CACHE_SIZE = 256
+
+# Texts are written to the file in blocks of about this many bytes
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+
+class CachedCommentTexts(ABC):
+    """
+    A source of comment texts looked up by reference, behind an LRU cache
+    """
+
+    def __init__(self, cache_size: int = BODY_CACHE_SIZE):
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _fetch(self, ref: Any) -> str:
+        """
+        Reads one text from the underlying source (called with the lock held)
+        """
+
+    def read(self, ref: Any) -> str:
+        """
+        Reads a text, from the cache if it was read recently
+
+        Inputs:
+            ref (Any): the reference of the text in its source
+
+        Returns:
+            str: the comment text
+        """
+
+        with self._lock:
+            text = self._cache.get(ref)
+            if text is not None:
+                self._cache.move_to_end(ref)
+                return text
+
+            text = self._fetch(ref)
+
+            self._cache[ref] = text
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last = False)
+            return text
+
+    @property
+    def cached(self) -> int:
+        """
+        The number of texts currently held in the cache
+        """
+
+        return len(self._cache)
+
+
+class CommentBodies(CachedCommentTexts):
+    """
+    An append-only file of comment texts, read back by offset
+    """
+
+    def __init__(self, cache_size: int = BODY_CACHE_SIZE):
+        super().__init__(cache_size)
+        self._file = tempfile.TemporaryFile()
+        self._pending = bytearray()
+        self._end = 0
+
+    def store(self, text: str) -> int:
+        """
+        Appends a text to the file
+
+        Inputs:
+            text (str): the comment text
+
+        Returns:
+            int: a reference to the text (its offset and length packed into one int)
+        """
+
+        data = text.encode("utf-8")
+        with self._lock:
+            ref = (self._end + len(self._pending)) << 32 | len(data)
+            self._pending += data
+            if len(self._pending) >= WRITE_BUFFER_BYTES:
+                self._flush()
+        return ref
+
+    def _flush(self) -> None:
+        """
+        Writes the buffered texts to the end of the file (the lock must be held)
+        """
+
+        self._file.seek(self._end)
+        self._file.write(self._pending)
+        self._end += len(self._pending)
+        self._pending.clear()
+
+    def _fetch(self, ref: int) -> str:
+        if self._pending:
+            self._flush()
+        self._file.seek(ref >> 32)
+        return self._file.read(ref & 0xFFFFFFFF).decode("utf-8")
+
+    def page_out(self, comments: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Moves the text of each comment into the file
+
+        Comments without a string text are passed through unchanged.
+
+        Inputs:
+            comments (Iterable[Dict[str, Any]]): comment records as loaded
+
+        Returns:
+            Iterator[Dict[str, Any]]: the comments, with their text paged out
+        """
+
+        for comment in comments:
+            text = comment.get("text")
+            if not isinstance(text, str) or type(comment) is not dict:
+                yield comment
+                continue
+
+            # built from items() rather than copied, the new dict is sized
+            # for its remaining fields instead of taking over the old table
+            del comment["text"]
+            yield LazyComment(comment.items(), self, self.store(text))
+
+    def close(self) -> None:
+        """
+        Closes (and so deletes) the file
+        """
+
+        self._file.close()
+
+
+class LazyComment(dict):
+    """
+    A comment record whose "text" is read from a CachedCommentTexts source on use
+
+    The text is not stored in the dictionary itself: comment["text"] and
+    comment.get("text") fetch it through __missing__, and keys(), items(),
+    iteration and comparison include it, so dict(comment), json.dumps and
+    the snapshot writers see a complete comment. Assigning comment["text"]
+    (e.g. when the comment is edited) stores the text normally.
+    """
+
+    __slots__ = ("_bodies", "_ref")
+
+    def __init__(self, fields: Iterable[Tuple[Any, Any]], bodies: CachedCommentTexts, ref: Any):
+        super().__init__(fields)
+        self._bodies = bodies
+        self._ref = ref
+
+    def __missing__(self, key: Any) -> Any:
+        if key == "text":
+            return self._bodies.read(self._ref)
+        raise KeyError(key)
+
+    def _is_paged_out(self) -> bool:
+        return not dict.__contains__(self, "text")
+
+    def _key_order(self) -> List[Any]:
+        """
+        Returns the keys in snapshot order, with "text" after "school_id"
+        """
+
+        keys = list(dict.keys(self))
+        if self._is_paged_out():
+            position = keys.index("school_id") + 1 if "school_id" in keys else len(keys)
+            keys.insert(position, "text")
+        return keys
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        if key == "text" and not dict.__contains__(self, "text"):
+            return self._bodies.read(self._ref)
+        return dict.get(self, key, default)
+
+    def __contains__(self, key: Any) -> bool:
+        return key == "text" or dict.__contains__(self, key)
+
+    def __len__(self) -> int:
+        return dict.__len__(self) + (1 if self._is_paged_out() else 0)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._key_order())
+
+    def keys(self):
+        return dict.fromkeys(self._key_order()).keys()
+
+    def materialize(self) -> Dict[str, Any]:
+        """
+        Returns the comment as a plain dictionary with its text
+
+        Inputs:
+            None
+
+        Returns:
+            Dict[str, Any]: the complete comment record
+        """
+
+        return {key: self[key] for key in self._key_order()}
+
+    def items(self):
+        return self.materialize().items()
+
+    def values(self):
+        return self.materialize().values()
+
+    def copy(self) -> Dict[str, Any]:
+        return self.materialize()
+
+    def shallow_copy(self) -> "LazyComment":
+        """
+        Returns a copy of the comment that shares its paged-out text instead of reading it
+
+        Inputs:
+            None
+
+        Returns:
+            LazyComment: the copy
+        """
+
+        return LazyComment(dict.items(self), self._bodies, self._ref)
+
+    def __eq__(self, other: Any) -> bool:
+        return self.materialize() == other
+
+    def __ne__(self, other: Any) -> bool:
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.materialize())
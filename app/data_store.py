@@ -2,10 +2,579 @@
 Simple in-memory data store for US21,US1
 """
 
-from typing import List, Dict
+import threading
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Callable, Iterable, List, Dict, Optional, Tuple
 
-USERS: List[Dict] = []
-SCHOOLS: List[Dict] = []
+
+class IndexedList(list):
+    """
+    A list of record dictionaries that keeps lookup indexes in step with the list
+
+    Every mutating list method is routed through the _index/_unindex hooks, so
+    code (and tests) that append to or clear the global lists directly still
+    leave the indexes consistent. Subclasses override the hooks to maintain
+    whichever dictionaries they need.
+
+    Every change also advances the list's version counter, so a saved
+    snapshot can tell whether the list changed since it was written.
+    """
+
+    _order_field: Optional[str] = None
+
+    def __init__(self, records: Iterable[Dict] = ()):
+        super().__init__()
+        self._last_id = 0
+        self._version = 0
+        self._reset_indexes()
+        self.extend(records)
+
+    def _index(self, record: Dict) -> None:
+        """
+        Adds a single record to the indexes (overridden by subclasses)
+        """
+
+    def _unindex(self, record: Dict) -> None:
+        """
+        Removes a single record from the indexes (overridden by subclasses)
+        """
+
+    def _reset_indexes(self) -> None:
+        """
+        Empties all indexes (overridden by subclasses)
+        """
+
+    def _on_reorder(self) -> None:
+        """
+        Called after an operation that may move existing records to other
+        positions (overridden by subclasses that track positions)
+        """
+
+    def _observe_id(self, record_id: Any) -> None:
+        """
+        Advances the ID sequence past an ID seen on a stored record
+        """
+
+        if isinstance(record_id, int) and not isinstance(record_id, bool):
+            self._last_id = max(self._last_id, record_id)
+
+    def next_id(self) -> int:
+        """
+        Returns the next ID in the list's sequence without consuming it
+
+        The sequence only moves forward: IDs of deleted records are not reused
+        until the list is cleared.
+
+        Inputs:
+            None
+
+        Returns:
+            int: the next available ID
+        """
+
+        return self._last_id + 1
+
+    @property
+    def last_id(self) -> int:
+        """
+        The highest ID handed out by the sequence so far
+        """
+
+        return self._last_id
+
+    def restore_sequence(self, last_id: Any) -> None:
+        """
+        Restores the ID sequence saved in a snapshot
+
+        The sequence never moves below the highest ID already in the list.
+
+        Inputs:
+            last_id (Any): the saved last ID; ignored if it is not an integer
+
+        Returns:
+            None
+        """
+
+        self._observe_id(last_id)
+
+    @property
+    def version(self) -> int:
+        """
+        A counter that moves forward on every change to the list or its records
+        """
+
+        return self._version
+
+    def mark_changed(self) -> None:
+        """
+        Advances the version counter (for changes made to a record in place)
+
+        Inputs:
+            None
+
+        Returns:
+            None
+        """
+
+        self._version += 1
+
+    def rebuild_indexes(self) -> None:
+        """
+        Rebuilds every index from the current contents of the list
+
+        Inputs:
+            None
+
+        Returns:
+            None
+        """
+
+        self._reset_indexes()
+        for record in self:
+            self._index(record)
+
+    def replace_all(self, records: Iterable[Dict]) -> None:
+        """
+        Replaces the whole contents of the list in one pass and rebuilds the indexes
+
+        Inputs:
+            records (Iterable[Dict]): the records that should make up the list
+
+        Returns:
+            None
+        """
+
+        super().clear()
+        super().extend(records)
+        self.rebuild_indexes()
+        self._on_reorder()
+        self._version += 1
+
+    def update_record(self, record: Dict, fields: Dict) -> None:
+        """
+        Changes fields of a stored record and re-indexes it
+
+        Inputs:
+            record (Dict): the stored record to change
+            fields (Dict): the fields to set
+
+        Returns:
+            None
+        """
+
+        self._unindex(record)
+        record.update(fields)
+        self._index(record)
+        self._version += 1
+
+    def append(self, record: Dict) -> None:
+        super().append(record)
+        self._index(record)
+        self._version += 1
+
+    def extend(self, records: Iterable[Dict]) -> None:
+        for record in records:
+            self.append(record)
+
+    def __iadd__(self, records: Iterable[Dict]):
+        self.extend(records)
+        return self
+
+    def insert(self, position: int, record: Dict) -> None:
+        super().insert(position, record)
+        self._index(record)
+        self._on_reorder()
+        self._version += 1
+
+    def pop(self, position: int = -1) -> Dict:
+        record = super().pop(position)
+        self._unindex(record)
+        self._on_reorder()
+        self._version += 1
+        return record
+
+    def remove(self, record: Dict) -> None:
+        super().remove(record)
+        self._unindex(record)
+        self._on_reorder()
+        self._version += 1
+
+    def clear(self) -> None:
+        super().clear()
+        self._reset_indexes()
+        self._on_reorder()
+        self._version += 1
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._on_reorder()
+        self._version += 1
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._on_reorder()
+        self._version += 1
+
+    def __delitem__(self, position) -> None:
+        removed = self[position]
+        super().__delitem__(position)
+        for record in (removed if isinstance(position, slice) else [removed]):
+            self._unindex(record)
+        self._on_reorder()
+        self._version += 1
+
+    def __setitem__(self, position, value) -> None:
+        removed = self[position]
+        super().__setitem__(position, value)
+        for record in (removed if isinstance(position, slice) else [removed]):
+            self._unindex(record)
+        for record in (self[position] if isinstance(position, slice) else [value]):
+            self._index(record)
+        self._on_reorder()
+        self._version += 1
+
+    def discard(self, record: Dict) -> bool:
+        """
+        Removes one specific record (matched by identity) from the list
+
+        Inputs:
+            record (Dict): the record to remove
+
+        Returns:
+            bool: True if the record was found and removed, False otherwise
+        """
+
+        position = self._position_of(record)
+        if position is None:
+            return False
+
+        del self[position]
+        return True
+
+    def contains(self, record: Dict) -> bool:
+        """
+        Checks whether one specific record (matched by identity) is in the list
+
+        Inputs:
+            record (Dict): the record to look for
+
+        Returns:
+            bool: True if the record is stored, False otherwise
+        """
+
+        return self._position_of(record) is not None
+
+    def _position_of(self, record: Dict) -> Optional[int]:
+        """
+        Finds the list position of a record
+
+        Records are normally appended in ascending ID order, so a binary search
+        on the ID field finds the position without a scan. The identity check
+        guards against lists that were built out of order, which fall back to
+        a linear scan.
+        """
+
+        field = self._order_field
+        if field is not None:
+            try:
+                position = bisect_left(self, record.get(field), key=lambda r: r.get(field))
+            except TypeError:
+                position = None
+
+            if position is not None and position < len(self) and self[position] is record:
+                return position
+
+        for i, existing in enumerate(self):
+            if existing is record:
+                return i
+        return None
+
+
+class UnorderedIndexedList(IndexedList):
+    """
+    An IndexedList whose records are only ever found through its indexes
+
+    Because list order carries no meaning, discard() removes a record in O(1)
+    by moving the last record into the freed slot. Record positions are
+    tracked by identity and rebuilt lazily after any operation that may move
+    records around.
+    """
+
+    def __init__(self, records: Iterable[Dict] = ()):
+        self._positions: Optional[Dict[int, int]] = None
+        super().__init__(records)
+
+    def append(self, record: Dict) -> None:
+        super().append(record)
+        if self._positions is not None:
+            self._positions[id(record)] = len(self) - 1
+
+    def _on_reorder(self) -> None:
+        self._positions = None
+
+    def _position_of(self, record: Dict) -> Optional[int]:
+        if self._positions is None:
+            self._positions = {id(existing): i for i, existing in enumerate(self)}
+        position = self._positions.get(id(record))
+        if position is None or position >= len(self) or self[position] is not record:
+            return None
+        return position
+
+    def discard(self, record: Dict) -> bool:
+        position = self._position_of(record)
+        if position is None:
+            return False
+
+        last = list.pop(self)
+        if last is not record:
+            list.__setitem__(self, position, last)
+            self._positions[id(last)] = position
+        del self._positions[id(record)]
+        self._unindex(record)
+        self._version += 1
+        return True
+
+
+class ChangeNotSavedError(Exception):
+    """
+    Raised by a mutation listener to refuse a change it could not save; the
+    store is left as it was
+    """
+
+
+MUTATION_LISTENERS: List[Callable[[str, str, Dict], None]] = []
+
+
+def add_mutation_listener(listener: Callable[[str, str, Dict], None]) -> None:
+    """
+    Registers a function to be called before every change made through the
+    data store and review functions (e.g. to journal it to disk); if a
+    listener raises, the change is not made
+
+    Inputs:
+        listener (Callable[[str, str, Dict], None]): called with the collection
+            name, the action ("put" or "delete") and the affected record
+
+    Returns:
+        None
+    """
+
+    if listener not in MUTATION_LISTENERS:
+        MUTATION_LISTENERS.append(listener)
+
+
+def remove_mutation_listener(listener: Callable[[str, str, Dict], None]) -> None:
+    """
+    Unregisters a function added with add_mutation_listener
+
+    Inputs:
+        listener (Callable[[str, str, Dict], None]): the listener to remove
+
+    Returns:
+        None
+    """
+
+    if listener in MUTATION_LISTENERS:
+        MUTATION_LISTENERS.remove(listener)
+
+
+def notify_mutation(collection: str, action: str, record: Dict) -> None:
+    """
+    Tells every mutation listener that a record is about to be stored or removed
+
+    Inputs:
+        collection (str): "users", "schools", "ratings", "comments" or "favourites"
+        action (str): "put" for a new or changed record, "delete" for a removed one
+        record (Dict): the affected record, as it will be stored
+
+    Returns:
+        None
+    """
+
+    for listener in tuple(MUTATION_LISTENERS):
+        listener(collection, action, record)
+
+
+# Held while a store is changed and its listeners are told, so another thread
+# (e.g. the background autosave copying the stores) never sees a change half-way
+STORE_LOCK = threading.RLock()
+
+
+def store_write(func: Callable) -> Callable:
+    """
+    Decorator for functions that change a store and notify the mutation
+    listeners: the whole call runs holding STORE_LOCK
+
+    Inputs:
+        func (Callable): the function that changes a store
+
+    Returns:
+        Callable: the wrapped function
+    """
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with STORE_LOCK:
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+class UserStore(IndexedList):
+    """
+    The global list of users, indexed by user_id and by exact username
+    """
+
+    _order_field = "user_id"
+
+    def _reset_indexes(self) -> None:
+        self._by_id: Dict[Any, Dict] = {}
+        self._by_username: Dict[str, Dict] = {}
+        self._last_id = 0
+        # keys that were added more than once directly to the list
+        self._shadowed_ids = set()
+        self._shadowed_usernames = set()
+
+    def _index(self, record: Dict) -> None:
+        user_id = record.get("user_id")
+        self._observe_id(user_id)
+        if user_id in self._by_id:
+            self._shadowed_ids.add(user_id)
+        else:
+            self._by_id[user_id] = record
+
+        username = record.get("username")
+        if username in self._by_username:
+            self._shadowed_usernames.add(username)
+        else:
+            self._by_username[username] = record
+
+    def _unindex(self, record: Dict) -> None:
+        user_id = record.get("user_id")
+        if self._by_id.get(user_id) is record:
+            del self._by_id[user_id]
+            if user_id in self._shadowed_ids:
+                for other in self:
+                    if other.get("user_id") == user_id:
+                        self._by_id[user_id] = other
+                        break
+
+        username = record.get("username")
+        if self._by_username.get(username) is record:
+            del self._by_username[username]
+            if username in self._shadowed_usernames:
+                for other in self:
+                    if other.get("username") == username:
+                        self._by_username[username] = other
+                        break
+
+    def get_by_id(self, user_id: int) -> Optional[Dict]:
+        return self._by_id.get(user_id)
+
+    def get_by_username(self, username: str) -> Optional[Dict]:
+        # an exact match, like the linear search over a plain list of users
+        return self._by_username.get(username)
+
+
+def school_name_location_key(name: str, location: str) -> Tuple[str, str]:
+    """
+    Normalizes a school's name and location into the key used for duplicate detection
+
+    Inputs:
+        name (str): the school name
+        location (str): the school location
+
+    Returns:
+        Tuple[str, str]: the stripped, lower-cased name and location
+    """
+
+    return (name or "").strip().lower(), (location or "").strip().lower()
+
+
+class SchoolStore(IndexedList):
+    """
+    The global list of schools, indexed by school_id and by normalized
+    (name, location) for duplicate detection
+    """
+
+    _order_field = "school_id"
+
+    def _reset_indexes(self) -> None:
+        self._by_id: Dict[Any, Dict] = {}
+        self._name_locations: Dict[Tuple[str, str], int] = {}
+        self._last_id = 0
+        # IDs that were added more than once directly to the list
+        self._shadowed_ids = set()
+
+    @staticmethod
+    def _name_location_of(record: Dict) -> Tuple[str, str]:
+        return school_name_location_key(record.get("name", ""), record.get("location", ""))
+
+    def _index(self, record: Dict) -> None:
+        school_id = record.get("school_id")
+        self._observe_id(school_id)
+        if school_id in self._by_id:
+            self._shadowed_ids.add(school_id)
+        else:
+            self._by_id[school_id] = record
+
+        key = self._name_location_of(record)
+        self._name_locations[key] = self._name_locations.get(key, 0) + 1
+
+    def _unindex(self, record: Dict) -> None:
+        key = self._name_location_of(record)
+        if self._name_locations.get(key, 0) <= 1:
+            self._name_locations.pop(key, None)
+        else:
+            self._name_locations[key] -= 1
+
+        school_id = record.get("school_id")
+        if self._by_id.get(school_id) is record:
+            del self._by_id[school_id]
+            if school_id in self._shadowed_ids:
+                for other in self:
+                    if other.get("school_id") == school_id:
+                        self._by_id[school_id] = other
+                        break
+
+    def get_by_id(self, school_id: Any) -> Optional[Dict]:
+        return self._by_id.get(school_id)
+
+    def has_name_location(self, name: str, location: str, exclude: Optional[Dict] = None) -> bool:
+        key = school_name_location_key(name, location)
+        count = self._name_locations.get(key, 0)
+        if exclude is not None and self._name_location_of(exclude) == key:
+            count -= 1
+        return count > 0
+
+    def update_fields(self, record: Dict, **fields: Any) -> None:
+        """
+        Changes fields of a stored school and keeps the (name, location) index current
+
+        Inputs:
+            record (Dict): the school dictionary to change
+            **fields (Any): the fields to set
+
+        Returns:
+            None
+        """
+
+        key = self._name_location_of(record)
+        if self._name_locations.get(key, 0) <= 1:
+            self._name_locations.pop(key, None)
+        else:
+            self._name_locations[key] -= 1
+
+        record.update(fields)
+
+        key = self._name_location_of(record)
+        self._name_locations[key] = self._name_locations.get(key, 0) + 1
+        self.mark_changed()
+
+
+USERS: UserStore = UserStore()
+SCHOOLS: SchoolStore = SchoolStore()
 
 def get_users() -> List[Dict]:
     """
@@ -18,6 +587,7 @@ def get_users() -> List[Dict]:
     return USERS
 
 
+@store_write
 def add_user(user: Dict) -> None:
     """
     Adds a user to the global list of users
@@ -34,9 +604,91 @@ def add_user(user: Dict) -> None:
         None
     """
 
+    notify_mutation("users", "put", user)
     USERS.append(user)
 
 
+def get_user_by_id(user_id: int) -> Optional[Dict]:
+    """
+    Looks up a user by their ID using the user_id index
+
+    Inputs:
+        user_id (int): the ID of the user to look up
+
+    Returns:
+        Optional[Dict]: the user dictionary if found, else None
+    """
+
+    return USERS.get_by_id(user_id)
+
+
+def get_user_by_username(username: str) -> Optional[Dict]:
+    """
+    Looks up a user by their username using the username index
+
+    Inputs:
+        username (str): the username to look up
+
+    Returns:
+        Optional[Dict]: the user dictionary if found, else None
+    """
+
+    return USERS.get_by_username(username)
+
+
+@store_write
+def delete_user(user_id: int) -> Optional[Dict]:
+    """
+    Removes a user from the global list of users and from its indexes
+
+    Inputs:
+        user_id (int): the ID of the user to remove
+
+    Returns:
+        Optional[Dict]: the removed user dictionary, or None if no user has that ID
+    """
+
+    user = USERS.get_by_id(user_id)
+    if user is None:
+        return None
+
+    notify_mutation("users", "delete", user)
+    USERS.discard(user)
+    return user
+
+
+@store_write
+def set_user_password(user: Dict, new_password: str) -> None:
+    """
+    Updates the password of a stored user
+
+    Inputs:
+        user (Dict): the user dictionary to update
+        new_password (str): the new password
+
+    Returns:
+        None
+    """
+
+    notify_mutation("users", "put", {**user, "password": new_password})
+    user["password"] = new_password
+    USERS.mark_changed()
+
+
+def load_users(users: Iterable[Dict]) -> None:
+    """
+    Replaces all users (e.g. from a saved snapshot) and rebuilds the user indexes
+
+    Inputs:
+        users (Iterable[Dict]): the user dictionaries to load
+
+    Returns:
+        None
+    """
+
+    USERS.replace_all(users)
+
+
 def example_users() -> None:
     """
     TEMPORARY FUNCTION: This functions adds examples users into memory for development/testing purposes
@@ -128,6 +780,7 @@ def get_schools() -> List[Dict]:
     return SCHOOLS
 
 
+@store_write
 def add_school(school: Dict) -> None:
     """
     Adds a school to the global list of schools
@@ -145,13 +798,141 @@ def add_school(school: Dict) -> None:
         None
     """
 
+    notify_mutation("schools", "put", school)
     SCHOOLS.append(school)
 
 
+def normalize_school_id(school_id: Any) -> Any:
+    """
+    Converts a school ID into the canonical form used as a key across the stores
+
+    School IDs typed in by users arrive as strings, so a purely numeric string
+    ("7", " 007 ") becomes the integer ID of the school. Any other string is
+    kept as-is apart from surrounding whitespace, and non-string values are
+    returned unchanged.
+
+    Inputs:
+        school_id (Any): the school ID to normalize
+
+    Returns:
+        Any: the integer school ID for numeric input, otherwise the given value
+    """
+
+    if isinstance(school_id, str):
+        stripped = school_id.strip()
+        if stripped.isascii() and stripped.isdigit():
+            return int(stripped)
+        return stripped
+    return school_id
+
+
+def get_school_by_id(school_id: Any) -> Optional[Dict]:
+    """
+    Looks up a school by its ID using the school_id index
+
+    The ID is normalized first, so a numeric string is matched against the
+    integer ID of the school.
+
+    Inputs:
+        school_id (Any): the ID of the school to look up
+
+    Returns:
+        Optional[Dict]: the school dictionary if found, else None
+    """
+
+    school = SCHOOLS.get_by_id(normalize_school_id(school_id))
+    if school is not None:
+        return school
+
+    # schools added with a string ID before IDs were normalized
+    school = SCHOOLS.get_by_id(school_id)
+    if school is None and isinstance(school_id, int):
+        school = SCHOOLS.get_by_id(str(school_id))
+    return school
+
+
+def get_school_names(school_ids: Iterable[Any]) -> Dict[Any, str]:
+    """
+    Resolves the names of several schools in one batch through the school_id index
+
+    Inputs:
+        school_ids (Iterable[Any]): the school IDs to resolve
+
+    Returns:
+        Dict[Any, str]: mapping of each given school ID to its school name; IDs
+        that do not match a school are left out
+    """
+
+    names = {}
+    for school_id in school_ids:
+        school = get_school_by_id(school_id)
+        if school is not None:
+            names[school_id] = school.get("name")
+    return names
+
+
+@store_write
+def delete_school(school_id: int) -> Optional[Dict]:
+    """
+    Removes a school from the global list of schools and from its index
+
+    Inputs:
+        school_id (int): the ID of the school to remove
+
+    Returns:
+        Optional[Dict]: the removed school dictionary, or None if no school has that ID
+    """
+
+    school = SCHOOLS.get_by_id(school_id)
+    if school is None:
+        return None
+
+    notify_mutation("schools", "delete", school)
+    SCHOOLS.discard(school)
+    return school
+
+
+@store_write
+def update_school(school: Dict, name: str, level: str, location: str) -> Dict:
+    """
+    Updates the details of a stored school
+
+    Inputs:
+        school (Dict): the school dictionary to update
+        name (str): the new school name
+        level (str): the new school level
+        location (str): the new school location
+
+    Returns:
+        Dict: the updated school dictionary
+    """
+
+    notify_mutation("schools", "put", {**school, "name": name, "level": level, "location": location})
+    SCHOOLS.update_fields(school, name=name, level=level, location=location)
+    return school
+
+
+def load_schools(schools: Iterable[Dict]) -> None:
+    """
+    Replaces all schools (e.g. from a saved snapshot) and rebuilds the school index
+
+    Inputs:
+        schools (Iterable[Dict]): the school dictionaries to load
+
+    Returns:
+        None
+    """
+
+    SCHOOLS.replace_all(schools)
+
+
 def get_next_school_id(schools: List[Dict]) -> int:
     """
     Gets the next available school ID based on the existing schools
 
+    For the global list of schools this is read from its ID sequence, so IDs
+    of deleted schools are not handed out again.
+
     Inputs:
         schools (List[Dict]): list of school dictionaries
 
@@ -159,6 +940,9 @@ def get_next_school_id(schools: List[Dict]) -> int:
         int: next available school ID, 1 if the list is empty
     """
 
+    if isinstance(schools, SchoolStore):
+        return schools.next_id()
+
     if not schools:
         return 1
     active_ids = [s.get("school_id", 0) for s in schools]
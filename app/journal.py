@@ -0,0 +1,347 @@
+"""
+Append-only mutation journal for US29/US30 persistence
+
+Instead of rewriting the whole snapshot after every change, each change is
+appended to a journal file next to the snapshot, before it is made, as one
+compact JSON line:
+
+    {"c": "ratings", "op": "put", "r": {"user_id": 1, "school_id": 7, "value": 4}}
+
+"put" lines carry the full new or changed record, "delete" lines only the
+fields that identify the removed record. Replaying the journal over the last
+full snapshot restores the latest state; a checkpoint writes a new snapshot
+and empties the journal. A background save (see app.autosave) instead drops
+only the part of the journal its copy of the stores already holds.
+
+Each line is flushed to the operating system as soon as it is written, so a
+killed process loses nothing. Forcing the data onto the disk (fsync) is done
+in groups: once every sync_every changes, or when sync_interval seconds have
+passed since the last fsync, whichever comes first.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator
+
+JOURNAL_SUFFIX = ".journal"
+
+# Once the journal grows past this many bytes it is folded into a new snapshot
+DEFAULT_CHECKPOINT_BYTES = 4 * 1024 * 1024
+
+# Group commit defaults: fsync after every change unless configured otherwise
+DEFAULT_SYNC_EVERY = 1
+DEFAULT_SYNC_INTERVAL = 1.0
+
+# Fields that identify a record of each collection
+KEY_FIELDS = {
+    "users": ("user_id",),
+    "schools": ("school_id",),
+    "ratings": ("user_id", "school_id"),
+    "comments": ("comment_id",),
+    "favourites": ("user_id", "school_id"),
+}
+
+
+def journal_path_for(snapshot_path: str) -> str:
+    """
+    Returns the path of the journal that belongs to a snapshot file
+
+    Inputs:
+        snapshot_path: path of the JSON snapshot
+
+    Returns:
+        str: path of the journal file
+    """
+
+    return f"{snapshot_path}{JOURNAL_SUFFIX}"
+
+
+def _encode_value(value: Any) -> Any:
+    """
+    JSON fallback encoder for values json cannot write natively (timestamps)
+    """
+
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def build_entry(collection: str, action: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Builds the journal entry for one change
+
+    Inputs:
+        collection: name of the changed collection
+        action: "put" or "delete"
+        record: the affected record
+
+    Returns:
+        Dict[str, Any]: the journal entry
+    """
+
+    if action == "delete":
+        record = {field: record.get(field) for field in KEY_FIELDS[collection]}
+    return {"c": collection, "op": action, "r": record}
+
+
+class Journal:
+    """
+    An open journal file that changes are appended to
+    """
+
+    def __init__(
+            self,
+            path: str,
+            sync_every: int = DEFAULT_SYNC_EVERY,
+            sync_interval: float = DEFAULT_SYNC_INTERVAL,
+    ):
+        parent_dir = os.path.dirname(path)
+        if parent_dir:
+            os.makedirs(parent_dir, exist_ok = True)
+
+        drop_torn_tail(path)
+
+        self.path = path
+        self.sync_every = max(1, sync_every)
+        self.sync_interval = sync_interval
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._file = open(path, "a", encoding = "utf-8")
+
+        # changes are appended by the menu thread while an autosave may be
+        # dropping the start of the journal
+        self._lock = threading.Lock()
+
+    def append(self, collection: str, action: str, record: Dict[str, Any]) -> None:
+        """
+        Writes one change to the end of the journal
+
+        Inputs:
+            collection: name of the changed collection
+            action: "put" or "delete"
+            record: the affected record
+
+        Returns:
+            None
+        """
+
+        entry = build_entry(collection, action, record)
+        line = json.dumps(entry, separators = (",", ":"), ensure_ascii = False, default = _encode_value)
+        with self._lock:
+            start = self._file.tell()
+            try:
+                self._file.write(line + "\n")
+                self._file.flush()
+                self._unsynced += 1
+
+                if (
+                    self._unsynced >= self.sync_every
+                    or time.monotonic() - self._last_sync >= self.sync_interval
+                ):
+                    self._sync()
+            except Exception:
+                self._cut_back(start)
+                raise
+
+    def _cut_back(self, offset: int) -> None:
+        """
+        Drops whatever part of a failed append reached the file, so the
+        journal ends at offset again (the journal lock must be held)
+        """
+
+        try:
+            self._file.close()
+        except OSError:
+            # the unwritten rest of the line is dropped with the buffer
+            pass
+
+        try:
+            os.truncate(self.path, offset)
+        finally:
+            self._file = open(self.path, "a", encoding = "utf-8")
+
+    def sync(self) -> None:
+        """
+        Forces every change written so far onto the disk
+
+        Inputs:
+            None
+
+        Returns:
+            None
+        """
+
+        with self._lock:
+            self._sync()
+
+    def _sync(self) -> None:
+        """
+        sync, for callers that already hold the journal lock
+        """
+
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @property
+    def unsynced(self) -> int:
+        """
+        The number of changes written since the last fsync
+        """
+
+        return self._unsynced
+
+    @property
+    def size(self) -> int:
+        """
+        The current size of the journal in bytes
+        """
+
+        with self._lock:
+            return self._file.tell()
+
+    def truncate(self) -> None:
+        """
+        Empties the journal (after its changes were written to a snapshot)
+
+        Inputs:
+            None
+
+        Returns:
+            None
+        """
+
+        with self._lock:
+            self._file.seek(0)
+            self._file.truncate()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def discard_before(self, offset: int) -> None:
+        """
+        Drops the first offset bytes of the journal (the changes a snapshot
+        copied at that size already holds), keeping the changes appended since
+
+        The kept changes are copied to a new file that then replaces the
+        journal, so a crash part-way leaves either journal whole. The copy is
+        made without holding the journal, which is only held to copy the
+        changes appended meanwhile and swap the files.
+
+        Inputs:
+            offset: journal size when the snapshot was copied
+
+        Returns:
+            None
+        """
+
+        temp_path = f"{self.path}.tmp"
+        with open(self.path, "rb") as journal, open(temp_path, "wb") as kept:
+            journal.seek(offset)
+            kept.write(journal.read())
+            kept.flush()
+            os.fsync(kept.fileno())
+            copied_to = journal.tell()
+
+        with self._lock:
+            if self._file.tell() < copied_to:
+                # emptied by a full save meanwhile, which holds these changes too
+                os.remove(temp_path)
+                return
+
+            # both files are closed before the swap, which Windows requires
+            with open(self.path, "rb") as journal, open(temp_path, "ab") as kept:
+                journal.seek(copied_to)
+                appended = journal.read()
+                if appended:
+                    kept.write(appended)
+                    kept.flush()
+                    os.fsync(kept.fileno())
+
+            self._file.close()
+            try:
+                os.replace(temp_path, self.path)
+            finally:
+                self._file = open(self.path, "a", encoding = "utf-8")
+            self._unsynced = 0
+
+    def close(self) -> None:
+        """
+        Closes the journal file
+
+        Inputs:
+            None
+
+        Returns:
+            None
+        """
+
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+
+def drop_torn_tail(path: str) -> None:
+    """
+    Cuts off a last line that was only partly written when the process died,
+    so that new changes are not appended onto the broken line
+
+    Inputs:
+        path: path of the journal file
+
+    Returns:
+        None
+    """
+
+    if not os.path.exists(path):
+        return
+
+    with open(path, "rb+") as file:
+        end = file.seek(0, os.SEEK_END)
+        position = end
+
+        while position > 0:
+            start = max(0, position - 65536)
+            file.seek(start)
+            chunk = file.read(position - start)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+
+        if position != end:
+            file.truncate(position)
+
+
+def read_journal(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Reads the entries of a journal file in the order they were written
+
+    A last line that was only partly written (e.g. the process was killed
+    mid-write) is skipped, since that change was never completed.
+
+    Inputs:
+        path: path of the journal file
+
+    Returns:
+        Iterator[Dict[str, Any]]: the journal entries
+    """
+
+    if not os.path.exists(path):
+        return
+
+    with open(path, "r", encoding = "utf-8") as file:
+        for line in file:
+            if not line.endswith("\n"):
+                return
+            line = line.strip()
+            if not line:
+                continue
+            yield json.loads(line)
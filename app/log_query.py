@@ -0,0 +1,438 @@
+"""
+Indexed queries over the system log for US38 - System Activity Logging
+
+Answers questions like "all ERROR events between T1 and T2" or "failed
+logins for username X" over system.log and its rotated backups without
+scanning every line. Each log file is split into blocks of lines (a new
+block starts every minute, or every BLOCK_BYTES within a busy minute) and
+an index file next to the log (system.log.idx) records:
+- the minute and byte offset where each block starts (a sparse time index)
+- for each level and each event type, the blocks that contain it
+
+A query picks the blocks that match its time range, level and event type
+from the index, seeks to each of them and only parses their lines.
+
+The index is brought up to date before every query: only the bytes
+appended since the last update are read, files are recognised across
+rotation by their inode, and rotated (possibly compressed) backups are
+indexed once. Both the text and the JSON-lines formats of app.system_log
+are understood.
+
+Usage:
+    python -m app.log_query --level ERROR --since "2025-01-31 12:00" --until "2025-01-31 13:00"
+    python -m app.log_query --event login_failed --field username=bob
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import bisect
+import gzip
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app import system_log
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+
+# A block never grows past this many bytes, so a busy minute is split into several
+BLOCK_BYTES = 64 * 1024
+
+_TEXT_LINE = re.compile(r"\[(\w+)\] (\d{4}-\d\d-\d\d \d\d:\d\d:\d\d) - (.*)")
+_TEXT_FIELDS = re.compile(r" \(((?:\w+=.*?)(?:, \w+=.*?)*)\)$")
+_TEXT_FIELD = re.compile(r"(\w+)=('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|[^,]*)(?:, |$)")
+_TEXT_EVENT = re.compile(r"[(, ]event='([^']*)'")
+
+# JSON lines written by app.system_log start with these fields, so they are read without json.loads
+_JSON_KEY = re.compile(r'\{"level": "(\w+)", "ts": ([\d.]+), "event": (?:"((?:[^"\\]|\\.)*)"|null)')
+
+# Parsed text timestamps, reused while lines share the same minute
+_last_text_minute: Tuple[str, float] = ("", 0.0)
+
+
+def _text_time(stamp: str) -> float:
+    """
+    Converts a local "YYYY-MM-DD HH:MM:SS" timestamp of a text log line into epoch seconds
+    """
+
+    global _last_text_minute
+
+    # local time offsets only ever change on a whole minute, so the seconds can be added on
+    if _last_text_minute[0] != stamp[:16]:
+        _last_text_minute = (stamp[:16], time.mktime(time.strptime(stamp[:16], "%Y-%m-%d %H:%M")))
+    return _last_text_minute[1] + int(stamp[17:19])
+
+
+def _field_value(text: str) -> Any:
+    """
+    Reads a field value of a text log line (written with repr)
+    """
+
+    if text.isdigit():
+        return int(text)
+    if len(text) >= 2 and text[0] == text[-1] == "'" and "\\" not in text and "'" not in text[1:-1]:
+        return text[1:-1]
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def _line_key(line: str) -> Optional[Tuple[float, str, Optional[str]]]:
+    """
+    Reads the (epoch time, level, event type) of a log line, or None if it is not a log line
+    """
+
+    if line.startswith("{"):
+        match = _JSON_KEY.match(line)
+        if match is not None and (match.group(3) is None or "\\" not in match.group(3)):
+            return float(match.group(2)), match.group(1), match.group(3)
+        try:
+            record = json.loads(line)
+            return float(record["ts"]), str(record["level"]), record.get("event")
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    match = _TEXT_LINE.match(line)
+    if match is None:
+        return None
+    event = _TEXT_EVENT.search(match.group(3))
+    return _text_time(match.group(2)), match.group(1), event.group(1) if event else None
+
+
+def parse_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parses a text or JSON log line into a record
+
+    Inputs:
+        line (str): the log line (without its newline)
+
+    Returns:
+        Optional[Dict[str, Any]]: level, ts, event, user_id, school_id, message and
+            any other fields, or None if the line is not a log line
+    """
+
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        return record if isinstance(record, dict) and "level" in record and "ts" in record else None
+
+    match = _TEXT_LINE.match(line)
+    if match is None:
+        return None
+
+    level, stamp, message = match.groups()
+    fields: Dict[str, Any] = {}
+    details = _TEXT_FIELDS.search(message)
+    if details is not None:
+        for name, value in _TEXT_FIELD.findall(details.group(1)):
+            fields[name] = _field_value(value)
+        message = message[:details.start()]
+
+    record = {"level": level, "ts": _text_time(stamp)}
+    for name in system_log.TYPED_FIELDS:
+        record[name] = fields.pop(name, None)
+    record["message"] = message
+    record.update(fields)
+    return record
+
+
+def _open_log(path: str):
+    """
+    Opens a log file (or compressed backup) for binary reading
+    """
+
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+
+def _file_id(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_dev}:{stat.st_ino}"
+
+
+def _new_entry() -> Dict[str, Any]:
+    return {"size": 0, "blocks": [], "levels": {}, "events": {}}
+
+
+def _index_lines(entry: Dict[str, Any], file, start: int) -> int:
+    """
+    Adds the complete lines of file from offset start to an index entry
+
+    Returns:
+        int: number of lines indexed
+    """
+
+    blocks = entry["blocks"]
+    levels = entry["levels"]
+    events = entry["events"]
+    offset = start
+    lines = 0
+
+    for raw in file:
+        if not raw.endswith(b"\n"):
+            # a line still being written is indexed by the next update
+            break
+
+        key = _line_key(raw.decode("utf-8", errors = "replace").rstrip("\n"))
+        if key is not None:
+            minute = int(key[0] // 60)
+            if not blocks or blocks[-1][0] != minute or offset - blocks[-1][1] >= BLOCK_BYTES:
+                blocks.append([minute, offset])
+            block = len(blocks) - 1
+
+            for postings, name in ((levels, key[1]), (events, key[2])):
+                if name is None:
+                    continue
+                found = postings.setdefault(name, [])
+                if not found or found[-1] != block:
+                    found.append(block)
+
+        offset += len(raw)
+        lines += 1
+
+    entry["size"] = offset
+    return lines
+
+
+class LogIndex:
+    """
+    The block index of a log file and its rotated backups, stored next to the log
+    """
+
+    def __init__(self, log_file: Optional[str] = None):
+        self.log_file = str(system_log.LOG_FILE if log_file is None else log_file)
+        self.path = self.log_file + INDEX_SUFFIX
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._paths: Dict[str, str] = {}
+
+        try:
+            with open(self.path, encoding = "utf-8") as f:
+                stored = json.load(f)
+            if stored.get("version") == INDEX_VERSION:
+                self.files = stored["files"]
+        except (OSError, ValueError, KeyError):
+            self.files = {}
+
+    def update(self) -> int:
+        """
+        Indexes the lines written since the last update and saves the index
+
+        Inputs:
+            None
+
+        Returns:
+            int: number of newly indexed lines
+        """
+
+        files = {}
+        paths = {}
+        added = 0
+
+        for path in system_log.log_file_paths(self.log_file):
+            try:
+                file_id = _file_id(path)
+            except OSError:
+                continue
+
+            entry = self.files.get(file_id)
+            compressed = path.endswith(".gz")
+            size = None if compressed else os.path.getsize(path)
+
+            if entry is None or (size is not None and size < entry["size"]):
+                # a new file, or one that was truncated and rewritten
+                entry = _new_entry()
+
+            if entry["size"] == 0 or (size is not None and size > entry["size"]):
+                with _open_log(path) as file:
+                    file.seek(entry["size"])
+                    added += _index_lines(entry, file, entry["size"])
+
+            files[file_id] = entry
+            paths[file_id] = path
+
+        self.files = files
+        self._paths = paths
+        self._save()
+        return added
+
+    def _save(self) -> None:
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding = "utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "files": self.files}, f, separators = (",", ":"))
+        os.replace(temp_path, self.path)
+
+    def _blocks(
+            self,
+            entry: Dict[str, Any],
+            level: Optional[str],
+            event: Optional[str],
+            since: Optional[float],
+            until: Optional[float],
+    ) -> List[Tuple[int, int]]:
+        """
+        Returns the (start, end) byte ranges of the blocks of one file that may hold matching lines
+        """
+
+        blocks = entry["blocks"]
+        first = 0 if since is None else bisect.bisect_left(blocks, [int(since // 60)])
+        last = len(blocks) if until is None else bisect.bisect_right(blocks, [int(until // 60), float("inf")])
+        candidates = None
+
+        for postings, name in ((entry["levels"], level), (entry["events"], event)):
+            if name is None:
+                continue
+            found = postings.get(name, [])
+            found = found[bisect.bisect_left(found, first):bisect.bisect_left(found, last)]
+            candidates = found if candidates is None else sorted(set(candidates).intersection(found))
+
+        if candidates is None:
+            candidates = range(first, last)
+
+        ranges = []
+        for block in candidates:
+            end = blocks[block + 1][1] if block + 1 < len(blocks) else entry["size"]
+            ranges.append((blocks[block][1], end))
+        return ranges
+
+    def query(
+            self,
+            level: Optional[str] = None,
+            event: Optional[str] = None,
+            since: Optional[float] = None,
+            until: Optional[float] = None,
+            fields: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the log records that match every given condition, oldest first
+
+        Inputs:
+            level (Optional[str]): "INFO" or "ERROR"
+            event (Optional[str]): event type, e.g. "login_failed"
+            since (Optional[float]): earliest epoch time (inclusive)
+            until (Optional[float]): latest epoch time (inclusive)
+            fields (Optional[Dict[str, Any]]): other fields the record must have, e.g. {"username": "bob"}
+
+        Returns:
+            Iterator[Dict[str, Any]]: the matching records (see parse_line)
+        """
+
+        if not self._paths:
+            self.update()
+
+        # bytes every matching line must contain, checked before a line is parsed
+        needles = [name.encode() for name in (level, event) if name is not None]
+        needles.extend(str(value).encode() for value in (fields or {}).values() if str(value).isalnum())
+
+        for file_id, entry in self.files.items():
+            ranges = self._blocks(entry, level, event, since, until)
+            if not ranges:
+                continue
+
+            with _open_log(self._paths[file_id]) as file:
+                for start, end in ranges:
+                    file.seek(start)
+                    for raw in file.read(end - start).splitlines():
+                        if not all(needle in raw for needle in needles):
+                            continue
+                        record = parse_line(raw.decode("utf-8", errors = "replace"))
+                        if record is not None and _matches(record, level, event, since, until, fields):
+                            yield record
+
+
+def _matches(
+        record: Dict[str, Any],
+        level: Optional[str],
+        event: Optional[str],
+        since: Optional[float],
+        until: Optional[float],
+        fields: Optional[Dict[str, Any]],
+) -> bool:
+    if level is not None and record.get("level") != level:
+        return False
+    if event is not None and record.get("event") != event:
+        return False
+    if since is not None and record["ts"] < since:
+        return False
+    if until is not None and record["ts"] > until:
+        return False
+    return all(str(record.get(name)) == str(value) for name, value in (fields or {}).items())
+
+
+def query_log(
+        log_file: Optional[str] = None,
+        level: Optional[str] = None,
+        event: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        fields: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Updates the index of a log and returns the records that match the conditions
+
+    Inputs:
+        log_file (Optional[str]): path of the live log file (LOG_FILE if None)
+        level, event, since, until, fields: the conditions (see LogIndex.query)
+
+    Returns:
+        List[Dict[str, Any]]: the matching records, oldest first
+    """
+
+    index = LogIndex(log_file)
+    index.update()
+    return list(index.query(level, event, since, until, fields))
+
+
+def _parse_time(value: str) -> float:
+    """
+    Reads an epoch time or a local "YYYY-MM-DD HH:MM[:SS]" time from the command line
+    """
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    for layout in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return time.mktime(time.strptime(value, layout))
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"invalid time: {value!r}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Prints the log lines that match the command line conditions
+    """
+
+    parser = argparse.ArgumentParser(description = "Indexed queries over the system log")
+    parser.add_argument("--log", default = None, help = "path of the live log file (default: system.log)")
+    parser.add_argument("--level", help = "INFO or ERROR")
+    parser.add_argument("--event", help = "event type, e.g. login_failed")
+    parser.add_argument("--since", type = _parse_time, help = "earliest time, e.g. '2025-01-31 12:00'")
+    parser.add_argument("--until", type = _parse_time, help = "latest time")
+    parser.add_argument("--field", action = "append", default = [], metavar = "NAME=VALUE",
+                        help = "another field the event must have, e.g. username=bob")
+    parser.add_argument("--count", action = "store_true", help = "only print the number of matching events")
+    args = parser.parse_args(argv)
+
+    fields = dict(field.split("=", 1) for field in args.field)
+    level = args.level.upper() if args.level else None
+    records = query_log(args.log, level, args.event, args.since, args.until, fields)
+
+    if args.count:
+        print(len(records))
+        return
+    for record in records:
+        print(json.dumps(record, ensure_ascii = False, default = str))
+
+
+if __name__ == "__main__":
+    main()
@@ -31,8 +31,10 @@ Includes:
 - US40 - Auto-load and Auto-save
 """
 
+import os
+
 from app.auth import register_user, login_user, reset_password
-from app.data_store import get_users, example_users, get_current_user, clear_current_user
+from app.data_store import get_users, example_users, get_current_user, clear_current_user, ChangeNotSavedError
 from app.validation import validate_menu_option_format
 from app.access_control import user_has_role, check_access, ROLE_ADMIN
 from app.admin_actions import (
@@ -55,11 +57,60 @@ from app.school_actions import (
     view_trending_schools,
     compare_two_schools
 )
-from app.persistence import load_system_data, save_system_data
+from app.persistence import load_system_data, save_system_data, enable_journal, disable_journal
+from app.autosave import start_autosave, stop_autosave
+from app.system_log import enable_buffered_logging, disable_buffered_logging, log_error
+from app.metrics import measure, paused, dump_metrics
 from app.help_menu import show_help_menu
 
 DEFAULT_SYSTEM_DATA_PATH = "system_data.json"
 
+# Group commit for the journal: changes are forced to disk in groups of up to
+# JOURNAL_SYNC_EVERY, or JOURNAL_SYNC_INTERVAL seconds after the last fsync.
+# Every change reaches the OS immediately, so a killed process loses nothing.
+JOURNAL_SYNC_EVERY = 8
+JOURNAL_SYNC_INTERVAL = 0.5
+
+# The state is saved in the background after AUTOSAVE_EVERY changes, or
+# AUTOSAVE_INTERVAL seconds after a change, whichever comes first
+AUTOSAVE_INTERVAL = 30.0
+AUTOSAVE_EVERY = 50
+
+# Comment text is only read from disk when comments are viewed or saved
+LAZY_COMMENT_BODIES = False
+
+# Log lines are written in batches by a background thread instead of by each caller
+BUFFERED_LOGGING = True
+
+# Call counts and latencies of the timed actions are written as JSON to this
+# file on exit and whenever an admin views the statistics; set it with the
+# SEP_METRICS_FILE environment variable (not written when unset)
+METRICS_FILE = os.environ.get("SEP_METRICS_FILE")
+
+# Name each menu choice is timed under (see app.metrics)
+MENU_ACTIONS = {
+    "0": "menu.exit",
+    "1": "menu.register",
+    "2": "menu.login_logout",
+    "3": "menu.reset_password",
+    "4": "menu.help",
+    "5": "menu.list_schools",
+    "6": "menu.rankings",
+    "7": "menu.top_schools",
+    "8": "menu.search",
+    "9": "menu.trending",
+    "10": "menu.compare",
+    "11": "menu.add_school",
+    "12": "menu.delete_school",
+    "13": "menu.update_school",
+    "14": "menu.list_users",
+    "15": "menu.delete_user",
+    "16": "menu.delete_comment",
+    "17": "menu.statistics",
+    "18": "menu.export_report",
+    "19": "menu.top_contributors",
+}
+
 def show_main_menu():
     """
     Displays the main menu options to the user
@@ -102,16 +153,190 @@ def show_main_menu():
     print("0. Exit")
 
 
+def write_metrics() -> None:
+    """
+    Writes the action metrics to METRICS_FILE if one is set, logging (not raising) a failure
+    """
+
+    if not METRICS_FILE:
+        return
+
+    try:
+        dump_metrics(METRICS_FILE)
+    except OSError as error:
+        log_error("Could not write metrics", event = "metrics_write_failed", path = METRICS_FILE, error = str(error))
+
+
+def prompt(message: str) -> str:
+    """
+    Reads one line of user input; the wait is left out of the action metrics
+
+    Inputs:
+        message (str): the prompt to show
+
+    Returns:
+        str: the line the user typed
+    """
+
+    with paused():
+        return input(message)
+
+
+def run_menu_choice(choice: str, current) -> bool:
+    """
+    Runs the action of a validated main menu choice
+
+    Inputs:
+        choice (str): the menu option the user picked
+        current: the logged-in user, or None
+
+    Returns:
+        bool: True if the user chose to exit (the state was saved), False otherwise
+    """
+
+    if choice == "1":
+        #US21 - User Registration
+        register_user(input_func = prompt)
+
+    elif choice == "2":
+        if current is None:
+            # US22 - Log in Feature
+            login_user(input_func = prompt)
+        else:
+            # US23 - Log out feature
+            clear_current_user()
+            print("\nYou have been logged out")
+
+    elif choice == "3":
+        # US24 - Password Reset
+        if current is None:
+            reset_password(input_func = prompt)
+            return False
+
+    elif choice == "4":
+        # US39 - Help Menu
+        show_help_menu(current_user = current, input_func = prompt, print_func = print)
+
+    elif choice == "5":
+        # US6 - List Schools (includes US5/US7/US9 in its internal menu)
+        list_all_schools(input_func = prompt)
+
+    elif choice == "6":
+        # US11 - Rankings
+        view_school_rankings(print_func = print)
+
+    elif choice == "7":
+        # US12 - Top Schools
+        view_top_schools(print_func = print)
+
+    elif choice == "8":
+        # US8 - Search
+        search_schools_by_name(input_func = prompt)
+
+    elif choice == "9":
+        # US36 - Trending
+        view_trending_schools(print_func = print)
+
+    elif choice == "10":
+        # US10 - Compare two Schools
+        compare_two_schools(input_func = prompt)
+
+    elif choice == "11":
+        if not check_access(current, [ROLE_ADMIN], print_func = print):
+            return False
+        add_new_school(input_func = prompt)
+
+    elif choice == "12":
+        if not check_access(current, [ROLE_ADMIN], print_func = print):
+            return False
+        delete_school_by_id(input_func = prompt)
+
+    elif choice == "13":
+        if not check_access(current, [ROLE_ADMIN], print_func = print):
+            return False
+        update_school_by_id(input_func = prompt)
+
+    elif choice == "14":
+        if not check_access(current, [ROLE_ADMIN], print_func = print):
+            return False
+        list_all_users(print_func = print)
+
+    elif choice == "15":
+        if not check_access(current, [ROLE_ADMIN], print_func = print):
+            return False
+
+        try:
+            uid = int(prompt("Enter User ID to delete: ").strip())
+        except ValueError:
+            print("Invalid input. Please enter a number.")
+            return False
+
+        delete_user_by_id(uid, print_func = print)
+
+    elif choice == "16":
+        if not check_access(current, [ROLE_ADMIN], print_func = print):
+            return False
+
+        try:
+            cid = int(prompt("Enter Comment ID to delete: ").strip())
+        except ValueError:
+            print("Invalid input. Please enter a number.")
+            return False
+
+        delete_comment_by_id(cid, print_func = print)
+
+    elif choice == "17":
+        if not check_access(current, [ROLE_ADMIN], print_func = print):
+            return False
+        view_system_statistics(print_func = print)
+        write_metrics()
+
+    elif choice == "18":
+        if not check_access(current, [ROLE_ADMIN], print_func = print):
+            return False
+        export_top_schools_report(print_func = print)
+
+    elif choice == "19":
+        if not check_access(current, [ROLE_ADMIN], print_func = print):
+            return False
+        view_top_contributors(print_func = print)
+
+    elif choice == "0":
+
+        save_system_data(file_path = DEFAULT_SYSTEM_DATA_PATH, print_func = print, only_if_changed = True)
+
+        print("\nThank you for using School Evaluation Platform")
+        return True
+
+    return False
+
+
 def main() -> None:
     """
     Main Application Loop
     """
 
-    load_system_data(file_path = DEFAULT_SYSTEM_DATA_PATH, print_func = print)
+    if BUFFERED_LOGGING:
+        enable_buffered_logging()
+
+    load_system_data(
+        file_path = DEFAULT_SYSTEM_DATA_PATH,
+        print_func = print,
+        lazy_comments = LAZY_COMMENT_BODIES,
+    )
 
     if not get_users():
         example_users()
 
+    # every change from here on is appended to the journal next to the snapshot,
+    # and replayed by load_system_data if the process dies before saving
+    enable_journal(
+        file_path = DEFAULT_SYSTEM_DATA_PATH,
+        sync_every = JOURNAL_SYNC_EVERY,
+        sync_interval = JOURNAL_SYNC_INTERVAL,
+    )
+    start_autosave(DEFAULT_SYSTEM_DATA_PATH, interval = AUTOSAVE_INTERVAL, every = AUTOSAVE_EVERY)
+
     did_explicit_exit_save = False
 
     try:
@@ -137,122 +362,23 @@ def main() -> None:
                 print(msg)
                 continue
 
-            if choice == "1":
-                #US21 - User Registration
-                register_user()
-
-            elif choice == "2":
-                if current is None:
-                    # US22 - Log in Feature
-                    login_user()
-                else:
-                    # US23 - Log out feature
-                    clear_current_user()
-                    print("\nYou have been logged out")
-
-            elif choice == "3":
-                # US24 - Password Reset
-                if current is None:
-                    reset_password()
-                    continue
-
-            elif choice == "4":
-                # US39 - Help Menu
-                show_help_menu(current_user = current, input_func = input, print_func = print)
-
-            elif choice == "5":
-                # US6 - List Schools (includes US5/US7/US9 in its internal menu)
-                list_all_schools()
-
-            elif choice == "6":
-                # US11 - Rankings
-                view_school_rankings(print_func = print)
-
-            elif choice == "7":
-                # US12 - Top Schools
-                view_top_schools(print_func = print)
-
-            elif choice == "8":
-                # US8 - Search
-                search_schools_by_name()
-
-            elif choice == "9":
-                # US36 - Trending
-                view_trending_schools(print_func = print)
-
-            elif choice == "10":
-                # US10 - Compare two Schools
-                compare_two_schools()
-
-            elif choice == "11":
-                if not check_access(current, [ROLE_ADMIN], print_func = print):
-                    continue
-                add_new_school()
-
-            elif choice == "12":
-                if not check_access(current, [ROLE_ADMIN], print_func = print):
-                    continue
-                delete_school_by_id()
-
-            elif choice == "13":
-                if not check_access(current, [ROLE_ADMIN], print_func = print):
-                    continue
-                update_school_by_id()
-
-            elif choice == "14":
-                if not check_access(current, [ROLE_ADMIN], print_func = print):
-                    continue
-                list_all_users(print_func = print)
-
-            elif choice == "15":
-                if not check_access(current, [ROLE_ADMIN], print_func = print):
-                    continue
-
-                try:
-                    uid = int(input("Enter User ID to delete: ").strip())
-                except ValueError:
-                    print("Invalid input. Please enter a number.")
-                    continue
-
-                delete_user_by_id(uid, print_func = print)
-
-            elif choice == "16":
-                if not check_access(current, [ROLE_ADMIN], print_func = print):
-                    continue
-
-                try:
-                    cid = int(input("Enter Comment ID to delete: ").strip())
-                except ValueError:
-                    print("Invalid input. Please enter a number.")
-                    continue
-
-                delete_comment_by_id(cid, print_func = print)
-
-            elif choice == "17":
-                if not check_access(current, [ROLE_ADMIN], print_func = print):
-                    continue
-                view_system_statistics(print_func = print)
-
-            elif choice == "18":
-                if not check_access(current, [ROLE_ADMIN], print_func = print):
-                    continue
-                export_top_schools_report(print_func = print)
-
-            elif choice == "19":
-                if not check_access(current, [ROLE_ADMIN], print_func = print):
-                    continue
-                view_top_contributors(print_func = print)
-
-            elif choice == "0":
-
-                save_system_data(file_path = DEFAULT_SYSTEM_DATA_PATH, print_func = print)
-                did_explicit_exit_save = True
+            try:
+                with measure(MENU_ACTIONS[choice]):
+                    finished = run_menu_choice(choice, current)
+            except ChangeNotSavedError as error:
+                print(f"\n{error}. Nothing was changed.")
+                continue
 
-                print("\nThank you for using School Evaluation Platform")
+            if finished:
+                did_explicit_exit_save = True
                 break
     finally:
+        stop_autosave()
         if not did_explicit_exit_save:
-            save_system_data(file_path = DEFAULT_SYSTEM_DATA_PATH, print_func = print)
+            save_system_data(file_path = DEFAULT_SYSTEM_DATA_PATH, print_func = print, only_if_changed = True)
+        disable_journal()
+        write_metrics()
+        disable_buffered_logging()
 
 
 if __name__ == "__main__":
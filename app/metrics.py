@@ -0,0 +1,361 @@
+"""
+Action latency and call counts for US35 - View System Statistics
+
+Every instrumented action (each main menu choice and the core functions
+such as set_rating, save_system_data or filter_schools) keeps a call
+counter and a latency histogram. The histogram uses log buckets like an
+HDR histogram: each power of two of nanoseconds is split into
+2 ** SUB_BUCKET_BITS equal buckets, so a recorded latency is known to
+within about 1 / 2 ** SUB_BUCKET_BITS (3% with 5 bits) of its value, from
+nanoseconds to half an hour, in a fixed list of about a thousand counters.
+Recording a call is two clock reads, a bit_length and a few integer
+operations on histograms of the calling thread, with no lock, so it stays
+on in production (disable_metrics turns it off). A snapshot taken while
+another thread records may miss that one call.
+
+Percentiles (p50/p95/p99) are read from the buckets; each is reported as
+the upper edge of the bucket it falls in, capped at the largest latency seen.
+The totals are shown by view_system_statistics and can be written as JSON
+with dump_metrics (main writes METRICS_FILE on exit when it is set).
+
+Time spent inside a paused() block (main wraps every input prompt in one)
+is left out of the timed calls it falls within, so a menu action's latency
+is the work it does, not how long the user took to answer its prompts.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Buckets per power of two: 2 ** SUB_BUCKET_BITS
+SUB_BUCKET_BITS = 5
+
+# Latencies of up to 2 ** MAX_BITS nanoseconds (about 36 minutes) get their own bucket
+MAX_BITS = 42
+
+# Percentiles reported by metrics_snapshot and view_system_statistics
+PERCENTILES = (50, 95, 99)
+
+# False after disable_metrics: timed functions then only check this flag
+_ENABLED = True
+
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_BUCKET_COUNT = (MAX_BITS - SUB_BUCKET_BITS + 1) * _SUB_BUCKETS
+
+
+def _bucket_index(value: int) -> int:
+    """
+    Returns the bucket of a latency in nanoseconds
+    """
+
+    # values below 2 * _SUB_BUCKETS have a bucket each; above that the bucket
+    # is the top SUB_BUCKET_BITS + 1 bits of the value plus how far they were shifted
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    if shift <= 0:
+        return value
+    return min((shift << SUB_BUCKET_BITS) + (value >> shift), _BUCKET_COUNT - 1)
+
+
+def _bucket_upper(index: int) -> int:
+    """
+    Returns the largest latency in nanoseconds that falls in a bucket
+    """
+
+    if index < 2 * _SUB_BUCKETS:
+        return index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    top = index - (shift << SUB_BUCKET_BITS)
+    return ((top + 1) << shift) - 1
+
+
+class Histogram:
+    """
+    Call count and log-bucketed latencies of one action
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets: List[int] = [0] * _BUCKET_COUNT
+
+    def record(self, elapsed_ns: int) -> None:
+        """
+        Counts one call that took elapsed_ns nanoseconds
+        """
+
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.buckets[_bucket_index(elapsed_ns)] += 1
+
+    def merge(self, other: Histogram) -> None:
+        """
+        Adds the calls counted by another histogram to this one
+        """
+
+        self.count += other.count
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.buckets = [mine + theirs for mine, theirs in zip(self.buckets, other.buckets)]
+
+    def percentile(self, percent: float) -> int:
+        """
+        Returns the latency in nanoseconds below which percent of the calls fall (0 without calls)
+        """
+
+        if not self.count:
+            return 0
+
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index, calls in enumerate(self.buckets):
+            seen += calls
+            if seen >= rank:
+                return min(_bucket_upper(index), self.max_ns)
+        return self.max_ns
+
+
+# Each thread records into its own histograms (by action name, e.g.
+# "menu.rankings" or "set_rating"), so recording takes no lock; readers
+# merge the histograms of every thread
+_LOCAL = threading.local()
+_THREAD_METRICS: List[Dict[str, Histogram]] = []
+
+# Guards _THREAD_METRICS
+_METRICS_LOCK = threading.Lock()
+
+
+def _paused_ns() -> int:
+    """
+    Returns the total time the current thread has spent in paused() blocks, in nanoseconds
+    """
+
+    try:
+        return _LOCAL.paused_ns
+    except AttributeError:
+        return 0
+
+
+def _thread_metrics() -> Dict[str, Histogram]:
+    """
+    Returns the histograms of the current thread, registering them on first use
+    """
+
+    metrics: Dict[str, Histogram] = {}
+    with _METRICS_LOCK:
+        _THREAD_METRICS.append(metrics)
+    _LOCAL.metrics = metrics
+    return metrics
+
+
+def record(name: str, elapsed_ns: int) -> None:
+    """
+    Records one call of an action
+
+    Inputs:
+        name (str): name of the action
+        elapsed_ns (int): how long the call took, in nanoseconds
+
+    Returns:
+        None
+    """
+
+    try:
+        metrics = _LOCAL.metrics
+    except AttributeError:
+        metrics = _thread_metrics()
+
+    histogram = metrics.get(name)
+    if histogram is None:
+        histogram = metrics[name] = Histogram()
+
+    # Histogram.record and _bucket_index, inlined as this runs on every timed call
+    histogram.count += 1
+    histogram.total_ns += elapsed_ns
+    if elapsed_ns > histogram.max_ns:
+        histogram.max_ns = elapsed_ns
+    shift = elapsed_ns.bit_length() - SUB_BUCKET_BITS - 1
+    index = elapsed_ns if shift <= 0 else (shift << SUB_BUCKET_BITS) + (elapsed_ns >> shift)
+    if index >= _BUCKET_COUNT:
+        index = _BUCKET_COUNT - 1
+    histogram.buckets[index] += 1
+
+
+@contextmanager
+def measure(name: str) -> Iterator[None]:
+    """
+    Times the block as one call of an action, whether it returns or raises
+
+    Inputs:
+        name (str): name of the action
+
+    Returns:
+        Iterator[None]: a context manager
+    """
+
+    if not _ENABLED:
+        yield
+        return
+
+    paused_before = _paused_ns()
+    started = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter_ns() - started - (_paused_ns() - paused_before))
+
+
+@contextmanager
+def paused() -> Iterator[None]:
+    """
+    Leaves the time spent in the block (e.g. waiting for the user's input)
+    out of every timed call it falls within on this thread
+
+    Inputs:
+        None
+
+    Returns:
+        Iterator[None]: a context manager
+    """
+
+    started = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        _LOCAL.paused_ns = _paused_ns() + time.perf_counter_ns() - started
+
+
+def timed(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """
+    Decorator that times every call of a function as one call of an action
+
+    Inputs:
+        name (Optional[str]): name of the action (the function's name if None)
+
+    Returns:
+        Callable[[Callable], Callable]: the decorator
+    """
+
+    def decorate(func: Callable) -> Callable:
+        action = name or func.__name__
+        clock = time.perf_counter_ns
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _ENABLED:
+                return func(*args, **kwargs)
+            paused_before = _paused_ns()
+            started = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(action, clock() - started - (_paused_ns() - paused_before))
+
+        return wrapper
+
+    return decorate
+
+
+def metrics_snapshot() -> Dict[str, Dict[str, Any]]:
+    """
+    Returns the call count and latencies (in milliseconds) of every recorded action
+
+    Inputs:
+        None
+
+    Returns:
+        Dict[str, Dict[str, Any]]: by action name, "calls", "total_ms", "mean_ms",
+            "max_ms" and "p50_ms", "p95_ms", "p99_ms"
+    """
+
+    merged: Dict[str, Histogram] = {}
+    with _METRICS_LOCK:
+        for metrics in _THREAD_METRICS:
+            for name, histogram in list(metrics.items()):
+                merged.setdefault(name, Histogram()).merge(histogram)
+
+    snapshot = {}
+    for name in sorted(merged):
+        histogram = merged[name]
+        count, total_ns, max_ns = histogram.count, histogram.total_ns, histogram.max_ns
+        entry = {
+            "calls": count,
+            "total_ms": round(total_ns / 1e6, 6),
+            "mean_ms": round(total_ns / count / 1e6, 6) if count else 0.0,
+            "max_ms": round(max_ns / 1e6, 6),
+        }
+        for percent in PERCENTILES:
+            entry[f"p{percent}_ms"] = round(histogram.percentile(percent) / 1e6, 6)
+        snapshot[name] = entry
+    return snapshot
+
+
+def dump_metrics(file_path: str = "metrics.json") -> None:
+    """
+    Writes metrics_snapshot as JSON, replacing the file atomically
+
+    Inputs:
+        file_path (str): path of the JSON file
+
+    Returns:
+        None
+    """
+
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, "w", encoding = "utf-8") as f:
+        json.dump({"generated": time.time(), "actions": metrics_snapshot()}, f, indent = 2)
+    os.replace(temp_path, file_path)
+
+
+def reset_metrics() -> None:
+    """
+    Forgets every recorded call
+
+    Inputs:
+        None
+
+    Returns:
+        None
+    """
+
+    with _METRICS_LOCK:
+        for metrics in _THREAD_METRICS:
+            metrics.clear()
+
+
+def enable_metrics() -> None:
+    """
+    Starts recording calls of the instrumented actions again
+
+    Inputs:
+        None
+
+    Returns:
+        None
+    """
+    global _ENABLED
+
+    _ENABLED = True
+
+
+def disable_metrics() -> None:
+    """
+    Stops recording calls; instrumented actions then only pay for one flag check
+
+    Inputs:
+        None
+
+    Returns:
+        None
+    """
+    global _ENABLED
+
+    _ENABLED = False
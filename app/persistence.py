@@ -1,30 +1,210 @@
 """
 Persistence utilities for US29 - Save System Data to File
 
-Saves the in-memory state into a JSON file:
+Saves the in-memory state into a JSON file (or, for paths ending in ".bin",
+a binary snapshot - see app.binary_snapshot), compressed with gzip, bz2 or
+lzma if the path ends in ".gz", ".bz2" or ".xz":
 - USERS
 - SCHOOLS
 - RATINGS
 - COMMENTS
 - FAVOURITES
+- the user, school and comment ID sequences
+
+With the journal enabled, each change is also appended to a journal file next
+to the snapshot (see app.journal), which is replayed over the snapshot on load
+and folded into a new snapshot once it grows past a size threshold.
+
+A snapshot path ending in a path separator (e.g. "system_data/") names a
+directory holding one file per section instead (users.json, ratings.json, ... or .bin), which
+are read in parallel on load; only the sections that changed are rewritten.
+
+Each store keeps a version counter that moves on every change. The versions
+seen when a snapshot was last saved or loaded are remembered per path, so a
+save can be skipped when nothing changed since (see changed_sections).
 """
 
 from __future__ import annotations
 
+import bz2
+import gzip
+import io
 import json
+import lzma
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, Callable
+from typing import Any, BinaryIO, Dict, Callable, Iterable, Iterator, List, Optional, TextIO, Tuple
 
-from app.data_store import get_users, get_schools, USERS, SCHOOLS
-from app.reviews import RATINGS, COMMENTS, FAVOURITES
+from app.data_store import get_users, get_schools, load_users, load_schools, normalize_school_id, USERS, SCHOOLS
+from app.data_store import add_mutation_listener, remove_mutation_listener, ChangeNotSavedError
+from app.reviews import RATINGS, COMMENTS, FAVOURITES, load_ratings, load_comments, load_favourites
+from app.journal import Journal, journal_path_for, read_journal
+from app.comment_bodies import CommentBodies, LazyComment
+from app.snapshot_reader import SnapshotReader
+from app.binary_snapshot import BINARY_SUFFIX, is_binary_snapshot_path, read_binary_sections, write_binary_snapshot
+from app.journal import DEFAULT_CHECKPOINT_BYTES, DEFAULT_SYNC_EVERY, DEFAULT_SYNC_INTERVAL
 from app.system_log import log_event, log_error
+from app.metrics import timed
+
+# The journal that changes are currently appended to (None when journaling is off)
+ACTIVE_JOURNAL: Optional[Journal] = None
+JOURNAL_SNAPSHOT_PATH: Optional[str] = None
+CHECKPOINT_BYTES: int = DEFAULT_CHECKPOINT_BYTES
+
+# Called with the snapshot path once the journal passes CHECKPOINT_BYTES;
+# returns True if it takes the checkpoint over (app.autosave hands it to its
+# worker), otherwise the checkpoint is written by the thread that made the change
+CHECKPOINT_SCHEDULER: Optional[Callable[[str], bool]] = None
+
+# The temporary file holding the comment text of the loaded stores, when
+# they were loaded with lazy_comments=True (closed when they are replaced)
+ACTIVE_COMMENT_BODIES: Optional[CommentBodies] = None
+
+# Held while a snapshot file is written, so a save and a background autosave
+# (see app.autosave) never write at the same time
+SAVE_LOCK = threading.Lock()
+
+# Section versions and (mtime, size) of each snapshot file when it was last
+# saved or loaded, by path
+SNAPSHOT_STATES: Dict[str, Tuple[Dict[str, Any], Optional[Tuple]]] = {}
+
+# Sections of a sharded snapshot directory, one file each, in load order:
+# the small users and schools files are read first so they do not wait
+# behind ratings and comments
+SHARD_SECTIONS = ('users', 'schools', 'favourites', 'sequences', 'ratings', 'comments')
+
+# Snapshot paths ending in one of these are compressed with the matching codec
+COMPRESSION_SUFFIXES = (".gz", ".bz2", ".xz", ".lzma")
+GZIP_LEVEL = 6
+
+
+def _compression_suffix(file_path: str) -> Optional[str]:
+    """
+    Returns the compression suffix of a snapshot path, or None if it is not compressed
+    """
+
+    for suffix in COMPRESSION_SUFFIXES:
+        if file_path.endswith(suffix):
+            return suffix
+    return None
+
+
+def is_binary_snapshot(file_path: str) -> bool:
+    """
+    Tells whether a snapshot path names a binary snapshot, looking past any compression suffix
+
+    Inputs:
+        file_path: path of the snapshot
+
+    Returns:
+        bool: True for binary snapshot paths (e.g. "data.bin" or "data.bin.gz")
+    """
+
+    suffix = _compression_suffix(file_path)
+    if suffix is not None:
+        file_path = file_path[:-len(suffix)]
+    return is_binary_snapshot_path(file_path)
+
+
+def _compressed_stream(raw: BinaryIO, suffix: Optional[str], mode: str) -> BinaryIO:
+    """
+    Wraps an open file in the streaming codec for a compression suffix
+
+    Inputs:
+        raw: the open file
+        suffix: compression suffix of the path, or None
+        mode: "rb" or "wb"
+
+    Returns:
+        BinaryIO: a stream that compresses/decompresses as it goes (raw itself if uncompressed)
+    """
+
+    if suffix is None:
+        return raw
+    if suffix == ".gz":
+        return gzip.GzipFile(fileobj = raw, mode = mode, compresslevel = GZIP_LEVEL)
+    if suffix == ".bz2":
+        return bz2.BZ2File(raw, mode)
+    return lzma.LZMAFile(raw, mode)
+
+
+def is_sharded_snapshot(file_path: str) -> bool:
+    """
+    Tells whether a snapshot path names a sharded snapshot directory
+
+    Inputs:
+        file_path: path of the snapshot
+
+    Returns:
+        bool: True if the path ends with a path separator (e.g. "system_data/")
+    """
+
+    return file_path.endswith(('/', os.sep))
+
+
+def shard_path(directory: str, section: str, binary: bool = False) -> str:
+    """
+    Returns the path of the file holding one section of a sharded snapshot
+
+    Inputs:
+        directory: the sharded snapshot directory
+        section: name of the section (e.g. "ratings")
+        binary: whether the section is stored in the binary format
+
+    Returns:
+        str: path of the section file
+    """
+
+    return os.path.join(directory, section + (BINARY_SUFFIX if binary else ".json"))
+
+
+def _existing_shards(directory: str) -> List[Tuple[str, bool]]:
+    """
+    Lists the (path, binary) of every section file present in a sharded snapshot directory
+    """
+
+    shards = []
+    for section in SHARD_SECTIONS:
+        for binary in (True, False):
+            path = shard_path(directory, section, binary)
+            if os.path.exists(path):
+                shards.append((path, binary))
+                break
+    return shards
+
+
+@contextmanager
+def _open_snapshot(file_path: str, binary: bool) -> Iterator[Any]:
+    """
+    Opens a snapshot for reading, decompressing it on the fly if its suffix asks for it
+
+    Inputs:
+        file_path: path of the snapshot
+        binary: whether to yield a binary stream instead of a text stream
+
+    Returns:
+        Iterator[Any]: a context manager yielding the open stream
+    """
+
+    with open(file_path, 'rb') as raw:
+        stream = _compressed_stream(raw, _compression_suffix(file_path), 'rb')
+        try:
+            yield stream if binary else io.TextIOWrapper(stream, encoding = "utf-8")
+        finally:
+            if stream is not raw:
+                stream.close()
 
 
 def serialize_comment(comment: Dict[str, Any]) -> Dict[str, Any]:
     """
     converts a comment dictionary into a JSON string
 
+    All keys, including the comment's persistent comment_id, are kept.
+
     Inputs:
         comment: comment dictionary
 
@@ -32,7 +212,8 @@ def serialize_comment(comment: Dict[str, Any]) -> Dict[str, Any]:
         Dict[str, Any]: JSON string
     """
 
-    serialized = dict(comment)
+    # a lazily loaded comment keeps its text on disk until it is written out
+    serialized = comment.shallow_copy() if isinstance(comment, LazyComment) else dict(comment)
     created_at = serialized.get('created_at')
 
     if isinstance(created_at, datetime):
@@ -47,10 +228,36 @@ def serialize_comment(comment: Dict[str, Any]) -> Dict[str, Any]:
     return serialized
 
 
+def serialize_favourite(favourite: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converts a favourite dictionary into a JSON-ready dictionary
+
+    Inputs:
+        favourite: favourite dictionary
+
+    Returns:
+        Dict[str, Any]: the favourite with created_at as an ISO string
+    """
+
+    serialized = dict(favourite)
+    created_at = serialized.get('created_at')
+
+    if isinstance(created_at, datetime):
+        serialized['created_at'] = created_at.isoformat()
+
+    elif created_at is not None:
+        serialized['created_at'] = str(created_at)
+
+    return serialized
+
+
 def build_system_snapshot() -> Dict[str, Any]:
     """
     Builds a snapshot of the current system state
 
+    Every record is copied, so the snapshot stays unchanged while the stores
+    keep changing (e.g. while it is written out on another thread).
+
     Inputs:
         None
 
@@ -58,11 +265,11 @@ def build_system_snapshot() -> Dict[str, Any]:
         Dict[str, Any]: JSON string
     """
 
-    users = list(get_users())
-    schools = list(get_schools())
-    ratings = list(RATINGS)
+    users = [dict(u) for u in get_users()]
+    schools = [dict(s) for s in get_schools()]
+    ratings = [dict(r) for r in RATINGS]
     comments = [serialize_comment(c) for c in COMMENTS]
-    favourites = list(FAVOURITES)
+    favourites = [serialize_favourite(f) for f in FAVOURITES]
 
     return {
         'users': users,
@@ -70,25 +277,270 @@ def build_system_snapshot() -> Dict[str, Any]:
         'ratings': ratings,
         'comments': comments,
         'favourites': favourites,
+        'sequences': {
+            'users': USERS.last_id,
+            'schools': SCHOOLS.last_id,
+            'comments': COMMENTS.last_id,
+        },
     }
 
 
-def save_system_data(
-        file_path: str = "system_data.json",
-        print_func: Callable[[str], None] = print,
-) -> bool:
+def _store_sections() -> List[Tuple[str, Any]]:
     """
-    Saves the system state into a JSON file
+    Lists the snapshot sections of the current system state, in file order,
+    with records in their in-memory form
 
     Inputs:
-        file_path: path to save the system state to
-        print_func: function that prints out the system state
+        None
 
     Returns:
-        bool: True if successful, False otherwise
+        List[Tuple[str, Any]]: (section name, records or value) pairs
+    """
+
+    return [
+        ('users', get_users()),
+        ('schools', get_schools()),
+        ('ratings', RATINGS),
+        ('comments', COMMENTS),
+        ('favourites', FAVOURITES),
+        ('sequences', {
+            'users': USERS.last_id,
+            'schools': SCHOOLS.last_id,
+            'comments': COMMENTS.last_id,
+        }),
+    ]
+
+
+def _section_versions() -> Dict[str, Any]:
+    """
+    Returns the current version of every snapshot section
+    """
+
+    return {
+        'users': USERS.version,
+        'schools': SCHOOLS.version,
+        'ratings': RATINGS.version,
+        'comments': COMMENTS.version,
+        'favourites': FAVOURITES.version,
+        'sequences': (USERS.last_id, SCHOOLS.last_id, COMMENTS.last_id),
+    }
+
+
+def _file_stamp(file_path: str) -> Optional[Tuple]:
+    """
+    Returns the (mtime, size) of a file (of every section file for a sharded
+    snapshot), or None if it does not exist
+    """
+
+    if is_sharded_snapshot(file_path):
+        return tuple((path, _file_stamp(path)) for path, _ in _existing_shards(file_path)) or None
+
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _remember_snapshot_state(file_path: str, versions: Dict[str, Any]) -> None:
+    """
+    Records that file_path now holds the sections at the given versions
+    """
+
+    SNAPSHOT_STATES[file_path] = (versions, _file_stamp(file_path))
+
+
+def changed_sections(file_path: str = "system_data.json") -> List[str]:
+    """
+    Lists the snapshot sections that changed since file_path was last saved or loaded
+
+    Every section is listed if the file was not saved or loaded by this
+    process, or was changed on disk by something else since.
+
+    Inputs:
+        file_path: path of the snapshot file
+
+    Returns:
+        List[str]: names of the changed sections, in file order
+    """
+
+    versions = _section_versions()
+    state = SNAPSHOT_STATES.get(file_path)
+
+    if state is None or state[1] is None or state[1] != _file_stamp(file_path):
+        return list(versions)
+
+    saved_versions = state[0]
+    return [name for name, version in versions.items() if saved_versions.get(name) != version]
+
+
+def _serialized_sections(sections: Iterable[Tuple[str, Any]]) -> Iterator[Tuple[str, Any]]:
+    """
+    Converts the timestamps of comment and favourite sections into ISO strings for JSON
+    """
+
+    for name, value in sections:
+        if name == 'comments':
+            value = (serialize_comment(c) for c in value)
+        elif name == 'favourites':
+            value = (serialize_favourite(f) for f in value)
+        yield name, value
+
+
+# Encodes a flat record with the line breaks json.dump(indent = 2) puts
+# between its fields, using the C encoder (which indent = 2 does not use)
+_FLAT_RECORD_ENCODER = json.JSONEncoder(ensure_ascii = False, separators = (",\n      ", ": "))
+
+
+def _indented_record(record: Any) -> str:
+    """
+    Encodes one section record exactly as json.dump(snapshot, indent = 2) lays it out
+    """
+
+    if isinstance(record, dict) and record and not any(
+            isinstance(value, (dict, list, tuple)) for value in record.values()
+    ):
+        return "{\n      " + _FLAT_RECORD_ENCODER.encode(record)[1:-1] + "\n    }"
+    return json.dumps(record, indent = 2, ensure_ascii = False).replace("\n", "\n    ")
+
+
+def write_json_snapshot(file: TextIO, sections: Iterable[Tuple[str, Any]]) -> None:
+    """
+    Writes snapshot sections to an open text file one record at a time
+
+    The output is the same as json.dump(snapshot, file, indent = 2), without
+    first building the whole document in memory.
+
+    Inputs:
+        file: file opened for text writing
+        sections: (name, records or value) pairs, already JSON-serializable
+
+    Returns:
+        None
+    """
+
+    file.write("{")
+    separator = "\n  "
+
+    for name, value in sections:
+        file.write(f"{separator}{json.dumps(name)}: ")
+        separator = ",\n  "
+
+        if isinstance(value, dict):
+            file.write(json.dumps(value, indent = 2, ensure_ascii = False).replace("\n", "\n  "))
+            continue
+
+        file.write("[")
+        record_separator = "\n    "
+        for record in value:
+            file.write(record_separator)
+            file.write(_indented_record(record))
+            record_separator = ",\n    "
+        file.write("]" if record_separator == "\n    " else "\n  ]")
+
+    file.write("}" if separator == "\n  " else "\n}")
+
+
+def _read_sections(file_path: str, binary: bool) -> Iterator[Tuple[str, Any]]:
+    """
+    Streams the sections of a snapshot file with records in their in-memory form
+
+    Inputs:
+        file_path: path of the snapshot
+        binary: whether the file is a binary snapshot
+
+    Returns:
+        Iterator[Tuple[str, Any]]: the snapshot sections
+    """
+
+    if binary:
+        with _open_snapshot(file_path, binary = True) as file:
+            yield from read_binary_sections(file)
+        return
+
+    with _open_snapshot(file_path, binary = False) as file:
+        for name, value in SnapshotReader(file).sections():
+            if name in ('comments', 'favourites') and isinstance(value, Iterator):
+                value = (restore_created_at(record) for record in value)
+            yield name, value
+
+
+def _read_shard(file_path: str, binary: bool) -> List[Tuple[str, Any]]:
+    """
+    Reads and decodes every section of one section file (run on a worker thread)
+    """
+
+    return [
+        (name, list(value) if isinstance(value, Iterator) else value)
+        for name, value in _read_sections(file_path, binary)
+    ]
+
+
+def _read_shards(directory: str) -> Iterator[Tuple[str, Any]]:
+    """
+    Reads the section files of a sharded snapshot concurrently
+
+    Sections are yielded as soon as their file is decoded, so users and
+    schools reach their stores while ratings and comments are still being read.
+
+    Inputs:
+        directory: the sharded snapshot directory
+
+    Returns:
+        Iterator[Tuple[str, Any]]: the snapshot sections, in the order they finish
+    """
+
+    shards = _existing_shards(directory)
+    if not shards:
+        return
+
+    with ThreadPoolExecutor(max_workers = len(shards)) as pool:
+        futures = [pool.submit(_read_shard, path, binary) for path, binary in shards]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def _write_shards(
+        directory: str,
+        sections: Iterable[Tuple[str, Any]],
+        binary: bool,
+        only: Iterable[str],
+) -> None:
+    """
+    Writes the given sections of a sharded snapshot, each to its own file
+
+    Inputs:
+        directory: the sharded snapshot directory
+        sections: (name, records or value) pairs
+        binary: whether to write the section files in the binary format
+        only: names of the sections to write; the other files are left as they are
+
+    Returns:
+        None
+    """
+
+    only = set(only)
+    for name, value in sections:
+        if name not in only:
+            continue
+
+        _write_snapshot_file(shard_path(directory, name, binary), [(name, value)], binary)
+
+        # a file of the same section in the other format is now out of date
+        stale_path = shard_path(directory, name, not binary)
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+
+
+def _write_snapshot_file(file_path: str, sections: Iterable[Tuple[str, Any]], binary: bool) -> None:
+    """
+    Writes snapshot sections to file_path atomically through a .tmp file,
+    compressing them on the fly if the path has a compression suffix
+
+    Raises:
+        Exception: Whatever writing failed with; the .tmp file is removed
     """
 
-    snapshot = build_system_snapshot()
     temp_path = f"{file_path}.tmp"
 
     try:
@@ -97,25 +549,245 @@ def save_system_data(
         if parent_dir:
             os.makedirs(parent_dir, exist_ok = True)
 
-        with open(temp_path, 'w', encoding = "utf-8") as file:
-            json.dump(snapshot, file, indent = 2, ensure_ascii = False)
+        with open(temp_path, 'wb') as raw:
+            stream = _compressed_stream(raw, _compression_suffix(file_path), 'wb')
+
+            if binary:
+                write_binary_snapshot(stream, sections)
+            else:
+                text = io.TextIOWrapper(stream, encoding = "utf-8")
+                write_json_snapshot(text, _serialized_sections(sections))
+                text.detach()
+
+            if stream is not raw:
+                stream.close()
+
+            # the snapshot must be on disk before the journal is emptied
+            raw.flush()
+            os.fsync(raw.fileno())
 
         os.replace(temp_path, file_path)
-        print_func(f"System data saved successfully to {file_path}.")
-        return True
-    except Exception as error:
+    except Exception:
         try:
             if os.path.exists(temp_path):
                 os.remove(temp_path)
         except Exception:
             pass
+        raise
+
+
+def convert_snapshot(
+        source_path: str,
+        target_path: str,
+        print_func: Callable[[str], None] = print,
+) -> bool:
+    """
+    Converts a snapshot between the JSON and binary formats and between
+    compressions (both chosen by the suffixes of the paths)
+
+    The snapshot is streamed section by section; the in-memory system state
+    is not touched.
+
+    Inputs:
+        source_path: snapshot to read
+        target_path: snapshot to write
+        print_func: function that prints out the result
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+
+    try:
+        if is_sharded_snapshot(source_path):
+            _convert_sections(_read_shards(source_path), target_path)
+        else:
+            _convert_sections(_read_sections(source_path, is_binary_snapshot(source_path)), target_path)
+
+        print_func(f"Converted {source_path} to {target_path}.")
+        return True
+    except Exception as error:
+        print_func(f"Failed to convert {source_path} to {target_path}. Reason: {error}")
+        log_error(
+            "Failed to convert snapshot", event = "snapshot_convert_failed",
+            source = source_path, target = target_path, error = str(error),
+        )
+        return False
+
+
+def _convert_sections(source_sections: Iterable[Tuple[str, Any]], target_path: str) -> None:
+    """
+    Writes the sections read from one snapshot into a snapshot of the target's format
+    """
+
+    target_binary = is_binary_snapshot(target_path)
+    sections = (
+        # the binary writer may need a second pass over a section
+        (name, list(value) if target_binary and isinstance(value, Iterator) else value)
+        for name, value in source_sections
+    )
+
+    if is_sharded_snapshot(target_path):
+        _write_shards(target_path, sections, target_binary, SHARD_SECTIONS)
+    else:
+        _write_snapshot_file(target_path, sections, target_binary)
+
+
+@timed()
+def save_system_data(
+        file_path: str = "system_data.json",
+        print_func: Callable[[str], None] = print,
+        binary: Optional[bool] = None,
+        only_if_changed: bool = False,
+) -> bool:
+    """
+    Saves the system state into a JSON (or binary) snapshot file
 
+    The snapshot is compressed on the fly if file_path ends in ".gz", ".bz2" or ".xz".
+    If file_path is a sharded snapshot directory, only the section files whose
+    sections changed since the last save or load are rewritten.
+
+    Inputs:
+        file_path: path to save the system state to
+        print_func: function that prints out the system state
+        binary: write the binary format; None picks it by the ".bin" suffix
+        only_if_changed: skip the write if no section changed since file_path
+            was last saved or loaded
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+
+    if binary is None:
+        binary = is_binary_snapshot(file_path)
+
+    changed = changed_sections(file_path)
+    if only_if_changed and not changed:
+        print_func(f"No changes since the last save; {file_path} is up to date.")
+        return True
+
+    try:
+        with SAVE_LOCK:
+            versions = _section_versions()
+            if is_sharded_snapshot(file_path):
+                _write_shards(file_path, _store_sections(), binary, changed)
+            else:
+                _write_snapshot_file(file_path, _store_sections(), binary)
+            _remember_snapshot_state(file_path, versions)
+
+        # the snapshot now holds every journaled change
+        if ACTIVE_JOURNAL is not None and JOURNAL_SNAPSHOT_PATH == file_path:
+            ACTIVE_JOURNAL.truncate()
+
+        print_func(f"System data saved successfully to {file_path}.")
+        return True
+    except Exception as error:
         print_func(
             f"Failed to save system state to {file_path}. Reason: {error}"
         )
         return False
 
 
+def capture_system_snapshot() -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Copies the system state along with the section versions it reflects
+
+    The caller must make sure no other thread changes the stores while the
+    copy is taken (see app.data_store.STORE_LOCK).
+
+    Inputs:
+        None
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any]]: the build_system_snapshot() copy and its section versions
+    """
+
+    return build_system_snapshot(), _section_versions()
+
+
+def _is_newer_state(versions: Dict[str, Any], than: Dict[str, Any]) -> bool:
+    """
+    Tells whether any store had moved past the given versions (the ID sequences are ignored)
+    """
+
+    return any(
+        isinstance(versions.get(name), int) and isinstance(than.get(name), int) and versions[name] > than[name]
+        for name in ('users', 'schools', 'ratings', 'comments', 'favourites')
+    )
+
+
+def write_system_snapshot(
+        file_path: str,
+        snapshot: Dict[str, Any],
+        versions: Dict[str, Any],
+        binary: Optional[bool] = None,
+        journal_offset: Optional[int] = None,
+) -> bool:
+    """
+    Writes a copy taken by capture_system_snapshot to a snapshot file
+
+    The copy is not written if the file already holds a later state (e.g. a
+    save made while the copy was waiting to be written). Once it is written,
+    the first journal_offset bytes of the file's journal are dropped, since
+    the copy holds those changes; the changes journaled since are kept.
+
+    Inputs:
+        file_path: path to save the copy to
+        snapshot: the copied system state
+        versions: the section versions the copy reflects
+        binary: write the binary format; None picks it by the ".bin" suffix
+        journal_offset: journal size when the copy was taken (see journal_offset_for)
+
+    Returns:
+        bool: True if the copy was written, False if the file already held a later state
+
+    Raises:
+        Exception: Whatever writing failed with
+    """
+
+    if binary is None:
+        binary = is_binary_snapshot(file_path)
+
+    sections = list(snapshot.items())
+    if binary:
+        # the binary format stores timestamps natively
+        sections = [
+            (name, [restore_created_at(record) for record in value] if name in ('comments', 'favourites') else value)
+            for name, value in sections
+        ]
+
+    with SAVE_LOCK:
+        state = SNAPSHOT_STATES.get(file_path)
+        if state is not None and state[1] == _file_stamp(file_path) and _is_newer_state(state[0], versions):
+            return False
+
+        if is_sharded_snapshot(file_path):
+            _write_shards(file_path, sections, binary, SHARD_SECTIONS)
+        else:
+            _write_snapshot_file(file_path, sections, binary)
+        _remember_snapshot_state(file_path, versions)
+
+        if journal_offset and ACTIVE_JOURNAL is not None and JOURNAL_SNAPSHOT_PATH == file_path:
+            ACTIVE_JOURNAL.discard_before(journal_offset)
+    return True
+
+
+def journal_offset_for(file_path: str) -> Optional[int]:
+    """
+    Returns the size of the journal of a snapshot file, to be taken along with
+    a capture_system_snapshot copy (None if that file is not being journaled)
+
+    Inputs:
+        file_path: path of the snapshot
+
+    Returns:
+        Optional[int]: the journal size in bytes, or None
+    """
+
+    if ACTIVE_JOURNAL is None or JOURNAL_SNAPSHOT_PATH != file_path:
+        return None
+    return ACTIVE_JOURNAL.size
+
+
 def deserialize_comment(comment: Dict[str, Any]) -> Dict[str, Any]:
     """
     Converts a serialized comment dictionary back into in-memory format by restoring created_at
@@ -143,58 +815,456 @@ def deserialize_comment(comment: Dict[str, Any]) -> Dict[str, Any]:
     return restored
 
 
+def restore_created_at(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Restores the created_at timestamp of a freshly loaded record in place
+
+    Inputs:
+        record: loaded comment or favourite dictionary
+
+    Returns:
+        Dict[str, Any]: the same record with created_at as a datetime (None if missing or invalid)
+    """
+
+    created_at = record.get("created_at")
+
+    if isinstance(created_at, str):
+        try:
+            record["created_at"] = datetime.fromisoformat(created_at)
+
+        except ValueError:
+            record["created_at"] = None
+
+    elif not isinstance(created_at, datetime):
+        record["created_at"] = None
+
+    return record
+
+
+def deserialize_favourite(favourite: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converts a serialized favourite dictionary back into in-memory format by restoring created_at
+
+    Inputs:
+        favourite: serialized favourite dictionary
+
+    Returns:
+        Dict[str, Any]: a copy of the favourite with created_at as a datetime (None if missing or invalid)
+    """
+
+    return restore_created_at(dict(favourite))
+
+
+def migrate_school_ids(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Normalizes the school_id of each loaded record in a single pass
+
+    Older snapshots store the school ID of ratings, comments and favourites as
+    the string the user typed, so "007" and "7" are brought to the integer 7
+    here before the records reach the store indexes.
+
+    Inputs:
+        records: loaded record dictionaries
+
+    Returns:
+        Iterator[Dict[str, Any]]: the same records with normalized school IDs
+    """
+
+    for record in records:
+        school_id = record.get('school_id')
+        if type(school_id) is not int and 'school_id' in record:
+            record['school_id'] = normalize_school_id(school_id)
+        yield record
+
+
+def _stage_sections(
+        sections: Iterable[Tuple[str, Any]],
+        comment_bodies: Optional[CommentBodies] = None,
+) -> Dict[str, Any]:
+    """
+    Reads snapshot sections into new record lists without touching the stores
+
+    With a streaming reader each record is decoded once and goes straight
+    into its list, so no section is held in memory twice.
+
+    Inputs:
+        sections: (name, value) pairs of the snapshot; list sections may be any iterable
+        comment_bodies: if given, comment text is paged out into it instead of kept in memory
+
+    Returns:
+        Dict[str, Any]: the record lists by section name, plus 'sequences' if present
+
+    Raises:
+        ValueError: If a required section is missing
+    """
+
+    staged: Dict[str, Any] = {}
+
+    for key, value in sections:
+        if key == 'users':
+            staged[key] = list(value)
+
+        elif key in ('schools', 'ratings'):
+            staged[key] = list(migrate_school_ids(value))
+
+        elif key == 'comments':
+            comments = migrate_school_ids(restore_created_at(c) for c in value)
+            if comment_bodies is not None:
+                comments = comment_bodies.page_out(comments)
+            staged[key] = list(comments)
+
+        # favourites are optional to preserve backward compatibility
+        elif key == 'favourites':
+            if isinstance(value, (list, Iterator)):
+                staged[key] = list(migrate_school_ids(restore_created_at(f) for f in value))
+            else:
+                staged[key] = []
+
+        elif key == 'sequences':
+            staged[key] = value
+
+    required_keys = {"users", "schools", "ratings", "comments"}
+    if not required_keys.issubset(staged):
+        raise ValueError("Invalid system snapshot format")
+
+    return staged
+
+
+def _install_sections(staged: Dict[str, Any]) -> None:
+    """
+    Replaces the contents of every store with staged record lists and rebuilds the indexes
+
+    Inputs:
+        staged: record lists by section name (see _stage_sections)
+
+    Returns:
+        None
+    """
+
+    load_users(staged.get('users', []))
+    load_schools(staged.get('schools', []))
+    load_ratings(staged.get('ratings', []))
+    load_comments(staged.get('comments', []))
+    load_favourites(staged.get('favourites', []))
+
+    # ID sequences are optional; older snapshots fall back to the highest
+    # IDs seen while the indexes were rebuilt above
+    sequences = staged.get('sequences')
+    if isinstance(sequences, dict):
+        USERS.restore_sequence(sequences.get('users'))
+        SCHOOLS.restore_sequence(sequences.get('schools'))
+        COMMENTS.restore_sequence(sequences.get('comments'))
+
+
+def _capture_stores() -> Dict[str, Any]:
+    """
+    Copies the record lists and ID sequences of the stores (not the records themselves)
+    """
+
+    staged: Dict[str, Any] = {
+        name: list(store)
+        for name, store in (('users', USERS), ('schools', SCHOOLS), ('ratings', RATINGS),
+                            ('comments', COMMENTS), ('favourites', FAVOURITES))
+    }
+    staged['sequences'] = {'users': USERS.last_id, 'schools': SCHOOLS.last_id, 'comments': COMMENTS.last_id}
+    return staged
+
+
+@timed()
 def load_system_data(
         file_path: str = "system_data.json",
-        print_func: Callable[[str], None] = print
+        print_func: Callable[[str], None] = print,
+        streaming: bool = True,
+        binary: Optional[bool] = None,
+        lazy_comments: bool = False,
 ) -> bool:
     """
-    Loads the system state from a JSON file
+    Loads the system state from a JSON (or binary) snapshot file
+
+    By default the snapshot is streamed section by section into new record
+    lists (see app.snapshot_reader), so no JSON document tree is built. With
+    streaming=False a JSON snapshot is parsed with json.load first. Either
+    way the stores are only replaced once the whole snapshot was read and
+    checked, and if the load fails (including the journal replay) they keep
+    the state they had before. Snapshots whose
+    path ends in ".gz", ".bz2" or ".xz" are decompressed on the fly. The
+    section files of a sharded snapshot directory are read concurrently.
+    With lazy_comments=True only comment metadata stays in memory; the text
+    is read back from a temporary file when it is used (see app.comment_bodies).
 
     Inputs:
         file_path: path to load the system state from
         print_func: function that prints out the system state
+        streaming: whether to stream a JSON snapshot instead of parsing it in one go
+        binary: read the binary format; None picks it by the ".bin" suffix
+        lazy_comments: whether to keep comment text out of memory until it is used
 
     Returns:
         bool: True if successful, False otherwise
     """
 
-    if not os.path.exists(file_path):
+    global ACTIVE_COMMENT_BODIES
+
+    journal_path = journal_path_for(file_path)
+    if binary is None:
+        binary = is_binary_snapshot(file_path)
+
+    if not os.path.exists(file_path) and not os.path.exists(journal_path):
         print_func(f"No saved system data found at {file_path}.")
         return False
 
+    previous = None
+    comment_bodies = CommentBodies() if lazy_comments else None
+
     try:
-        with open(file_path, 'r', encoding = "utf-8") as file:
-            snapshot = json.load(file)
+        if not os.path.exists(file_path):
+            # changes were journaled before any full snapshot was written
+            staged = {}
 
-        required_keys = {"users", "schools", "ratings", "comments"}
-        if not required_keys.issubset(snapshot.keys()):
-            raise ValueError("Invalid system snapshot format")
+        elif is_sharded_snapshot(file_path):
+            staged = _stage_sections(_read_shards(file_path), comment_bodies)
 
-        USERS.clear()
-        USERS.extend(snapshot['users'])
+        elif streaming or binary:
+            staged = _stage_sections(_read_sections(file_path, binary), comment_bodies)
 
-        SCHOOLS.clear()
-        SCHOOLS.extend(snapshot['schools'])
+        else:
+            with _open_snapshot(file_path, binary = False) as file:
+                snapshot = json.load(file)
+            staged = _stage_sections(snapshot.items(), comment_bodies)
 
-        RATINGS.clear()
-        RATINGS.extend(snapshot['ratings'])
+        # everything was read: swap the new state in
+        previous = _capture_stores()
+        _install_sections(staged)
+        if os.path.exists(file_path):
+            _remember_snapshot_state(file_path, _section_versions())
 
-        COMMENTS.clear()
-        for comment in snapshot['comments']:
-            COMMENTS.append(deserialize_comment(comment))
+        # changes made after the last checkpoint (e.g. before an unclean shutdown)
+        started = time.perf_counter()
+        replayed = replay_journal(journal_path)
+        if replayed:
+            elapsed = time.perf_counter() - started
+            msg = f"Recovered {replayed} un-checkpointed change(s) from {journal_path} in {elapsed:.3f}s."
+            print_func(msg)
+            log_event(
+                "Recovered un-checkpointed changes", event = "journal_recovered",
+                path = journal_path, changes = replayed, seconds = round(elapsed, 3),
+            )
 
-        # favourites are optional to preserve backward compatibility
-        FAVOURITES.clear()
-        if 'favourites' in snapshot and isinstance(snapshot['favourites'], list):
-            FAVOURITES.extend(snapshot['favourites'])
+        # the comments that read their text from the old file were replaced
+        if ACTIVE_COMMENT_BODIES is not None:
+            ACTIVE_COMMENT_BODIES.close()
+        ACTIVE_COMMENT_BODIES = comment_bodies
 
         print_func(f"System data loaded successfully from {file_path}.")
-        log_event(f"System data saved to {file_path}")
+        log_event("System data loaded", event = "snapshot_loaded", path = file_path)
         return True
 
     except Exception as error:
+        # never leave a half-loaded snapshot or half-replayed journal behind
+        if previous is not None:
+            _install_sections(previous)
+        if comment_bodies is not None:
+            comment_bodies.close()
+
         print_func(
             f"Failed to load system data from {file_path}. Reason: {error}"
         )
-        log_error(f"Failed to load system data: {error}")
+        log_error("Failed to load system data", event = "snapshot_load_failed", path = file_path, error = str(error))
         return False
+
+
+def _find_stored_record(collection: str, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Finds the stored record a journal entry refers to through the store indexes
+
+    Inputs:
+        collection: name of the collection
+        record: the journaled record (or just its key fields)
+
+    Returns:
+        Optional[Dict[str, Any]]: the stored record, or None if it is not stored
+    """
+
+    if collection == "users":
+        return USERS.get_by_id(record.get("user_id"))
+    if collection == "schools":
+        return SCHOOLS.get_by_id(record.get("school_id"))
+    if collection == "ratings":
+        return RATINGS.find(record.get("user_id"), record.get("school_id"))
+    if collection == "comments":
+        return COMMENTS.get_by_id(record.get("comment_id"))
+    return FAVOURITES.find(record.get("user_id"), record.get("school_id"))
+
+
+def apply_journal_entry(entry: Dict[str, Any]) -> None:
+    """
+    Applies one journaled change to the in-memory stores
+
+    Entries are idempotent, so replaying a change that is already part of
+    the snapshot leaves the state unchanged.
+
+    Inputs:
+        entry: journal entry with the collection ("c"), action ("op") and record ("r")
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: If the entry names an unknown collection or action
+    """
+
+    stores = {"users": USERS, "schools": SCHOOLS, "ratings": RATINGS, "comments": COMMENTS, "favourites": FAVOURITES}
+    collection = entry.get("c")
+    action = entry.get("op")
+    if collection not in stores or action not in ("put", "delete"):
+        raise ValueError(f"Invalid journal entry: {entry}")
+
+    store = stores[collection]
+    record = entry.get("r") or {}
+    if collection == "comments":
+        record = deserialize_comment(record)
+    elif collection == "favourites":
+        record = deserialize_favourite(record)
+
+    existing = _find_stored_record(collection, record)
+
+    if action == "delete":
+        if existing is not None:
+            store.discard(existing)
+    elif existing is None:
+        store.append(record)
+    elif collection != "favourites":
+        store.update_record(existing, record)
+
+
+def replay_journal(journal_path: str) -> int:
+    """
+    Replays every change of a journal file over the currently loaded state
+
+    Inputs:
+        journal_path: path of the journal file
+
+    Returns:
+        int: number of changes replayed
+    """
+
+    replayed = 0
+    for entry in read_journal(journal_path):
+        apply_journal_entry(entry)
+        replayed += 1
+    return replayed
+
+
+def _journal_mutation(collection: str, action: str, record: Dict[str, Any]) -> None:
+    """
+    Mutation listener that appends each change to the active journal before
+    it is made, checkpointing first once the journal passes the size
+    threshold (on the CHECKPOINT_SCHEDULER's thread if one takes it)
+
+    If the change cannot be journaled, ChangeNotSavedError is raised so the
+    change is refused and the stores keep matching what is on disk.
+    """
+
+    if ACTIVE_JOURNAL is None:
+        return
+
+    # the stores still match the journal here, so a checkpoint holds every journaled change
+    if ACTIVE_JOURNAL.size >= CHECKPOINT_BYTES:
+        if CHECKPOINT_SCHEDULER is None or not CHECKPOINT_SCHEDULER(JOURNAL_SNAPSHOT_PATH):
+            checkpoint_system_data()
+
+    try:
+        ACTIVE_JOURNAL.append(collection, action, record)
+    except Exception as error:
+        log_error(
+            "Failed to journal a change", event = "journal_write_failed",
+            collection = collection, action = action, error = str(error),
+        )
+        raise ChangeNotSavedError(f"The change could not be saved: {error}") from error
+
+
+def enable_journal(
+        file_path: str = "system_data.json",
+        checkpoint_bytes: int = DEFAULT_CHECKPOINT_BYTES,
+        sync_every: int = DEFAULT_SYNC_EVERY,
+        sync_interval: float = DEFAULT_SYNC_INTERVAL,
+) -> Journal:
+    """
+    Starts appending every change to the journal next to a snapshot file
+
+    Inputs:
+        file_path: path of the snapshot the journal belongs to
+        checkpoint_bytes: journal size after which it is folded into a new snapshot
+        sync_every: number of changes forced to disk together (group commit)
+        sync_interval: seconds since the last fsync after which the next change
+            is forced to disk even if its group is not full
+
+    Returns:
+        Journal: the opened journal
+    """
+
+    global ACTIVE_JOURNAL, JOURNAL_SNAPSHOT_PATH, CHECKPOINT_BYTES
+
+    disable_journal()
+    ACTIVE_JOURNAL = Journal(journal_path_for(file_path), sync_every, sync_interval)
+    JOURNAL_SNAPSHOT_PATH = file_path
+    CHECKPOINT_BYTES = checkpoint_bytes
+    add_mutation_listener(_journal_mutation)
+    return ACTIVE_JOURNAL
+
+
+def disable_journal() -> None:
+    """
+    Stops journaling changes and closes the journal file
+
+    Inputs:
+        None
+
+    Returns:
+        None
+    """
+
+    global ACTIVE_JOURNAL, JOURNAL_SNAPSHOT_PATH
+
+    remove_mutation_listener(_journal_mutation)
+    if ACTIVE_JOURNAL is not None:
+        ACTIVE_JOURNAL.close()
+    ACTIVE_JOURNAL = None
+    JOURNAL_SNAPSHOT_PATH = None
+
+
+def set_checkpoint_scheduler(scheduler: Optional[Callable[[str], bool]]) -> None:
+    """
+    Sets the function that journal checkpoints are handed to (None writes them on the calling thread)
+
+    Inputs:
+        scheduler: called with the snapshot path once the journal passes
+            the size threshold; returns True if it takes the checkpoint over
+
+    Returns:
+        None
+    """
+
+    global CHECKPOINT_SCHEDULER
+
+    CHECKPOINT_SCHEDULER = scheduler
+
+
+def checkpoint_system_data(print_func: Callable[[str], None] = lambda _: None) -> bool:
+    """
+    Folds the active journal into a new full snapshot and empties the journal
+
+    Inputs:
+        print_func: function that prints out the result of the save
+
+    Returns:
+        bool: True if a checkpoint was written, False otherwise
+    """
+
+    if ACTIVE_JOURNAL is None:
+        return False
+
+    saved = save_system_data(file_path = JOURNAL_SNAPSHOT_PATH, print_func = print_func)
+    if saved:
+        log_event("Journal checkpointed", event = "journal_checkpoint", path = JOURNAL_SNAPSHOT_PATH)
+    return saved
@@ -6,15 +6,409 @@ Implements:
 Later user stories (US18 - View Comments, favourites, etc.) can reuse
 the data structures defined here.
 """
-from typing import Callable, Tuple, List, Dict, Optional
+from typing import Callable, Tuple, List, Dict, Optional, Union
+from bisect import bisect_left, insort
 from datetime import datetime, timezone
 
-from .data_store import get_current_user, SCHOOLS
+from .data_store import (
+    get_current_user,
+    get_school_names,
+    normalize_school_id,
+    notify_mutation,
+    store_write,
+    UnorderedIndexedList,
+)
 from .validation import validate_rating_input
+from .metrics import timed
 
-RATINGS: List[Dict] = []
-COMMENTS: List[Dict] = []
-FAVOURITES: List[Dict] = []
+
+# Key of a school in the per-school indexes: the integer school ID, or the
+# stripped string for non-numeric IDs (see normalize_school_id)
+SchoolKey = Union[int, str]
+
+# Number of comments view_comments_for_school displays per page, newest first
+COMMENT_PAGE_SIZE = 20
+
+
+def _school_key(school_id) -> SchoolKey:
+    """
+    Normalizes a school ID into the key used by the per-school indexes.
+
+    Inputs:
+        school_id: School ID as stored on a record (int or str)
+
+    Returns:
+        The integer school ID for numeric IDs, otherwise the stripped string
+    """
+    if type(school_id) is int:
+        return school_id
+    return normalize_school_id(school_id)
+
+
+class RatingStore(UnorderedIndexedList):
+    """
+    The global list of ratings, with a running (sum, count) per school.
+
+    The totals are adjusted as ratings are added, removed or changed, so
+    averages can be read without walking every rating. Ratings are also
+    indexed by (user_id, school_id), by user and by school, and are only
+    looked up through those indexes, so removing one swaps the last rating
+    into its slot instead of shifting every later rating.
+    """
+
+    def _reset_indexes(self) -> None:
+        self._totals: Dict[SchoolKey, List[int]] = {}
+        # every rating row per school, including ones without a usable value
+        self._counts: Dict[SchoolKey, int] = {}
+        self._by_pair: Dict[Tuple[int, SchoolKey], Dict] = {}
+        self._by_user: Dict[int, Dict[SchoolKey, Dict]] = {}
+        self._by_school: Dict[SchoolKey, Dict[int, Dict]] = {}
+        # (user, school) pairs that were added more than once directly to the list
+        self._shadowed_pairs = set()
+
+    @staticmethod
+    def _rating_value(record: Dict) -> Optional[int]:
+        value = record.get("value")
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _index(self, record: Dict) -> None:
+        user_id = record.get("user_id")
+        key = _school_key(record.get("school_id"))
+        self._counts[key] = self._counts.get(key, 0) + 1
+        pair = (user_id, key)
+        if pair in self._by_pair:
+            self._shadowed_pairs.add(pair)
+        else:
+            self._by_pair[pair] = record
+            self._by_user.setdefault(user_id, {})[key] = record
+            self._by_school.setdefault(key, {})[user_id] = record
+
+        value = self._rating_value(record)
+        if value is None:
+            return
+        totals = self._totals.setdefault(key, [0, 0])
+        totals[0] += value
+        totals[1] += 1
+
+    def _unindex(self, record: Dict) -> None:
+        user_id = record.get("user_id")
+        key = _school_key(record.get("school_id"))
+        remaining = self._counts.get(key, 0) - 1
+        if remaining > 0:
+            self._counts[key] = remaining
+        else:
+            self._counts.pop(key, None)
+        pair = (user_id, key)
+        if self._by_pair.get(pair) is record:
+            self._unindex_pair(pair)
+            if pair in self._shadowed_pairs:
+                for other in self:
+                    if other.get("user_id") == user_id and _school_key(other.get("school_id")) == key:
+                        self._by_pair[pair] = other
+                        self._by_user.setdefault(user_id, {})[key] = other
+                        self._by_school.setdefault(key, {})[user_id] = other
+                        break
+
+        value = self._rating_value(record)
+        if value is None:
+            return
+        totals = self._totals.get(key)
+        if totals is None:
+            return
+        totals[0] -= value
+        totals[1] -= 1
+        if totals[1] <= 0:
+            del self._totals[key]
+
+    def _unindex_pair(self, pair: Tuple[int, SchoolKey]) -> None:
+        user_id, key = pair
+        del self._by_pair[pair]
+
+        user_ratings = self._by_user.get(user_id)
+        if user_ratings is not None:
+            user_ratings.pop(key, None)
+            if not user_ratings:
+                del self._by_user[user_id]
+
+        school_ratings = self._by_school.get(key)
+        if school_ratings is not None:
+            school_ratings.pop(user_id, None)
+            if not school_ratings:
+                del self._by_school[key]
+
+    def find(self, user_id: int, school_id) -> Optional[Dict]:
+        return self._by_pair.get((user_id, _school_key(school_id)))
+
+    def for_user(self, user_id: int) -> List[Dict]:
+        return list(self._by_user.get(user_id, {}).values())
+
+    def for_school(self, school_id) -> List[Dict]:
+        return list(self._by_school.get(_school_key(school_id), {}).values())
+
+    def update_value(self, record: Dict, value: int) -> None:
+        """
+        Changes the value of a stored rating and adjusts the school totals.
+
+        Inputs:
+            record (Dict): The rating dict to change
+            value (int): The new rating value
+
+        Returns:
+            None
+        """
+        self._unindex(record)
+        record["value"] = value
+        self._index(record)
+        self.mark_changed()
+
+    def count_for_school(self, school_id) -> int:
+        return self._counts.get(_school_key(school_id), 0)
+
+    def get_totals(self, school_id) -> Optional[Tuple[int, int]]:
+        totals = self._totals.get(_school_key(school_id))
+        if totals is None:
+            return None
+        return totals[0], totals[1]
+
+    def get_averages(self) -> Dict[SchoolKey, float]:
+        return {key: total / count for key, (total, count) in self._totals.items()}
+
+
+RATINGS: RatingStore = RatingStore()
+
+
+def _created_at_key(created_at) -> Tuple:
+    """
+    Builds a sort key for a comment timestamp that never raises on comparison.
+
+    Naive datetimes are treated as UTC, missing timestamps sort first and any
+    other value sorts last by its string form.
+
+    Inputs:
+        created_at: The created_at value stored on a comment
+
+    Returns:
+        Tuple: A key that orders comments from oldest to newest
+    """
+    if created_at is None:
+        return (0, None)
+    if isinstance(created_at, datetime):
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        return (1, created_at)
+    return (2, str(created_at))
+
+
+class CommentStore(UnorderedIndexedList):
+    """
+    The global list of comments, indexed by comment_id, per school and per (user, school).
+
+    Each school keeps its comments in created_at order (ties in the order the
+    comments were added), so a school's comments can be read without
+    filtering and sorting the whole list.
+
+    Comments are found through the indexes rather than by list position, so
+    discard() removes a comment in O(1) and the order of the list itself is
+    not meaningful.
+    """
+
+    def _reset_indexes(self) -> None:
+        self._by_id: Dict[int, Dict] = {}
+        self._last_id = 0
+        self._by_school: Dict[SchoolKey, List[Dict]] = {}
+        self._by_user_school: Dict[Tuple[int, SchoolKey], List[Dict]] = {}
+        self._seq_of: Dict[int, int] = {}
+        self._next_seq = 0
+
+    def _assign_id(self, record: Dict) -> None:
+        # comments from old snapshots (or appended directly) get the next ID
+        comment_id = record.get("comment_id")
+        if not isinstance(comment_id, int) or comment_id in self._by_id:
+            comment_id = self.next_id()
+            record["comment_id"] = comment_id
+        self._observe_id(comment_id)
+        self._by_id[comment_id] = record
+
+    def get_by_id(self, comment_id: int) -> Optional[Dict]:
+        return self._by_id.get(comment_id)
+
+    def _order_key(self, record: Dict) -> Tuple:
+        # newer additions sort first among equal timestamps, so reading the
+        # bucket backwards gives newest first with ties in insertion order
+        return _created_at_key(record.get("created_at")), -self._seq_of[id(record)]
+
+    def _index(self, record: Dict) -> None:
+        self._assign_id(record)
+        self._next_seq += 1
+        self._seq_of[id(record)] = self._next_seq
+        key = _school_key(record.get("school_id"))
+        insort(self._by_school.setdefault(key, []), record, key=self._order_key)
+        self._by_user_school.setdefault((record.get("user_id"), key), []).append(record)
+
+    def rebuild_indexes(self) -> None:
+        # group first and sort each school once rather than inserting one by one
+        self._reset_indexes()
+        for record in self:
+            self._assign_id(record)
+            self._next_seq += 1
+            self._seq_of[id(record)] = self._next_seq
+            key = _school_key(record.get("school_id"))
+            self._by_school.setdefault(key, []).append(record)
+            self._by_user_school.setdefault((record.get("user_id"), key), []).append(record)
+        for bucket in self._by_school.values():
+            bucket.sort(key=self._order_key)
+
+    def _unindex(self, record: Dict) -> None:
+        if id(record) not in self._seq_of:
+            return
+        if self._by_id.get(record.get("comment_id")) is record:
+            del self._by_id[record["comment_id"]]
+        key = _school_key(record.get("school_id"))
+        self._remove_from_school(key, record)
+        del self._seq_of[id(record)]
+
+        pair = (record.get("user_id"), key)
+        mine = self._by_user_school.get(pair, [])
+        for i, existing in enumerate(mine):
+            if existing is record:
+                del mine[i]
+                break
+        if not mine:
+            self._by_user_school.pop(pair, None)
+
+    def _remove_from_school(self, key: SchoolKey, record: Dict) -> None:
+        bucket = self._by_school.get(key, [])
+        position = bisect_left(bucket, self._order_key(record), key=self._order_key)
+        if position < len(bucket) and bucket[position] is record:
+            del bucket[position]
+        else:
+            for i, existing in enumerate(bucket):
+                if existing is record:
+                    del bucket[i]
+                    break
+        if not bucket:
+            self._by_school.pop(key, None)
+
+    def update_comment(self, record: Dict, text: str, created_at) -> None:
+        """
+        Changes the text and timestamp of a stored comment and re-sorts it
+        within its school. Its place among the user's own comments is kept.
+
+        Inputs:
+            record (Dict): The comment dict to change
+            text (str): The new comment text
+            created_at: The new created_at timestamp
+
+        Returns:
+            None
+        """
+        key = _school_key(record.get("school_id"))
+        if id(record) in self._seq_of:
+            self._remove_from_school(key, record)
+        record["text"] = text
+        record["created_at"] = created_at
+        if id(record) in self._seq_of:
+            insort(self._by_school.setdefault(key, []), record, key=self._order_key)
+        self.mark_changed()
+
+    def for_school(
+            self,
+            school_id,
+            newest_first: bool = True,
+            limit: Optional[int] = None,
+            offset: int = 0,
+    ) -> List[Dict]:
+        bucket = self._by_school.get(_school_key(school_id), [])
+        if newest_first:
+            end = max(len(bucket) - offset, 0)
+            page = bucket[:end] if limit is None else bucket[max(end - limit, 0):end]
+            return page[::-1]
+        # the bucket is already oldest first, only comments with equal
+        # timestamps are stored newest first: flip each run of them
+        ordered = []
+        start = 0
+        while start < len(bucket) and (limit is None or len(ordered) < offset + limit):
+            key = _created_at_key(bucket[start].get("created_at"))
+            end = start + 1
+            while end < len(bucket) and _created_at_key(bucket[end].get("created_at")) == key:
+                end += 1
+            ordered.extend(reversed(bucket[start:end]))
+            start = end
+        return ordered[offset:] if limit is None else ordered[offset:offset + limit]
+
+    def count_for_school(self, school_id) -> int:
+        return len(self._by_school.get(_school_key(school_id), []))
+
+    def for_user_school(self, user_id: int, school_id) -> List[Dict]:
+        return list(self._by_user_school.get((user_id, _school_key(school_id)), []))
+
+
+COMMENTS: CommentStore = CommentStore()
+
+
+class FavouriteStore(UnorderedIndexedList):
+    """
+    The global list of favourites, indexed per user and per (user, school),
+    with a count of favourites per school.
+
+    Each user maps to their favourite records in the order they were added.
+    """
+
+    def _reset_indexes(self) -> None:
+        self._by_user: Dict[int, Dict[int, Dict]] = {}
+        self._by_pair: Dict[Tuple[int, SchoolKey], Dict] = {}
+        self._school_counts: Dict[SchoolKey, int] = {}
+        # (user, school) pairs that were added more than once directly to the list
+        self._shadowed_pairs = set()
+
+    def _index(self, record: Dict) -> None:
+        user_id = record.get("user_id")
+        key = _school_key(record.get("school_id"))
+        self._by_user.setdefault(user_id, {})[id(record)] = record
+        self._school_counts[key] = self._school_counts.get(key, 0) + 1
+        if (user_id, key) in self._by_pair:
+            self._shadowed_pairs.add((user_id, key))
+        else:
+            self._by_pair[(user_id, key)] = record
+
+    def _unindex(self, record: Dict) -> None:
+        user_id = record.get("user_id")
+        key = _school_key(record.get("school_id"))
+        mine = self._by_user.get(user_id)
+        if mine is None or mine.pop(id(record), None) is None:
+            return
+        if not mine:
+            del self._by_user[user_id]
+
+        self._school_counts[key] -= 1
+        if self._school_counts[key] <= 0:
+            del self._school_counts[key]
+
+        pair = (user_id, key)
+        if self._by_pair.get(pair) is record:
+            del self._by_pair[pair]
+            if pair in self._shadowed_pairs:
+                for other in (mine or {}).values():
+                    if _school_key(other.get("school_id")) == key:
+                        self._by_pair[pair] = other
+                        break
+
+    def find(self, user_id: int, school_id) -> Optional[Dict]:
+        return self._by_pair.get((user_id, _school_key(school_id)))
+
+    def for_user(self, user_id: int) -> List[Dict]:
+        return list(self._by_user.get(user_id, {}).values())
+
+    def count_for_school(self, school_id) -> int:
+        return self._school_counts.get(_school_key(school_id), 0)
+
+
+FAVOURITES: FavouriteStore = FavouriteStore()
 
 
 def clear_ratings() -> None:
@@ -30,6 +424,19 @@ def clear_ratings() -> None:
     RATINGS.clear()
 
 
+def load_ratings(ratings: List[Dict]) -> None:
+    """
+    Replaces all ratings (e.g. from a saved snapshot) and rebuilds the per-school totals once.
+
+    Inputs:
+        ratings (List[Dict]): The rating dicts to load
+
+    Returns:
+        None
+    """
+    RATINGS.replace_all(ratings)
+
+
 def clear_comments() -> None:
     """
     Clears all stored comments (test helper).
@@ -43,6 +450,32 @@ def clear_comments() -> None:
     COMMENTS.clear()
 
 
+def load_comments(comments: List[Dict]) -> None:
+    """
+    Replaces all comments (e.g. from a saved snapshot) and rebuilds the comment indexes once.
+
+    Inputs:
+        comments (List[Dict]): The comment dicts to load
+
+    Returns:
+        None
+    """
+    COMMENTS.replace_all(comments)
+
+
+def load_favourites(favourites: List[Dict]) -> None:
+    """
+    Replaces all favourites (e.g. from a saved snapshot) and rebuilds the favourites indexes once.
+
+    Inputs:
+        favourites (List[Dict]): The favourite dicts to load
+
+    Returns:
+        None
+    """
+    FAVOURITES.replace_all(favourites)
+
+
 def clear_favourites() -> None:
     """
     Clears all favourites (test helper).
@@ -58,7 +491,7 @@ def clear_favourites() -> None:
 
 def find_rating(user_id: int, school_id: str) -> Optional[Dict]:
     """
-    Finds an existing rating for a given (user, school) pair.
+    Finds an existing rating for a given (user, school) pair using the pair index.
 
     Inputs:
         user_id (int): ID of the user who created the rating
@@ -67,12 +500,11 @@ def find_rating(user_id: int, school_id: str) -> Optional[Dict]:
     Returns:
         Optional[Dict]: The rating dict if found, otherwise None
     """
-    for rating in RATINGS:
-        if rating.get("user_id") == user_id and rating.get("school_id") == school_id:
-            return rating
-    return None
+    return RATINGS.find(user_id, school_id)
 
 
+@timed()
+@store_write
 def set_rating(user_id: int, school_id: str, value: int) -> Dict:
     """
     Creates or updates a rating for a given (user, school) pair.
@@ -87,7 +519,9 @@ def set_rating(user_id: int, school_id: str, value: int) -> Dict:
     """
     existing = find_rating(user_id, school_id)
     if existing is not None:
-        existing["value"] = value
+        if existing.get("value") != value:
+            notify_mutation("ratings", "put", {**existing, "value": value})
+            RATINGS.update_value(existing, value)
         return existing
 
     rating = {
@@ -95,10 +529,12 @@ def set_rating(user_id: int, school_id: str, value: int) -> Dict:
         "school_id": school_id,
         "value": value,
     }
+    notify_mutation("ratings", "put", rating)
     RATINGS.append(rating)
     return rating
 
 
+@store_write
 def add_comment_record(
     user_id: int,
     school_id: str,
@@ -106,7 +542,7 @@ def add_comment_record(
     created_at: Optional[datetime] = None,
 ) -> Dict:
     """
-    Creates and stores a comment record for a given school.
+    Creates and stores a comment record for a given school with the next comment_id.
 
     Inputs:
         user_id (int): ID of the user submitting the comment
@@ -121,11 +557,13 @@ def add_comment_record(
         created_at = datetime.now(timezone.utc)
 
     comment = {
+        "comment_id": COMMENTS.next_id(),
         "user_id": user_id,
         "school_id": school_id,
         "text": text,
         "created_at": created_at,
     }
+    notify_mutation("comments", "put", comment)
     COMMENTS.append(comment)
     return comment
 
@@ -141,12 +579,23 @@ def find_favourite(user_id: int, school_id: str) -> Optional[Dict]:
     Returns:
         Optional[Dict]: The favourite dict if found, otherwise None
     """
-    for fav in FAVOURITES:
-        if fav.get("user_id") == user_id and fav.get("school_id") == school_id:
-            return fav
-    return None
+    return FAVOURITES.find(user_id, school_id)
+
+
+def count_favourites_for_school(school_id: str) -> int:
+    """
+    Returns how many users have favourited a school.
+
+    Inputs:
+        school_id (str): ID of the school
+
+    Returns:
+        int: Number of users with the school in their favourites
+    """
+    return FAVOURITES.count_for_school(school_id)
 
 
+@store_write
 def add_favourite_record(
     user_id: int,
     school_id: str,
@@ -171,10 +620,12 @@ def add_favourite_record(
         "school_id": school_id,
         "created_at": created_at,
     }
+    notify_mutation("favourites", "put", fav)
     FAVOURITES.append(fav)
     return fav
 
 
+@store_write
 def remove_favourite_record(user_id: int, school_id: str) -> bool:
     """
     Removes an existing favourite record for a (user, school) pair.
@@ -186,11 +637,12 @@ def remove_favourite_record(user_id: int, school_id: str) -> bool:
     Returns:
         bool: True if a record was removed, False if not found
     """
-    for i, fav in enumerate(FAVOURITES):
-        if fav.get("user_id") == user_id and fav.get("school_id") == school_id:
-            del FAVOURITES[i]
-            return True
-    return False
+    fav = FAVOURITES.find(user_id, school_id)
+    if fav is None or not FAVOURITES.contains(fav):
+        return False
+    notify_mutation("favourites", "delete", fav)
+    FAVOURITES.discard(fav)
+    return True
 
 
 def rate_school(
@@ -229,6 +681,7 @@ def rate_school(
             print_func("School ID cannot be empty.")
             continue
 
+        school_id = normalize_school_id(school_id)
         break
 
     while True:
@@ -290,6 +743,7 @@ def add_comment(
             print_func("School ID cannot be empty.")
             continue
 
+        school_id = normalize_school_id(school_id)
         break
 
     while True:
@@ -324,37 +778,50 @@ def add_comment(
         return True, comment
 
 
-def get_comments_for_school(school_id: str, newest_first: bool = True) -> List[Dict]:
+def get_comments_for_school(
+    school_id: str,
+    newest_first: bool = True,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> List[Dict]:
     """
     Retrieves comments for a specific school, optionally sorted by recency.
 
+    Comments are read from the per-school index, which is already kept in
+    created_at order.
+
     Inputs:
         school_id (str): ID of the school to retrieve comments for
         newest_first (bool): If True, newest comments appear first
+        limit (Optional[int]): Maximum number of comments to return; all if None
+        offset (int): Number of comments to skip, in the chosen order
 
     Returns:
         List[Dict]: List of comment dicts matching the school_id
     """
-    matching = [c for c in COMMENTS if c.get("school_id") == school_id]
-    matching.sort(key=lambda c: c["created_at"], reverse=newest_first)
-    return matching
+    return COMMENTS.for_school(school_id, newest_first=newest_first, limit=limit, offset=offset)
 
 
 def view_comments_for_school(
     input_func: Callable[[str], str] = input,
     print_func: Callable[[str], None] = print,
+    page_size: Optional[int] = COMMENT_PAGE_SIZE,
 ) -> Tuple[bool, object]:
     """
     Prompts for a school ID and displays its comments to the user (US18).
 
+    Comments are shown newest first, page_size at a time; after each page
+    the user can ask for the next one.
+
     Inputs:
         input_func (Callable[[str], str]): Function used to collect user input
         print_func (Callable[[str], None]): Function used to print output/messages
+        page_size (Optional[int]): Number of comments per page; all on one page if None
 
     Returns:
         Tuple[bool, object]:
             - bool: True if the flow completed, False if cancelled/invalid
-            - object: List of comments on success, or a message string on failure/cancel
+            - object: List of displayed comments on success, or a message string on failure/cancel
     """
     print_func("\nView Comments for a School")
     print_func("Type '0' to return to the previous menu.")
@@ -370,17 +837,27 @@ def view_comments_for_school(
         print_func(msg)
         return False, msg
 
-    comments = get_comments_for_school(school_id)
-    if not comments:
+    total = COMMENTS.count_for_school(school_id)
+    if not total:
         msg = f"No comments found for school '{school_id}'."
         print_func(msg)
         return True, []
 
     print_func(f"\nComments for school '{school_id}':")
-    for c in comments:
-        ts = c["created_at"].strftime("%Y-%m-%d %H:%M:%S UTC")
-        print_func(f"- ({ts}) User {c['user_id']}: {c['text']}")
-    return True, comments
+    shown = []
+    while True:
+        page = get_comments_for_school(school_id, limit=page_size, offset=len(shown))
+        for c in page:
+            ts = c["created_at"].strftime("%Y-%m-%d %H:%M:%S UTC")
+            print_func(f"- ({ts}) User {c['user_id']}: {c['text']}")
+        shown.extend(page)
+
+        if not page or len(shown) >= total:
+            return True, shown
+
+        print_func(f"(showing {len(shown)} of {total} comments)")
+        if input_func("Press Enter for the next page, or '0' to stop: ").strip() == "0":
+            return True, shown
 
 
 def get_user_comments_for_school(user_id: int, school_id: str) -> List[Dict]:
@@ -394,9 +871,10 @@ def get_user_comments_for_school(user_id: int, school_id: str) -> List[Dict]:
     Returns:
         List[Dict]: List of comment dicts matching the (user_id, school_id) pair
     """
-    return [c for c in COMMENTS if c.get("user_id") == user_id and c.get("school_id") == school_id]
+    return COMMENTS.for_user_school(user_id, school_id)
 
 
+@store_write
 def edit_comment_record(comment: Dict, new_text: str, max_length: int = 500) -> Tuple[bool, str]:
     """
     Edits the text of a specific comment dict with basic validation.
@@ -422,8 +900,10 @@ def edit_comment_record(comment: Dict, new_text: str, max_length: int = 500) ->
     if len(stripped) > max_length:
         return False, f"Comment must be at most {max_length} characters."
 
-    comment["text"] = stripped
-    comment["created_at"] = datetime.now(timezone.utc)  # treat edit as updated timestamp
+    # treat edit as updated timestamp
+    edited_at = datetime.now(timezone.utc)
+    notify_mutation("comments", "put", {**comment, "text": stripped, "created_at": edited_at})
+    COMMENTS.update_comment(comment, stripped, edited_at)
     return True, "OK"
 
 
@@ -519,7 +999,7 @@ def edit_my_comment(
 
 def get_average_rating_for_school(school_id: str) -> Optional[float]:
     """
-    Computes the average rating for a given school (US19 helper).
+    Returns the average rating for a given school from its running totals (US19 helper).
 
     Inputs:
         school_id (str): ID of the school to compute average for
@@ -527,12 +1007,25 @@ def get_average_rating_for_school(school_id: str) -> Optional[float]:
     Returns:
         Optional[float]: Average rating if ratings exist, otherwise None
     """
-    matching = [r for r in RATINGS if r.get("school_id") == school_id]
-    if not matching:
+    totals = RATINGS.get_totals(school_id)
+    if totals is None:
         return None
 
-    total = sum(int(r.get("value", 0)) for r in matching)
-    return total / len(matching)
+    total, count = totals
+    return total / count
+
+
+def get_average_ratings() -> Dict[object, float]:
+    """
+    Returns the average rating of every rated school from the running totals.
+
+    Inputs:
+        None
+
+    Returns:
+        Dict[object, float]: Mapping of normalized school_id (int for numeric IDs) to average rating
+    """
+    return RATINGS.get_averages()
 
 
 def view_average_rating_for_school(
@@ -578,6 +1071,7 @@ def view_average_rating_for_school(
     return True, avg
 
 
+@store_write
 def delete_comment_record(comment: Dict) -> Dict:
     """
     Deletes a specific comment dict from the global COMMENTS list.
@@ -587,11 +1081,30 @@ def delete_comment_record(comment: Dict) -> Dict:
 
     Returns:
         Dict: The removed comment dict
+
+    Raises:
+        ValueError: If the comment is not stored in COMMENTS
     """
-    COMMENTS.remove(comment)
+    if not COMMENTS.contains(comment):
+        raise ValueError("Comment not found")
+    notify_mutation("comments", "delete", comment)
+    COMMENTS.discard(comment)
     return comment
 
 
+def get_comment_by_id(comment_id: int) -> Optional[Dict]:
+    """
+    Looks up a comment by its comment_id.
+
+    Inputs:
+        comment_id (int): ID of the comment
+
+    Returns:
+        Optional[Dict]: The comment dict if found, otherwise None
+    """
+    return COMMENTS.get_by_id(comment_id)
+
+
 def delete_my_comment(
     input_func: Callable[[str], str] = input,
     print_func: Callable[[str], None] = print,
@@ -675,12 +1188,12 @@ def get_favourites_for_user(user_id: int) -> List[Dict]:
     Returns:
         List[Dict]: List of favourite dicts for the given user_id
     """
-    return [f for f in FAVOURITES if f.get("user_id") == user_id]
+    return FAVOURITES.for_user(user_id)
 
 
 def _find_school_name(school_id: str) -> Optional[str]:
     """
-    Looks up a school name in SCHOOLS for display purposes.
+    Looks up a school name through the school_id index for display purposes.
 
     Inputs:
         school_id (str): ID of the school to search for
@@ -688,10 +1201,7 @@ def _find_school_name(school_id: str) -> Optional[str]:
     Returns:
         Optional[str]: School name if found, otherwise None
     """
-    for s in SCHOOLS:
-        if str(s.get("school_id")) == str(school_id):
-            return s.get("name")
-    return None
+    return get_school_names([school_id]).get(school_id)
 
 
 def remove_favourite_school(
@@ -783,6 +1293,7 @@ def favourite_school(
             print_func("School ID cannot be empty.")
             continue
 
+        school_id = normalize_school_id(school_id)
         existing = find_favourite(current_user["user_id"], school_id)
         if existing is not None:
             msg = f"School '{school_id}' is already in your favourites."
@@ -832,10 +1343,12 @@ def view_favourite_schools(
         print_func(msg)
         return True, []
 
+    names = get_school_names([f.get("school_id") for f in favs])
+
     print_func("\nYour favourite schools:")
     for f in favs:
         sid = f.get("school_id")
-        name = _find_school_name(str(sid))
+        name = names.get(sid)
         if name:
             print_func(f"- {sid}: {name}")
         else:
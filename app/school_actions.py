@@ -12,13 +12,15 @@ Implements:
 - US12 - Shows top-performing schools per category
 """
 
-from typing import Callable, Dict
+from typing import Callable, Dict, Optional
 from collections import defaultdict
 
-from app.data_store import get_schools
+from app.data_store import get_schools, get_school_by_id
 from app.validation import validate_school_id_exists
-from app.reviews import RATINGS, COMMENTS
+from app.reviews import RATINGS, COMMENTS, get_average_ratings
 from app.data_store import SCHOOLS
+from app.snapshot_view import SnapshotView
+from app.metrics import timed
 
 
 def list_all_schools(
@@ -53,7 +55,7 @@ def list_all_schools(
         for school in schools:
             school_id = school.get("school_id", "?")
             name = school.get("name", "?")
-            avg = averages.get(str(school_id), 0.0)
+            avg = averages.get(school_id, 0.0)
 
             if avg > 0:
                 print_func(f"ID: {school_id} | Name: {name} | Avg Rating: {avg:.2f}")
@@ -138,80 +140,69 @@ def view_school_profile(
             print_func(f"Error: {error_msg}")
             continue
 
-        for school in schools:
-            if school.get("school_id") == school_id:
-                avg = averages.get(str(school_id), 0.0)
+        school = get_school_by_id(school_id)
+        avg = averages.get(school_id, 0.0)
 
-                print_func("\n=== School Details ===")
-                print_func(f"School ID: {school.get('school_id', '?')}")
-                print_func(f"Name: {school.get('name', '?')}")
-                print_func(f"Level: {school.get('level', '?').capitalize()}")
-                print_func(f"Location: {school.get('location', '?')}")
+        print_func("\n=== School Details ===")
+        print_func(f"School ID: {school.get('school_id', '?')}")
+        print_func(f"Name: {school.get('name', '?')}")
+        print_func(f"Level: {school.get('level', '?').capitalize()}")
+        print_func(f"Location: {school.get('location', '?')}")
 
-                if avg > 0:
-                    print_func(f"Average Rating: {avg:.2f}")
-                else:
-                    print_func("Average Rating: No ratings yet")
+        if avg > 0:
+            print_func(f"Average Rating: {avg:.2f}")
+        else:
+            print_func("Average Rating: No ratings yet")
 
-                print_func("\nPress any key to exit")
-                input_func("")
-                return True
+        print_func("\nPress any key to exit")
+        input_func("")
+        return True
 
 
-def _calculate_average_ratings() -> Dict[str, float]:
+@timed("calculate_average_ratings")
+def _calculate_average_ratings() -> Dict[int, float]:
     """
-    US11 helper: Calculate average rating for each school_id from RATINGS.
+    US11 helper: Average rating for each school_id, read from the running
+    per-school totals kept alongside RATINGS.
 
     Inputs:
         None
 
     Returns:
-        Dict[str, float]: Mapping of school_id (string) to average rating
+        Dict[int, float]: Mapping of school_id (int) to average rating
     """
 
-    totals: Dict[str, int] = {}
-    counts: Dict[str, int] = {}
-
-    for rating in RATINGS:
-        school_id = str(rating.get("school_id"))
-        value = rating.get("value")
-
-        if school_id is None or value is None:
-            continue
-
-        totals[school_id] = totals.get(school_id, 0) + int(value)
-        counts[school_id] = counts.get(school_id, 0) + 1
-
-    averages: Dict[str, float] = {}
-    for sid, total in totals.items():
-        averages[sid] = total / counts[sid]
+    return get_average_ratings()
 
-    return averages
 
-
-def view_school_rankings(print_func: Callable[[str], None] = print) -> None:
+def view_school_rankings(
+        print_func: Callable[[str], None] = print,
+        snapshot: Optional[SnapshotView] = None,
+) -> None:
     """
     US11 – View school rankings for each category (level)
     Shows all schools sorted by average rating within each level.
 
     Inputs:
         print_func (Callable[[str], None]): Function used to print output (for testing)
+        snapshot (Optional[SnapshotView]): rank the schools of a mapped binary
+            snapshot instead of the loaded stores
 
     Returns:
         None
     """
 
-    schools = get_schools()
+    schools = snapshot.records("schools") if snapshot is not None else get_schools()
     if not schools:
         print_func("No schools available.")
         return
 
-    averages = _calculate_average_ratings()
+    averages = snapshot.average_ratings() if snapshot is not None else _calculate_average_ratings()
     grouped = defaultdict(list)
 
     for school in schools:
         level = school.get("level", "unknown")
-        avg = averages.get(str(school.get("school_id")), 0.0)
+        avg = averages.get(school.get("school_id"), 0.0)
         grouped[level].append((school, avg))
 
     for level, items in grouped.items():
@@ -245,7 +236,7 @@ def view_top_schools(limit: int = 3, print_func: Callable[[str], None] = print)
     grouped = defaultdict(list)
 
     for school in schools:
-        avg = averages.get(str(school.get("school_id")), 0.0)
+        avg = averages.get(school.get("school_id"), 0.0)
         grouped[school.get("level", "unknown")].append((school, avg))
 
     for level, items in grouped.items():
@@ -258,6 +249,7 @@ def view_top_schools(limit: int = 3, print_func: Callable[[str], None] = print)
             )
 
 
+@timed()
 def search_schools_by_name(
         input_func: Callable[[str], str] = input,
         print_func: Callable[[str], None] = print
@@ -331,7 +323,7 @@ def search_schools_by_name(
                 school_id = school.get("school_id", "?")
                 name = school.get("name", "?")
                 location = school.get("location", "?")
-                avg = averages.get(str(school_id), 0.0)
+                avg = averages.get(school_id, 0.0)
 
                 if avg > 0:
                     print_func(f"ID: {school_id} | Name: {name} | Location: {location} | Avg Rating: {avg:.2f}")
@@ -349,6 +341,7 @@ def search_schools_by_name(
             print_func("Invalid option, please try again")
 
 
+@timed()
 def filter_schools(
         input_func: Callable[[str], str] = input,
         print_func: Callable[[str], None] = print
@@ -416,7 +409,7 @@ def filter_schools(
                 school_id = school.get("school_id", "?")
                 name = school.get("name", "?")
                 level = school.get("level", "?")
-                avg = averages.get(str(school_id), 0.0)
+                avg = averages.get(school_id, 0.0)
 
                 if avg > 0:
                     print_func(f"ID: {school_id} | Name: {name} | Level: {level.capitalize()} | Avg Rating: {avg:.2f}")
@@ -471,7 +464,7 @@ def filter_schools(
                 school_id = school.get("school_id", "?")
                 name = school.get("name", "?")
                 location = school.get("location", "?")
-                avg = averages.get(str(school_id), 0.0)
+                avg = averages.get(school_id, 0.0)
 
                 if avg > 0:
                     print_func(f"ID: {school_id} | Name: {name} | Location: {location} | Avg Rating: {avg:.2f}")
@@ -507,7 +500,7 @@ def filter_schools(
             #List of schools that have minimun avg rating or higher
             filtered = [
                 school for school in schools
-                if averages.get(str(school.get("school_id")), 0.0) >= min_rating
+                if averages.get(school.get("school_id"), 0.0) >= min_rating
             ]
 
             if not filtered:
@@ -522,7 +515,7 @@ def filter_schools(
                 name = school.get("name", "?")
                 level = school.get("level", "?")
                 location = school.get("location", "?")
-                avg = averages.get(str(school_id), 0.0)
+                avg = averages.get(school_id, 0.0)
 
                 print_func(f"ID: {school_id} | Name: {name} | Level: {level.capitalize()} | Location: {location} | Avg Rating: {avg:.2f}")
 
@@ -536,6 +529,7 @@ def filter_schools(
 def view_trending_schools(
     limit: int = 5,
     print_func: Callable[[str], None] = print,
+    snapshot: Optional[SnapshotView] = None,
 ):
     """
     Displays trending schools based on review activity (US36).
@@ -543,33 +537,30 @@ def view_trending_schools(
     Inputs:
         limit (int): Maximum number of trending schools to display
         print_func (Callable[[str], None]): Function used to print output/messages
+        snapshot (Optional[SnapshotView]): count the activity of a snapshot view
+            instead of the loaded stores
 
     Returns:
         None
     """
 
-    if not SCHOOLS:
+    schools = snapshot.records("schools") if snapshot is not None else SCHOOLS
+
+    if not schools:
         print_func("No schools available.")
         return
 
-    activity_count = defaultdict(int)
-
-    # Count ratings
-    for rating in RATINGS:
-        sid = str(rating.get("school_id"))
-        activity_count[sid] += 1
-
-    # Count comments
-    for comment in COMMENTS:
-        sid = str(comment.get("school_id"))
-        activity_count[sid] += 1
-
     # Build sortable list
     trending = []
-    for school in SCHOOLS:
-        sid = str(school.get("school_id"))
-        score = activity_count.get(sid, 0)
-        trending.append((school, score))
+    if snapshot is not None:
+        activity_count = snapshot.activity_counts()
+        for school in schools:
+            trending.append((school, activity_count.get(school.get("school_id"), 0)))
+    else:
+        # ratings plus comments per school, read from the per-school indexes
+        for school in schools:
+            school_id = school.get("school_id")
+            trending.append((school, RATINGS.count_for_school(school_id) + COMMENTS.count_for_school(school_id)))
 
     # Sort by activity score (descending)
     trending.sort(key=lambda x: x[1], reverse=True)
@@ -625,7 +616,7 @@ def sort_schools_by_rating(
             # Sort highest to lowest
             sorted_schools = sorted(
                 schools,
-                key=lambda s: averages.get(str(s.get("school_id")), 0.0),
+                key=lambda s: averages.get(s.get("school_id"), 0.0),
                 reverse=True
             )
 
@@ -637,7 +628,7 @@ def sort_schools_by_rating(
                 name = school.get("name", "?")
                 level = school.get("level", "?")
                 location = school.get("location", "?")
-                avg = averages.get(str(school_id), 0.0)
+                avg = averages.get(school_id, 0.0)
 
                 if avg > 0:
                     print_func(f"ID: {school_id} | Name: {name} | Level: {level.capitalize()} | Location: {location} | Avg Rating: {avg:.2f}")
@@ -652,7 +643,7 @@ def sort_schools_by_rating(
             # Sort lowest to highest
             sorted_schools = sorted(
                 schools,
-                key=lambda s: averages.get(str(s.get("school_id")), 0.0),
+                key=lambda s: averages.get(s.get("school_id"), 0.0),
                 reverse=False
             )
 
@@ -664,7 +655,7 @@ def sort_schools_by_rating(
                 name = school.get("name", "?")
                 level = school.get("level", "?")
                 location = school.get("location", "?")
-                avg = averages.get(str(school_id), 0.0)
+                avg = averages.get(school_id, 0.0)
 
                 if avg > 0:
                     print_func(f"ID: {school_id} | Name: {name} | Level: {level.capitalize()} | Location: {location} | Avg Rating: {avg:.2f}")
@@ -779,13 +770,8 @@ def compare_two_schools(
             break
 
         # Find both schools
-        school_1 = None
-        school_2 = None
-        for school in schools:
-            if school.get("school_id") == school_id_1:
-                school_1 = school
-            if school.get("school_id") == school_id_2:
-                school_2 = school
+        school_1 = get_school_by_id(school_id_1)
+        school_2 = get_school_by_id(school_id_2)
 
         # Display comparison
         print_func("\n=== School Comparison ===\n")
@@ -794,7 +780,7 @@ def compare_two_schools(
         name_1 = school_1.get("name", "?")
         level_1 = school_1.get("level", "?")
         location_1 = school_1.get("location", "?")
-        avg_1 = averages.get(str(school_id_1), 0.0)
+        avg_1 = averages.get(school_id_1, 0.0)
 
         print_func(f"School 1: {name_1}")
         print_func(f"  ID: {school_id_1}")
@@ -811,7 +797,7 @@ def compare_two_schools(
         name_2 = school_2.get("name", "?")
         level_2 = school_2.get("level", "?")
         location_2 = school_2.get("location", "?")
-        avg_2 = averages.get(str(school_id_2), 0.0)
+        avg_2 = averages.get(school_id_2, 0.0)
 
         print_func(f"School 2: {name_2}")
         print_func(f"  ID: {school_id_2}")
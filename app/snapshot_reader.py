@@ -0,0 +1,190 @@
+"""
+Streaming reader for US30 - Load System Data on Startup
+
+Reads a JSON snapshot of the form {"users": [...], "schools": [...], ...}
+section by section without building the whole document in memory. Arrays are
+handed out one element at a time, so each record can go straight into its
+store while the rest of the file is still unread.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Iterator, TextIO, Tuple
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class SnapshotReader:
+    """
+    Incremental parser over an open snapshot file
+
+    Only the top-level object and its arrays are parsed by hand. Array
+    elements are decoded in batches: everything up to the last "}" in the
+    buffer is decoded as one array, which is only valid JSON if the cut falls
+    between two complete records. If it is not (a "}" inside a string or a
+    nested object), a single element is decoded instead. The buffer holds at most one chunk plus the element
+    being read.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int = CHUNK_SIZE):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """
+        Reads the next chunk into the buffer, dropping the part already parsed
+
+        Returns:
+            bool: False if the end of the file was reached
+        """
+
+        if self._eof:
+            return False
+
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """
+        Skips whitespace and returns the next character ("" at the end of the file)
+        """
+
+        while True:
+            pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            self._pos = pos
+
+            if pos < len(self._buffer):
+                return self._buffer[pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str) -> None:
+        """
+        Consumes the next non-whitespace character, which must be char
+
+        Raises:
+            ValueError: If another character (or the end of the file) follows
+        """
+
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Invalid system snapshot: expected '{char}' but found '{found}'")
+        self._pos += 1
+
+    def _value(self) -> Any:
+        """
+        Decodes the next complete JSON value, reading more of the file as needed
+        """
+
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+
+            # a number that ends the buffer may continue in the next chunk
+            if end == len(self._buffer) and not self._eof and self._fill():
+                continue
+
+            self._pos = end
+            return value
+
+    def _items(self) -> Iterator[Any]:
+        """
+        Yields the elements of the array starting at the current position
+        """
+
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+
+        while True:
+            yield from self._element_batch()
+
+            separator = self._peek()
+            self._pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Invalid system snapshot: unexpected '{separator}' in array")
+
+    def _element_batch(self) -> list:
+        """
+        Decodes as many complete array elements as the buffer holds (at least one)
+
+        Returns:
+            list: the decoded elements, in order
+        """
+
+        self._peek()
+        cut = self._buffer.rfind("}", self._pos)
+        if cut != -1:
+            start = self._pos
+            text = "[" + self._buffer[start:cut + 1] + "]"
+            try:
+                batch, end = self._decoder.raw_decode(text)
+            except json.JSONDecodeError:
+                pass
+            else:
+                # the array may have been closed early by the "]" ending this
+                # section; continue from that "]" so the caller sees it
+                self._pos = cut + 1 if end == len(text) else start + end - 2
+                return batch
+
+        return [self._value()]
+
+    def sections(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Yields each top-level (key, value) pair of the snapshot in file order
+
+        Array values are yielded as iterators over their elements and must be
+        consumed before the next section is requested; whatever is left of
+        them is skipped. Other values are yielded as decoded.
+
+        Returns:
+            Iterator[Tuple[str, Any]]: the snapshot sections
+        """
+
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise ValueError("Invalid system snapshot: section names must be strings")
+            self._expect(":")
+
+            if self._peek() == "[":
+                items = self._items()
+                yield key, items
+                for _ in items:
+                    pass
+            else:
+                yield key, self._value()
+
+            separator = self._peek()
+            self._pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(f"Invalid system snapshot: unexpected '{separator}' between sections")
@@ -0,0 +1,392 @@
+"""
+Read-only memory-mapped view of a binary snapshot for reporting (US11, US13, US35, US37)
+
+Reporting jobs only read the data, so instead of loading the snapshot into
+the stores they can map the binary snapshot file into memory and compute
+counts, average ratings and contribution totals straight from the
+fixed-width rows, without building a dictionary per rating or comment. The
+mapping is shared through the operating system's page cache, so many
+reporting processes reading the same snapshot hold a single copy of it.
+
+Only the small users and schools sections are decoded into dictionaries.
+Saving a new snapshot replaces the file, so an open view keeps reading the
+snapshot it was opened on.
+
+Usage:
+    python -m app.snapshot_view system_data.bin [--export top_schools_report.txt]
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.binary_snapshot import (
+    KIND_COMMENTS,
+    KIND_FAVOURITES,
+    KIND_RATINGS,
+    KIND_RECORDS,
+    KIND_VALUE,
+    MAGIC,
+    COMMENT_ROW,
+    FAVOURITE_ROW,
+    LENGTH,
+    RATING_ROW,
+    SECTION_HEADER,
+    decode_records,
+    decode_section,
+)
+from app.data_store import normalize_school_id
+
+_ROW_FORMATS = {
+    KIND_RATINGS: RATING_ROW,
+    KIND_FAVOURITES: FAVOURITE_ROW,
+}
+
+
+class SnapshotView:
+    """
+    A binary snapshot file mapped into memory, read section by section on demand
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file = open(file_path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Invalid binary snapshot: {file_path} is empty")
+
+        try:
+            if self._map[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"Invalid binary snapshot: {file_path} is not an uncompressed binary snapshot")
+            self._sections = self._index_sections()
+        except Exception:
+            self.close()
+            raise
+
+    def _index_sections(self) -> Dict[str, Tuple[int, int, int]]:
+        """
+        Reads the section headers, skipping over every payload
+
+        Returns:
+            Dict[str, Tuple[int, int, int]]: (kind, payload start, payload length) by section name
+        """
+
+        sections = {}
+        size = len(self._map)
+        pos = len(MAGIC)
+
+        while pos < size:
+            name_length = self._map[pos]
+            name = self._map[pos + 1:pos + 1 + name_length].decode("utf-8")
+            pos += 1 + name_length
+            if pos + SECTION_HEADER.size > size:
+                raise ValueError("Invalid binary snapshot: file is truncated")
+
+            kind, length = SECTION_HEADER.unpack_from(self._map, pos)
+            pos += SECTION_HEADER.size
+            if pos + length > size:
+                raise ValueError("Invalid binary snapshot: file is truncated")
+
+            sections[name] = (kind, pos, length)
+            pos += length
+
+        return sections
+
+    def close(self) -> None:
+        """
+        Unmaps the snapshot and closes the file
+
+        Inputs:
+            None
+
+        Returns:
+            None
+        """
+
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "SnapshotView":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def sections(self) -> List[str]:
+        """
+        The names of the sections in the snapshot, in file order
+        """
+
+        return list(self._sections)
+
+    def _section(self, name: str) -> Tuple[int, int, int]:
+        if name not in self._sections:
+            raise KeyError(f"Snapshot has no '{name}' section")
+        return self._sections[name]
+
+    def _rows(self, name: str) -> Iterator[Tuple]:
+        """
+        Yields the raw rows of a fixed-width section, with school IDs resolved
+
+        Rows are unpacked straight from the mapped file as tuples; the first
+        two fields are the user ID and the (normalized) school ID.
+        """
+
+        kind, start, length = self._section(name)
+        row = _ROW_FORMATS[kind]
+
+        with memoryview(self._map) as buffer, buffer[start:start + length] as payload:
+            strings, pos = decode_records(payload)
+            schools = [normalize_school_id(school_id) for school_id in strings]
+            with payload[pos:] as rows:
+                for values in row.iter_unpack(rows):
+                    school = values[1]
+                    yield (values[0], school if school >= 0 else schools[-school - 1]) + values[2:]
+
+    def _comment_users(self) -> Iterator[Any]:
+        """
+        Yields the user ID of every comment, skipping over the comment texts
+        """
+
+        kind, start, length = self._section("comments")
+        if kind != KIND_COMMENTS:
+            for comment in self.records("comments"):
+                yield comment.get("user_id")
+            return
+
+        unpack_from = COMMENT_ROW.unpack_from
+        row_size = COMMENT_ROW.size
+        end = start + length
+        (table_count,) = LENGTH.unpack_from(self._map, start)
+        pos = start + LENGTH.size
+        for _ in range(table_count):
+            (string_length,) = LENGTH.unpack_from(self._map, pos)
+            pos += LENGTH.size + string_length
+
+        while pos < end:
+            user_id, text_length = unpack_from(self._map, pos)[1::4]
+            pos += row_size + text_length
+            yield user_id
+
+    def records(self, name: str) -> List[Any]:
+        """
+        Decodes every record of a section into dictionaries (meant for the
+        small users and schools sections)
+
+        Inputs:
+            name (str): name of the section
+
+        Returns:
+            List[Any]: the section's records in their in-memory form
+        """
+
+        kind, start, length = self._section(name)
+        with memoryview(self._map) as buffer, buffer[start:start + length] as payload:
+            value = decode_section(kind, payload)
+            return value if kind == KIND_VALUE else list(value)
+
+    def value(self, name: str) -> Any:
+        """
+        Decodes a single-value section (e.g. "sequences")
+
+        Inputs:
+            name (str): name of the section
+
+        Returns:
+            Any: the decoded value
+        """
+
+        return self.records(name)
+
+    def count(self, name: str) -> int:
+        """
+        Counts the records of a section without decoding them
+
+        Inputs:
+            name (str): name of the section
+
+        Returns:
+            int: the number of records (0 if the snapshot has no such section)
+        """
+
+        if name not in self._sections:
+            return 0
+
+        kind, start, length = self._sections[name]
+        if kind == KIND_RECORDS:
+            return LENGTH.unpack_from(self._map, start)[0]
+        if kind == KIND_COMMENTS:
+            return sum(1 for _ in self._comment_users())
+        if kind in _ROW_FORMATS:
+            with memoryview(self._map) as buffer, buffer[start:start + length] as payload:
+                _, pos = decode_records(payload)
+            return (length - pos) // _ROW_FORMATS[kind].size
+        raise ValueError(f"Section '{name}' holds a single value, not records")
+
+    def rating_totals(self) -> Dict[Any, List[int]]:
+        """
+        Adds up the ratings of every school
+
+        Inputs:
+            None
+
+        Returns:
+            Dict[Any, List[int]]: [sum of values, number of ratings] by normalized school ID
+        """
+
+        totals: Dict[Any, List[int]] = {}
+
+        if self._section("ratings")[0] == KIND_RATINGS:
+            for _, school_id, value in self._rows("ratings"):
+                entry = totals.get(school_id)
+                if entry is None:
+                    totals[school_id] = [value, 1]
+                else:
+                    entry[0] += value
+                    entry[1] += 1
+            return totals
+
+        # ratings that did not fit the fixed-width layout are plain records
+        for rating in self.records("ratings"):
+            try:
+                value = int(rating.get("value"))
+            except (TypeError, ValueError):
+                continue
+            entry = totals.setdefault(normalize_school_id(rating.get("school_id")), [0, 0])
+            entry[0] += value
+            entry[1] += 1
+        return totals
+
+    def average_ratings(self) -> Dict[Any, float]:
+        """
+        Returns the average rating of every rated school
+
+        Inputs:
+            None
+
+        Returns:
+            Dict[Any, float]: average rating by normalized school ID
+        """
+
+        return {school_id: total / count for school_id, (total, count) in self.rating_totals().items()}
+
+    def contribution_counts(self) -> Dict[Any, int]:
+        """
+        Counts the ratings and comments written by each user
+
+        Inputs:
+            None
+
+        Returns:
+            Dict[Any, int]: number of contributions by user ID
+        """
+
+        counts: Dict[Any, int] = {}
+
+        if self._section("ratings")[0] == KIND_RATINGS:
+            rating_users = (row[0] for row in self._rows("ratings"))
+        else:
+            rating_users = (rating.get("user_id") for rating in self.records("ratings"))
+
+        for users in (rating_users, self._comment_users()):
+            for user_id in users:
+                if user_id is not None:
+                    counts[user_id] = counts.get(user_id, 0) + 1
+        return counts
+
+    def _comment_schools(self) -> Iterator[Any]:
+        """
+        Yields the (normalized) school ID of every comment, skipping over the comment texts
+        """
+
+        kind, start, length = self._section("comments")
+        if kind != KIND_COMMENTS:
+            for comment in self.records("comments"):
+                yield normalize_school_id(comment.get("school_id"))
+            return
+
+        with memoryview(self._map) as buffer, buffer[start:start + length] as payload:
+            strings, pos = decode_records(payload)
+        schools = [normalize_school_id(school_id) for school_id in strings]
+
+        unpack_from = COMMENT_ROW.unpack_from
+        row_size = COMMENT_ROW.size
+        pos += start
+        end = start + length
+        while pos < end:
+            row = unpack_from(self._map, pos)
+            school = row[2]
+            pos += row_size + row[5]
+            yield school if school >= 0 else schools[-school - 1]
+
+    def activity_counts(self) -> Dict[Any, int]:
+        """
+        Counts the ratings and comments of each school
+
+        Inputs:
+            None
+
+        Returns:
+            Dict[Any, int]: number of ratings and comments by normalized school ID
+        """
+
+        counts: Dict[Any, int] = {}
+
+        if self._section("ratings")[0] == KIND_RATINGS:
+            rating_schools = (row[1] for row in self._rows("ratings"))
+        else:
+            rating_schools = (normalize_school_id(rating.get("school_id")) for rating in self.records("ratings"))
+
+        for schools in (rating_schools, self._comment_schools()):
+            for school_id in schools:
+                counts[school_id] = counts.get(school_id, 0) + 1
+        return counts
+
+
+def open_snapshot_view(file_path: str = "system_data.bin") -> SnapshotView:
+    """
+    Maps a binary snapshot for read-only reporting
+
+    Inputs:
+        file_path (str): path of an uncompressed binary snapshot
+
+    Returns:
+        SnapshotView: the view; close it (or use it in a with block) when done
+
+    Raises:
+        ValueError: If the file is not an uncompressed binary snapshot
+    """
+
+    return SnapshotView(file_path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Prints the system statistics and school rankings of a binary snapshot,
+    optionally exporting the top schools report
+    """
+
+    from app.admin_actions import export_top_schools_report, view_system_statistics
+    from app.school_actions import view_school_rankings, view_trending_schools
+
+    parser = argparse.ArgumentParser(description = "Read-only reports over a binary snapshot")
+    parser.add_argument("snapshot", help = "path of an uncompressed binary snapshot (.bin)")
+    parser.add_argument("--export", metavar = "PATH", help = "also export the top schools report to PATH")
+    args = parser.parse_args(argv)
+
+    with open_snapshot_view(args.snapshot) as view:
+        view_system_statistics(snapshot = view)
+        view_school_rankings(snapshot = view)
+        view_trending_schools(snapshot = view)
+        if args.export:
+            export_top_schools_report(file_path = args.export, snapshot = view)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,419 @@
-from datetime import datetime
+"""
+System event log for US38 - System Activity Logging
+
+log_event and log_error append one line per event to LOG_FILE. Besides the
+message, callers pass typed fields as keyword arguments: the event type
+(event=...), the user_id and school_id involved and any other details
+(username=..., path=..., error=...).
+
+Two line formats are available (LOG_FORMAT):
+- "text" (default): "[INFO] 2025-01-31 12:00:00 - message (event='...', field=value, ...)"
+- "json": one JSON object per line with "level", "ts" (epoch seconds),
+  "event", "user_id", "school_id", "message" and the other fields, for log
+  shippers that would otherwise have to parse the text
+
+The log file is rotated once it grows past ROTATE_BYTES, or when a new
+ROTATE_SECONDS period starts (e.g. 86400 rotates daily), whichever is set:
+system.log becomes system.log.1 (system.log.1.gz with COMPRESS_BACKUPS),
+older files move up by one and only LOG_BACKUPS of them are kept.
+
+By default each call writes its line before it returns. With buffered
+logging enabled (enable_buffered_logging), callers only put the event on an
+in-memory queue; a single background writer thread keeps the log file open
+and writes the queued lines in batches, once FLUSH_BYTES are waiting or
+FLUSH_INTERVAL seconds after the oldest waiting line, and at interpreter
+exit. flush_log waits until everything queued so far is written.
+"""
+
+import atexit
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from typing import Any, Dict, List, Optional, TextIO, Tuple
 
 LOG_FILE = "system.log"
 
+# "text" or "json" (one JSON object per line)
+LOG_FORMAT = "text"
+
+# Rotation: 0 turns a threshold off
+ROTATE_BYTES = 0
+ROTATE_SECONDS = 0
+LOG_BACKUPS = 5
+COMPRESS_BACKUPS = False
+
+# Buffered logging: waiting lines are written once this many bytes are queued,
+# or this many seconds after the oldest of them was logged
+FLUSH_BYTES = 64 * 1024
+FLUSH_INTERVAL = 1.0
+
+# Fields every JSON line carries, in this order, before the message and any other fields
+TYPED_FIELDS = ("event", "user_id", "school_id")
+
+# Timestamps have a resolution of one second, so the last one formatted is reused
+_last_timestamp: Tuple[int, str] = (-1, "")
+
+# Serializes direct writes and rotation between threads
+_FILE_LOCK = threading.Lock()
+
+
+def _timestamp(now: float) -> str:
+    """
+    Returns an epoch time as local "YYYY-MM-DD HH:MM:SS"
+    """
+
+    global _last_timestamp
+
+    second = int(now)
+    cached_second, text = _last_timestamp
+    if cached_second != second:
+        text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+        _last_timestamp = (second, text)
+    return text
+
+
+def format_line(level: str, now: float, message: str, fields: Dict[str, Any], log_format: str = "text") -> str:
+    """
+    Formats one log line (with its trailing newline)
+
+    Inputs:
+        level (str): "INFO" or "ERROR"
+        now (float): epoch time of the event
+        message (str): the message
+        fields (Dict[str, Any]): the typed fields of the event
+        log_format (str): "text" or "json"
+
+    Returns:
+        str: the formatted line
+    """
+
+    if log_format == "json":
+        record = {"level": level, "ts": round(now, 6)}
+        for name in TYPED_FIELDS:
+            record[name] = fields.get(name)
+        record["message"] = message
+        for name, value in fields.items():
+            if name not in TYPED_FIELDS:
+                record[name] = value
+        return json.dumps(record, ensure_ascii = False, default = str) + "\n"
+
+    details = ", ".join(f"{name}={value!r}" for name, value in fields.items())
+    if details:
+        message = f"{message} ({details})"
+    return f"[{level}] {_timestamp(now)} - {message}\n"
+
+
+def backup_path(log_file: str, number: int) -> str:
+    """
+    Returns the path of a rotated log file
+
+    Inputs:
+        log_file (str): path of the live log file
+        number (int): 1 for the most recent backup, 2 for the one before, ...
+
+    Returns:
+        str: the backup path (with ".gz" if backups are compressed)
+    """
+
+    return f"{log_file}.{number}" + (".gz" if COMPRESS_BACKUPS else "")
+
+
+def log_file_paths(log_file: Optional[str] = None) -> List[str]:
+    """
+    Lists the live log file and its existing backups, oldest first
+
+    Inputs:
+        log_file (Optional[str]): path of the live log file (LOG_FILE if None)
+
+    Returns:
+        List[str]: the existing log files, compressed or not, oldest first
+    """
+
+    log_file = str(LOG_FILE if log_file is None else log_file)
+    paths = []
+    number = 1
+    while True:
+        found = [path for path in (f"{log_file}.{number}", f"{log_file}.{number}.gz") if os.path.exists(path)]
+        if not found:
+            break
+        paths.extend(found)
+        number += 1
+
+    paths.reverse()
+    if os.path.exists(log_file):
+        paths.append(log_file)
+    return paths
+
+
+def _rotation_due(size: int, modified: float, incoming: int, now: float) -> bool:
+    """
+    Tells whether a log file of the given size and modification time must be
+    rotated before incoming more bytes are written at time now
+    """
+
+    if size == 0:
+        return False
+    if ROTATE_BYTES and size + incoming > ROTATE_BYTES:
+        return True
+    return bool(ROTATE_SECONDS) and int(modified // ROTATE_SECONDS) != int(now // ROTATE_SECONDS)
+
+
+def rotate_log(log_file: Optional[str] = None) -> None:
+    """
+    Moves the live log file to its first backup, shifting older backups up
+    and deleting those past LOG_BACKUPS
+
+    Inputs:
+        log_file (Optional[str]): path of the live log file (LOG_FILE if None)
+
+    Returns:
+        None
+    """
+
+    log_file = str(LOG_FILE if log_file is None else log_file)
+    if not os.path.exists(log_file):
+        return
+
+    # the oldest backups fall off the end
+    number = max(LOG_BACKUPS, 1)
+    while True:
+        stale = [path for path in (f"{log_file}.{number}", f"{log_file}.{number}.gz") if os.path.exists(path)]
+        if not stale:
+            break
+        for path in stale:
+            os.remove(path)
+        number += 1
+
+    for number in range(LOG_BACKUPS - 1, 0, -1):
+        for suffix in ("", ".gz"):
+            path = f"{log_file}.{number}{suffix}"
+            if os.path.exists(path):
+                os.replace(path, f"{log_file}.{number + 1}{suffix}")
+
+    if LOG_BACKUPS < 1:
+        os.remove(log_file)
+    elif COMPRESS_BACKUPS:
+        with open(log_file, "rb") as source, gzip.open(backup_path(log_file, 1), "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.remove(log_file)
+    else:
+        os.replace(log_file, backup_path(log_file, 1))
+
+
+def _append_direct(path: str, text: str, now: float) -> None:
+    """
+    Appends text to a log file, rotating it first if it is due
+    """
+
+    with _FILE_LOCK:
+        if ROTATE_BYTES or ROTATE_SECONDS:
+            try:
+                stat = os.stat(path)
+                if _rotation_due(stat.st_size, stat.st_mtime, len(text), now):
+                    rotate_log(path)
+            except OSError:
+                pass
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(text)
+
 
-def log_event(message: str) -> None:
+class _BufferedWriter:
+    """
+    A background thread that formats queued log events and writes them through open file handles
+    """
+
+    def __init__(self, flush_bytes: int, flush_interval: float):
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._files: Dict[str, TextIO] = {}
+        self._thread = threading.Thread(target = self._run, name = "system-log", daemon = True)
+        self._thread.start()
+
+    def put(self, path: str, level: str, now: float, message: str, fields: Dict[str, Any]) -> None:
+        self._queue.put((path, level, now, message, fields, LOG_FORMAT))
+
+    def flush(self) -> None:
+        """
+        Waits until every event queued before the call is written
+        """
+
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self) -> None:
+        """
+        Writes every queued event, then stops the thread and closes the log files
+        """
+
+        self._queue.put(None)
+        self._thread.join()
+
+    def _file(self, path: str, incoming: int, now: float) -> TextIO:
+        """
+        Returns the open handle of a log file, rotating the file first if it is due
+        """
+
+        file = self._files.get(path)
+        if file is None:
+            file = self._files[path] = open(path, "a", encoding = "utf-8")
+
+        size = file.tell()
+        if size and (ROTATE_BYTES or ROTATE_SECONDS):
+            file.flush()
+            if _rotation_due(size, os.fstat(file.fileno()).st_mtime, incoming, now):
+                file.close()
+                with _FILE_LOCK:
+                    rotate_log(path)
+                file = self._files[path] = open(path, "a", encoding = "utf-8")
+        return file
+
+    def _write(self, lines: List[Tuple[str, str, float]]) -> None:
+        for path, text, now in lines:
+            self._file(path, len(text), now).write(text)
+        for file in self._files.values():
+            file.flush()
+        lines.clear()
+
+    def _run(self) -> None:
+        lines: List[Tuple[str, str, float]] = []
+        waiting_bytes = 0
+        deadline = None
+
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout = timeout)
+            except queue.Empty:
+                item = ()
+
+            if isinstance(item, tuple) and item:
+                path, level, now, message, fields, log_format = item
+                text = format_line(level, now, message, fields, log_format)
+                lines.append((path, text, now))
+                waiting_bytes += len(text)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if waiting_bytes < self.flush_bytes:
+                    continue
+
+            # a size or time threshold was reached, or a flush or close was asked for
+            try:
+                self._write(lines)
+            except OSError:
+                lines.clear()
+            waiting_bytes = 0
+            deadline = None
+
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                for file in self._files.values():
+                    file.close()
+                self._files.clear()
+                return
+
+
+_WRITER: Optional[_BufferedWriter] = None
+
+
+def _log(level: str, message: str, fields: Dict[str, Any]) -> None:
+    """
+    Writes (or queues, with buffered logging) one log event
+    """
+
+    now = time.time()
+    writer = _WRITER
+    if writer is not None:
+        writer.put(str(LOG_FILE), level, now, message, fields)
+        return
+
+    _append_direct(str(LOG_FILE), format_line(level, now, message, fields, LOG_FORMAT), now)
+
+
+def log_event(message: str, **fields: Any) -> None:
     """
     Writes an info-level system event message to the log file.
 
     Inputs:
         message (str): Message to be logged
+        **fields: typed fields of the event (event, user_id, school_id, ...)
 
     Returns:
         None
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(f"[INFO] {timestamp} - {message}\n")
+    _log("INFO", message, fields)
 
 
-def log_error(message: str) -> None:
+def log_error(message: str, **fields: Any) -> None:
     """
     Writes an error-level system message to the log file.
 
     Inputs:
         message (str): Message to be logged as an error
+        **fields: typed fields of the event (event, user_id, school_id, ...)
 
     Returns:
         None
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(f"[ERROR] {timestamp} - {message}\n")
\ No newline at end of file
+    _log("ERROR", message, fields)
+
+
+def enable_buffered_logging(flush_bytes: int = FLUSH_BYTES, flush_interval: float = FLUSH_INTERVAL) -> None:
+    """
+    Starts queueing log events for a background writer instead of writing them in the caller
+
+    Inputs:
+        flush_bytes (int): number of queued bytes that triggers a write
+        flush_interval (float): seconds a queued line may wait before it is written
+
+    Returns:
+        None
+    """
+    global _WRITER
+
+    disable_buffered_logging()
+    _WRITER = _BufferedWriter(flush_bytes, flush_interval)
+
+
+def flush_log() -> None:
+    """
+    Waits until every line logged so far is written to the log file
+
+    Inputs:
+        None
+
+    Returns:
+        None
+    """
+    writer = _WRITER
+    if writer is not None:
+        writer.flush()
+
+
+def disable_buffered_logging() -> None:
+    """
+    Writes every queued line and goes back to writing each line as it is logged
+
+    Inputs:
+        None
+
+    Returns:
+        None
+    """
+    global _WRITER
+
+    writer = _WRITER
+    _WRITER = None
+    if writer is not None:
+        writer.close()
+
+
+# queued lines must not be lost when the interpreter exits
+atexit.register(disable_buffered_logging)
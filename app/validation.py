@@ -18,7 +18,9 @@ These helpers are used by modules to ensure consistent validation
 rules across the system.
 """
 
-from typing import Tuple, List
+from typing import Tuple, List, Optional
+
+from app.data_store import SchoolStore
 
 
 def validate_username_format(username: str) -> Tuple[bool, str]:
@@ -185,23 +187,44 @@ def validate_school_location(location: str) -> Tuple[bool, str]:
     return True, "Accepted"
 
 
-def check_duplicate_school(schools: List[dict], name: str, location: str) -> Tuple[bool, str]:
+def check_duplicate_school(
+    schools: List[dict],
+    name: str,
+    location: str,
+    exclude_school_id: Optional[int] = None
+) -> Tuple[bool, str]:
     """Checks if a school with the same name and location already exists.
 
+    The global list of schools is checked through its normalized
+    (name, location) index.
+
     Inputs:
         schools (List[dict]): List of existing schools.
         name (str): School name to check.
         location (str): School location to check.
+        exclude_school_id (Optional[int]): ID of a school to ignore (the school being updated).
 
     Returns:
         Tuple[bool, str]:
             - bool: True if no duplicate exists, False if duplicate found.
             - str: "Accepted" or an error message with explanation.
     """
+    if isinstance(schools, SchoolStore):
+        exclude = None
+        if exclude_school_id is not None:
+            exclude = schools.get_by_id(exclude_school_id)
+
+        if schools.has_name_location(name, location, exclude=exclude):
+            return False, "A school with this name and location already exists"
+
+        return True, "Accepted"
+
     cleaned_name = name.strip().lower()
     cleaned_location = location.strip().lower()
 
     for school in schools:
+        if exclude_school_id is not None and school.get("school_id") == exclude_school_id:
+            continue
         existing_name = school.get("name", "").strip().lower()
         existing_location = school.get("location", "").strip().lower()
         if existing_name == cleaned_name and existing_location == cleaned_location:
@@ -213,6 +236,8 @@ def check_duplicate_school(schools: List[dict], name: str, location: str) -> Tup
 def validate_school_id_exists(schools: List[dict], school_id: int) -> Tuple[bool, str]:
     """Validates that a school exists in global list of schools when given an ID
 
+    The global list of schools is checked through its school_id index.
+
     Inputs:
         schools (List[dict]): List of existing schools.
         school_id (int): School ID to check.
@@ -222,6 +247,12 @@ def validate_school_id_exists(schools: List[dict], school_id: int) -> Tuple[bool
             - bool: True if school exists, False otherwise.
             - str: "Accepted" or an error message with explanation.
     """
+    if isinstance(schools, SchoolStore):
+        if schools.get_by_id(school_id) is not None:
+            return True, "Accepted"
+
+        return False, f"School with ID {school_id} does not exist"
+
     for school in schools:
         if school.get("school_id") == school_id:
             return True, "Accepted"
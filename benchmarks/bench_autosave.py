@@ -0,0 +1,63 @@
+"""
+Benchmark for US29 - blocking save vs background autosave
+
+Generates and loads a synthetic snapshot, then compares how long the menu
+would be blocked by a synchronous save_system_data against the background
+autosave, where the menu can only wait for the in-memory copy
+(capture_system_snapshot) while the write happens on the worker thread.
+
+Usage:
+    python benchmarks/bench_autosave.py --ratings 1000000 --comments 200000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_snapshot_load import write_snapshot  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--schools", type=int, default=2000)
+    parser.add_argument("--ratings", type=int, default=500000)
+    parser.add_argument("--comments", type=int, default=100000)
+    parser.add_argument("--suffix", default=".json", help="snapshot suffix to save to, e.g. .json, .bin or .json.gz")
+    args = parser.parse_args()
+
+    from app.persistence import capture_system_snapshot, load_system_data, save_system_data, write_system_snapshot
+
+    quiet = lambda _: None  # noqa: E731
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source_path = os.path.join(tmp, "source.json")
+        write_snapshot(source_path, args.users, args.schools, args.ratings, args.comments)
+        load_system_data(source_path, print_func=quiet)
+        target_path = os.path.join(tmp, "system_data" + args.suffix)
+
+        started = time.perf_counter()
+        save_system_data(target_path, print_func=quiet)
+        blocking = time.perf_counter() - started
+
+        started = time.perf_counter()
+        snapshot, versions = capture_system_snapshot()
+        copy = time.perf_counter() - started
+
+        started = time.perf_counter()
+        write_system_snapshot(os.path.join(tmp, "autosave" + args.suffix), snapshot, versions)
+        background = time.perf_counter() - started
+
+        print(f"{args.ratings} ratings, {args.comments} comments, saving to {args.suffix}")
+        print(f"  save_system_data (menu blocked): {blocking:.2f}s")
+        print(f"  autosave copy (menu may wait):   {copy:.2f}s")
+        print(f"  autosave write (worker thread):  {background:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
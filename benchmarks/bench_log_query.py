@@ -0,0 +1,95 @@
+"""
+Benchmark for US38 - indexed log queries vs scanning the whole log
+
+Writes a synthetic system.log spanning several days (mostly INFO lines with
+a few failed logins), then compares:
+- a linear scan that parses every line and filters it
+- building the index once, and an incremental update after a few more lines
+- indexed queries for one hour of ERROR events and for one user's failed logins
+
+Usage:
+    python benchmarks/bench_log_query.py --lines 2000000 --format json
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def write_log(path: str, lines: int, days: int, log_format: str) -> float:
+    """
+    Writes a log of the given number of lines spread evenly over days and returns its start time
+    """
+
+    from app.system_log import format_line
+
+    start = 1_750_000_000 // 3600 * 3600
+    step = days * 86400 / lines
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(lines):
+            now = start + i * step
+            if i % 997 == 0:
+                f.write(format_line("ERROR", now, "Login failed", {"event": "login_failed", "username": f"user{i % 50}"}, log_format))
+            else:
+                f.write(format_line("INFO", now, "Rating set", {"event": "rating_set", "user_id": i % 20000, "school_id": i % 2000}, log_format))
+    return start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--format", choices=("text", "json"), default="text")
+    args = parser.parse_args()
+
+    from app.log_query import LogIndex, _matches, parse_line
+    from app.system_log import format_line
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "system.log")
+        start = write_log(path, args.lines, args.days, args.format)
+        since, until = start + 86400, start + 86400 + 3600
+        print(f"{args.lines} {args.format} lines over {args.days} days: {os.path.getsize(path) / (1024 * 1024):.1f} MiB")
+
+        started = time.perf_counter()
+        with open(path, encoding="utf-8") as f:
+            scanned = [record for record in map(parse_line, f)
+                       if record is not None and _matches(record, "ERROR", None, since, until, None)]
+        scan = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index = LogIndex(path)
+        index.update()
+        build = time.perf_counter() - started
+
+        with open(path, "a", encoding="utf-8") as f:
+            for i in range(100):
+                f.write(format_line("INFO", start + args.days * 86400 + i, "Rating set", {"event": "rating_set"}, args.format))
+        started = time.perf_counter()
+        index = LogIndex(path)
+        index.update()
+        incremental = time.perf_counter() - started
+
+        started = time.perf_counter()
+        found = list(index.query(level="ERROR", since=since, until=until))
+        hour_query = time.perf_counter() - started
+        assert len(found) == len(scanned)
+
+        started = time.perf_counter()
+        user = list(index.query(event="login_failed", fields={"username": "user7"}))
+        user_query = time.perf_counter() - started
+
+        print(f"  linear scan, 1 hour of ERROR:     {scan * 1000:.0f} ms ({len(scanned)} records)")
+        print(f"  index build (once):               {build * 1000:.0f} ms")
+        print(f"  incremental update (+100 lines):  {incremental * 1000:.1f} ms")
+        print(f"  indexed, 1 hour of ERROR:         {hour_query * 1000:.1f} ms")
+        print(f"  indexed, failed logins of a user: {user_query * 1000:.0f} ms ({len(user)} records)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark for US35 - cost of the action metrics
+
+Loads a synthetic snapshot, then measures:
+- the overhead of the timed wrapper around an empty function
+- set_rating and the average ratings with metrics enabled and disabled
+
+Usage:
+    python benchmarks/bench_metrics.py --ratings 1000000 --calls 200000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_snapshot_load import write_snapshot  # noqa: E402
+
+
+def per_call_micros(func, calls: int) -> float:
+    """
+    Returns the mean time of func(i) over calls calls, in microseconds
+    """
+
+    started = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--schools", type=int, default=2000)
+    parser.add_argument("--ratings", type=int, default=500000)
+    parser.add_argument("--comments", type=int, default=100000)
+    parser.add_argument("--calls", type=int, default=100000)
+    args = parser.parse_args()
+
+    from app import metrics
+    from app.persistence import load_system_data
+    from app.reviews import set_rating
+    from app.school_actions import _calculate_average_ratings
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "system_data.json")
+        write_snapshot(path, args.users, args.schools, args.ratings, args.comments)
+        load_system_data(path, print_func=lambda _: None)
+
+    bare = lambda i: None  # noqa: E731
+    wrapped = metrics.timed("bench.noop")(bare)
+    rate = lambda i: set_rating(i % args.users + 1, i % args.schools + 1, i % 5 + 1)  # noqa: E731
+    averages = lambda i: _calculate_average_ratings()  # noqa: E731
+
+    print(f"{args.ratings} ratings, {args.calls} calls each")
+    print(f"  empty function:           {per_call_micros(bare, args.calls):.2f} us")
+    print(f"  timed empty function:     {per_call_micros(wrapped, args.calls):.2f} us")
+
+    for label, func in (("set_rating", rate), ("average ratings", averages)):
+        metrics.disable_metrics()
+        off = per_call_micros(func, args.calls)
+        metrics.enable_metrics()
+        on = per_call_micros(func, args.calls)
+        print(f"  {label + ':':<25} {off:.2f} us off, {on:.2f} us on ({(on - off) / off * 100:+.1f}%)")
+
+    entry = metrics.metrics_snapshot()["set_rating"]
+    print(f"  set_rating p50/p95/p99:   {entry['p50_ms'] * 1000:.1f} / {entry['p95_ms'] * 1000:.1f} / "
+          f"{entry['p99_ms'] * 1000:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark for US29/US30 - compressed snapshots
+
+Fills the stores with synthetic data, then saves and loads a snapshot in each
+format and compression and reports file size, compression ratio (against the
+uncompressed JSON snapshot) and save/load wall time.
+
+Usage:
+    python benchmarks/bench_snapshot_compression.py --ratings 500000 --comments 100000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_snapshot_load import write_snapshot  # noqa: E402
+from app.persistence import load_system_data, save_system_data  # noqa: E402
+
+SUFFIXES = (".json", ".json.gz", ".json.bz2", ".json.xz", ".bin", ".bin.gz", ".bin.xz")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--schools", type=int, default=2000)
+    parser.add_argument("--ratings", type=int, default=500000)
+    parser.add_argument("--comments", type=int, default=100000)
+    args = parser.parse_args()
+
+    quiet = lambda _: None  # noqa: E731
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.json")
+        write_snapshot(source, args.users, args.schools, args.ratings, args.comments)
+        load_system_data(source, print_func=quiet)
+
+        baseline = None
+        print(f"{'format':>10} {'size MiB':>9} {'ratio':>6} {'save s':>7} {'load s':>7}")
+
+        for suffix in SUFFIXES:
+            path = os.path.join(tmp, "system_data" + suffix)
+
+            started = time.perf_counter()
+            save_system_data(path, print_func=quiet)
+            save_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            load_system_data(path, print_func=quiet)
+            load_seconds = time.perf_counter() - started
+
+            size = os.path.getsize(path)
+            baseline = baseline or size
+            print(
+                f"{suffix:>10} {size / (1024 * 1024):>9.1f} {baseline / size:>6.1f} "
+                f"{save_seconds:>7.2f} {load_seconds:>7.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
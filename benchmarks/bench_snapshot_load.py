@@ -0,0 +1,179 @@
+"""
+Benchmark for US30 - compares the snapshot loaders
+
+Generates a synthetic snapshot, then loads it once with each loader (json.load,
+the streaming JSON reader, the streaming reader with lazily loaded comment
+text, and the binary format) in a fresh interpreter and reports wall time,
+peak resident memory (RSS) and the memory still held once loading is done.
+
+Usage:
+    python benchmarks/bench_snapshot_load.py --ratings 1000000 --comments 200000
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def peak_rss_mib() -> float:
+    """
+    Returns the peak resident memory of this process in MiB
+
+    On Linux this is VmHWM, which (unlike ru_maxrss) is not inherited from the
+    parent process. Elsewhere ru_maxrss is used (KiB on Linux, bytes on macOS).
+    """
+
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak /= 1024
+    return peak / 1024
+
+
+def current_rss_mib() -> float:
+    """
+    Returns the current resident memory of this process in MiB (0 where /proc is unavailable)
+    """
+
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def write_snapshot(
+        path: str, users: int, schools: int, ratings: int, comments: int, comment_length: int = 0,
+) -> None:
+    """
+    Writes a synthetic snapshot in the same format as save_system_data
+
+    Comment texts are padded with filler words to comment_length characters.
+    """
+
+    filler = " The teachers were helpful and the facilities were clean." * (comment_length // 50 + 1)
+    if not comment_length:
+        filler = ""
+
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    snapshot = {
+        "users": [
+            {"user_id": i, "username": f"user{i}", "password": "password123", "role": "student"}
+            for i in range(1, users + 1)
+        ],
+        "schools": [
+            {"school_id": i, "name": f"School {i}", "level": "primary", "location": f"Town {i % 50}"}
+            for i in range(1, schools + 1)
+        ],
+        "ratings": [
+            {"user_id": i % users + 1, "school_id": (i // users) % schools + 1, "value": rng.randint(1, 5)}
+            for i in range(ratings)
+        ],
+        "comments": [
+            {
+                "comment_id": i,
+                "user_id": rng.randint(1, users),
+                "school_id": rng.randint(1, schools),
+                "text": f"Comment number {i} about this school.{filler}"[:comment_length or None],
+                "created_at": (start + timedelta(seconds=i)).isoformat(),
+            }
+            for i in range(1, comments + 1)
+        ],
+        "favourites": [],
+        "sequences": {"users": users, "schools": schools, "comments": comments},
+    }
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(snapshot, file, indent=2, ensure_ascii=False)
+
+
+def run_child(loader: str, path: str) -> None:
+    """
+    Loads the snapshot with one loader and prints the measurements as JSON
+    """
+
+    from app.persistence import load_system_data
+    from app.reviews import RATINGS
+
+    baseline = peak_rss_mib()
+    started = time.perf_counter()
+    ok = load_system_data(
+        path,
+        print_func=lambda _: None,
+        streaming=(loader in ("stream", "lazy")),
+        lazy_comments=(loader == "lazy"),
+    )
+    elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        "ok": ok,
+        "seconds": elapsed,
+        "peak_rss_mib": peak_rss_mib(),
+        "baseline_rss_mib": baseline,
+        "rss_mib": current_rss_mib(),
+        "ratings": len(RATINGS),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--schools", type=int, default=2000)
+    parser.add_argument("--ratings", type=int, default=500000)
+    parser.add_argument("--comments", type=int, default=100000)
+    parser.add_argument("--comment-length", type=int, default=0, help="pad comment texts to this many characters")
+    parser.add_argument("--child", nargs=2, metavar=("LOADER", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "system_data.json")
+        write_snapshot(path, args.users, args.schools, args.ratings, args.comments, args.comment_length)
+        size_mib = os.path.getsize(path) / (1024 * 1024)
+        print(f"Snapshot: {size_mib:.1f} MiB ({args.ratings} ratings, {args.comments} comments)")
+
+        from app.persistence import convert_snapshot
+        binary_path = os.path.join(tmp, "system_data.bin")
+        convert_snapshot(path, binary_path, print_func=lambda _: None)
+        print(f"Binary snapshot: {os.path.getsize(binary_path) / (1024 * 1024):.1f} MiB")
+
+        for loader, loader_path in (("json", path), ("stream", path), ("lazy", path), ("binary", binary_path)):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", loader, loader_path],
+                check=True, capture_output=True, text=True, cwd=tmp,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{loader:>6}: {result['seconds']:.2f}s, peak RSS {result['peak_rss_mib']:.0f} MiB "
+                f"(+{result['peak_rss_mib'] - result['baseline_rss_mib']:.0f} MiB for loading), "
+                f"{result['rss_mib']:.0f} MiB resident after loading"
+            )
+
+
+if __name__ == "__main__":
+    main()
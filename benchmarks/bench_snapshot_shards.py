@@ -0,0 +1,107 @@
+"""
+Benchmark for US30 - single-file vs sharded snapshot startup
+
+Generates a synthetic snapshot, converts it to a binary snapshot and to
+sharded directories (one JSON or binary file per section), then loads each
+in a fresh interpreter. Reports the total load time and how long it took
+until the users and schools stores were filled.
+
+Usage:
+    python benchmarks/bench_snapshot_shards.py --ratings 1000000 --comments 200000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_snapshot_load import write_snapshot  # noqa: E402
+
+
+def run_child(path: str) -> None:
+    """
+    Loads one snapshot and prints the measurements as JSON
+    """
+
+    from app import persistence
+    from app.reviews import RATINGS
+
+    started = time.perf_counter()
+    ready = {}
+
+    def timed(name, load):
+        def wrapper(records):
+            load(records)
+            ready[name] = time.perf_counter() - started
+        return wrapper
+
+    persistence.load_users = timed("users", persistence.load_users)
+    persistence.load_schools = timed("schools", persistence.load_schools)
+
+    ok = persistence.load_system_data(path, print_func=lambda _: None)
+    elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        "ok": ok,
+        "seconds": elapsed,
+        "users_and_schools_seconds": max(ready.values()),
+        "ratings": len(RATINGS),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--schools", type=int, default=2000)
+    parser.add_argument("--ratings", type=int, default=500000)
+    parser.add_argument("--comments", type=int, default=100000)
+    parser.add_argument("--child", metavar="PATH", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    from app.persistence import convert_snapshot
+
+    quiet = lambda _: None  # noqa: E731
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "system_data.json")
+        write_snapshot(json_path, args.users, args.schools, args.ratings, args.comments)
+        print(f"Snapshot: {os.path.getsize(json_path) / (1024 * 1024):.1f} MiB "
+              f"({args.ratings} ratings, {args.comments} comments)")
+
+        binary_path = os.path.join(tmp, "system_data.bin")
+        json_dir = os.path.join(tmp, "json_shards") + os.sep
+        binary_dir = os.path.join(tmp, "bin_shards") + os.sep
+        convert_snapshot(json_path, binary_path, print_func=quiet)
+        convert_snapshot(json_path, json_dir, print_func=quiet)
+        convert_snapshot(binary_path, binary_dir, print_func=quiet)
+
+        layouts = (
+            ("single JSON", json_path),
+            ("sharded JSON", json_dir),
+            ("single binary", binary_path),
+            ("sharded binary", binary_dir),
+        )
+        for label, path in layouts:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", path],
+                check=True, capture_output=True, text=True, cwd=tmp,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{label:>15}: {result['seconds']:.2f}s total, "
+                f"users and schools loaded after {result['users_and_schools_seconds']:.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark for US13/US35 - reports from a loaded snapshot vs a memory-mapped one
+
+Generates a synthetic binary snapshot, then in a fresh interpreter either
+loads it into the stores or maps it with app.snapshot_view, and computes the
+system statistics, the top schools summary and the top contributors. Reports
+wall time and peak resident memory (RSS) of each.
+
+Usage:
+    python benchmarks/bench_snapshot_view.py --ratings 1000000 --comments 200000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_snapshot_load import peak_rss_mib, write_snapshot  # noqa: E402
+
+
+def run_child(mode: str, path: str) -> None:
+    """
+    Computes the reports in one mode and prints the measurements as JSON
+    """
+
+    from app.admin_actions import get_top_schools_summary, view_system_statistics, view_top_contributors
+    from app.persistence import load_system_data
+    from app.snapshot_view import open_snapshot_view
+
+    quiet = lambda _: None  # noqa: E731
+    baseline = peak_rss_mib()
+    started = time.perf_counter()
+
+    if mode == "load":
+        load_system_data(path, print_func=quiet)
+        view_system_statistics(print_func=quiet)
+        summary = get_top_schools_summary()
+        view_top_contributors(print_func=quiet)
+    else:
+        with open_snapshot_view(path) as view:
+            view_system_statistics(print_func=quiet, snapshot=view)
+            summary = get_top_schools_summary(snapshot=view)
+            view_top_contributors(print_func=quiet, snapshot=view)
+
+    print(json.dumps({
+        "seconds": time.perf_counter() - started,
+        "peak_rss_mib": peak_rss_mib(),
+        "baseline_rss_mib": baseline,
+        "levels": len(summary),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--schools", type=int, default=2000)
+    parser.add_argument("--ratings", type=int, default=500000)
+    parser.add_argument("--comments", type=int, default=100000)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    from app.persistence import convert_snapshot
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "system_data.json")
+        binary_path = os.path.join(tmp, "system_data.bin")
+        write_snapshot(json_path, args.users, args.schools, args.ratings, args.comments)
+        convert_snapshot(json_path, binary_path, print_func=lambda _: None)
+        print(f"Binary snapshot: {os.path.getsize(binary_path) / (1024 * 1024):.1f} MiB "
+              f"({args.ratings} ratings, {args.comments} comments)")
+
+        for mode in ("load", "mmap"):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", mode, binary_path],
+                check=True, capture_output=True, text=True, cwd=tmp,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{mode:>5}: {result['seconds']:.2f}s, peak RSS {result['peak_rss_mib']:.0f} MiB "
+                f"(+{result['peak_rss_mib'] - result['baseline_rss_mib']:.0f} MiB for the reports)"
+            )
+
+
+if __name__ == "__main__":
+    main()
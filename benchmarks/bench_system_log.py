@@ -0,0 +1,53 @@
+"""
+Benchmark for US38 - direct vs buffered system logging
+
+Logs a burst of failed-login events (as during a login storm), in the text
+or JSON-lines format, once with every call writing its own line, and once
+with buffered logging, and
+reports the time the callers spent logging and, for the buffered logger,
+the time until every line reached the file.
+
+Usage:
+    python benchmarks/bench_system_log.py --messages 100000 [--format json]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--format", choices=("text", "json"), default="text")
+    args = parser.parse_args()
+
+    from app import system_log
+
+    system_log.LOG_FORMAT = args.format
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("direct", "buffered"):
+            system_log.LOG_FILE = os.path.join(tmp, f"{mode}.log")
+            if mode == "buffered":
+                system_log.enable_buffered_logging()
+
+            started = time.perf_counter()
+            for i in range(args.messages):
+                system_log.log_error("Login failed", event="login_failed", user_id=i % 500, username=f"user{i % 500}")
+            logged = time.perf_counter() - started
+
+            system_log.disable_buffered_logging()
+            written = time.perf_counter() - started
+
+            per_call = logged / args.messages * 1e6
+            print(f"{mode:>8}: callers {logged:.2f}s ({per_call:.1f} us per call), all lines written after {written:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
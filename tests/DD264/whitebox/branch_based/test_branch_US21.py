@@ -11,6 +11,7 @@ from app.auth import (
     find_user_by_username,
     get_next_user_id
 )
+from app.data_store import USERS, add_user, get_user_by_id, get_user_by_username, delete_user
 
 
 def test_find_user_by_username():
@@ -146,4 +147,42 @@ def test_validate_new_password_valid():
 
     is_valid, msg = validate_new_password("password123", "password123")
     assert is_valid is True
-    assert "Password valid" in msg
\ No newline at end of file
+    assert "Password valid" in msg
+
+
+def test_find_user_by_username_uses_global_index():
+    """
+    This test will make sure that find_user_by_username finds users in the global store,
+    including users appended directly to the list
+    """
+
+    add_user({"user_id": 1, "username": "new-user1", "password": "password123", "role": "student"})
+    USERS.append({"user_id": 2, "username": "new-user2", "password": "password123", "role": "student"})
+
+    assert find_user_by_username(USERS, "new-user2")["user_id"] == 2
+    assert find_user_by_username(USERS, "new-user1")["user_id"] == 1
+    assert find_user_by_username(USERS, " new-user1 ") is None
+    assert find_user_by_username(list(USERS), " new-user1 ") is None
+    assert find_user_by_username(USERS, "missing") is None
+
+
+def test_user_indexes_follow_delete_and_clear():
+    """
+    This test will make sure that the user_id and username indexes are updated when users
+    are deleted or the list is cleared
+    """
+
+    add_user({"user_id": 1, "username": "new-user1", "password": "password123", "role": "student"})
+    add_user({"user_id": 2, "username": "new-user2", "password": "password123", "role": "student"})
+
+    removed = delete_user(1)
+
+    assert removed["username"] == "new-user1"
+    assert get_user_by_id(1) is None
+    assert get_user_by_username("new-user1") is None
+    assert get_user_by_id(2)["username"] == "new-user2"
+    assert [u["user_id"] for u in USERS] == [2]
+
+    USERS.clear()
+    assert get_user_by_username("new-user2") is None
+    assert delete_user(2) is None
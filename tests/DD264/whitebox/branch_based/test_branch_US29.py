@@ -5,14 +5,33 @@ These tests directly exercise internal helpers and branches inside:
 - serialize_comment()
 - build_system_snapshot()
 - save_system_data() error handling paths
+- write_json_snapshot() and compressed snapshot paths
+- save_system_data(only_if_changed=True) and changed_sections()
+- the background autosave scheduler and write_system_snapshot()
 """
 
+import builtins
+import gzip
+import io
+import json
 import os
+import threading
+import time
 from datetime import datetime, timezone
 
+import pytest
+
+from app import persistence
+from app import journal as journal_module
+from app.journal import Journal, read_journal
 from app.persistence import serialize_comment, build_system_snapshot, save_system_data
-from app.data_store import USERS, SCHOOLS
-from app.reviews import RATINGS, COMMENTS
+from app.persistence import enable_journal, disable_journal
+from app.persistence import capture_system_snapshot, write_system_snapshot, journal_offset_for
+from app.persistence import load_system_data
+from app.autosave import start_autosave, stop_autosave
+from app.data_store import USERS, SCHOOLS, STORE_LOCK, add_school, delete_school, get_schools, ChangeNotSavedError
+from app.data_store import add_mutation_listener, remove_mutation_listener
+from app.reviews import RATINGS, COMMENTS, FAVOURITES, set_rating, find_rating, add_comment_record, delete_comment_record
 
 
 def reset_state():
@@ -116,3 +135,489 @@ def test_save_system_data_failure_branch_when_target_is_directory(tmp_path):
 
     assert success is False
     assert any("Failed to save system state" in line for line in outputs)
+
+
+
+def test_build_system_snapshot_includes_id_sequences():
+    """
+    Tests that build_system_snapshot records the ID sequences, which keep advancing after deletions.
+    """
+    reset_state()
+
+    USERS.append({"user_id": 1, "username": "u", "password": "password123", "role": "student"})
+    USERS.append({"user_id": 2, "username": "v", "password": "password123", "role": "student"})
+    SCHOOLS.append({"school_id": 1, "name": "S", "level": "primary", "location": "Edinburgh"})
+    USERS.pop()
+
+    snap = build_system_snapshot()
+
+    assert snap["sequences"] == {"users": 2, "schools": 1, "comments": 0}
+
+
+def test_build_system_snapshot_branch_favourite_datetime_to_iso():
+    """
+    Tests that favourite timestamps are written as ISO strings so the snapshot stays JSON-serializable
+    """
+    reset_state()
+    FAVOURITES.clear()
+
+    FAVOURITES.append({"user_id": 1, "school_id": 2, "created_at": datetime(2025, 1, 1, tzinfo=timezone.utc)})
+
+    snapshot = build_system_snapshot()
+
+    assert snapshot["favourites"][0]["created_at"] == "2025-01-01T00:00:00+00:00"
+    assert isinstance(FAVOURITES[0]["created_at"], datetime)
+
+
+def test_journal_branch_appends_each_change_and_checkpoints(tmp_path):
+    """
+    Tests that changes are appended to the journal and that a change made once
+    the journal is past the size threshold first folds the journal into a new snapshot
+    """
+    reset_state()
+    file_path = str(tmp_path / "system_data.json")
+    journal = enable_journal(file_path, checkpoint_bytes=10_000)
+
+    try:
+        add_school({"school_id": 1, "name": "S1", "level": "primary", "location": "Leicester"})
+        set_rating(1, 1, 4)
+        set_rating(1, 1, 4)  # unchanged value, nothing to journal
+
+        with open(journal.path, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+
+        assert [(e["c"], e["op"]) for e in entries] == [("schools", "put"), ("ratings", "put")]
+        assert entries[1]["r"] == {"user_id": 1, "school_id": 1, "value": 4}
+        assert not os.path.exists(file_path)
+
+        persistence.CHECKPOINT_BYTES = 1
+        delete_school(1)
+
+        with open(file_path, encoding="utf-8") as f:
+            assert [s["school_id"] for s in json.load(f)["schools"]] == [1]
+        with open(journal.path, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        assert [(e["c"], e["op"]) for e in entries] == [("schools", "delete")]
+    finally:
+        disable_journal()
+
+
+def test_journal_branch_failed_append_refuses_the_change(tmp_path, monkeypatch):
+    """
+    Tests that a change the journal cannot take is refused with ChangeNotSavedError
+    and leaves the stores as they were
+    """
+    reset_state()
+    file_path = str(tmp_path / "system_data.json")
+    journal = enable_journal(file_path)
+
+    def broken_append(collection, action, record):
+        raise OSError("disk full")
+
+    try:
+        add_school({"school_id": 1, "name": "S1", "level": "primary", "location": "Leicester"})
+        set_rating(1, 1, 4)
+        monkeypatch.setattr(journal, "append", broken_append)
+
+        with pytest.raises(ChangeNotSavedError):
+            add_school({"school_id": 2, "name": "S2", "level": "primary", "location": "Leicester"})
+        with pytest.raises(ChangeNotSavedError):
+            set_rating(1, 1, 5)
+        with pytest.raises(ChangeNotSavedError):
+            delete_school(1)
+
+        assert [s["school_id"] for s in get_schools()] == [1]
+        assert find_rating(1, 1)["value"] == 4
+    finally:
+        disable_journal()
+
+
+def test_journal_branch_failed_sync_cuts_the_line_back(tmp_path, monkeypatch):
+    """
+    Tests that an append whose fsync fails leaves the journal as it was before the append
+    """
+    journal = Journal(str(tmp_path / "system_data.json.journal"))
+
+    def broken_fsync(fd):
+        raise OSError("disk full")
+
+    try:
+        journal.append("ratings", "put", {"user_id": 1, "school_id": 1, "value": 4})
+        size = journal.size
+
+        monkeypatch.setattr(journal_module.os, "fsync", broken_fsync)
+        with pytest.raises(OSError):
+            journal.append("ratings", "put", {"user_id": 2, "school_id": 1, "value": 5})
+        monkeypatch.undo()
+
+        assert journal.size == size
+        journal.append("ratings", "put", {"user_id": 3, "school_id": 1, "value": 3})
+    finally:
+        journal.close()
+
+    with open(journal.path, encoding="utf-8") as f:
+        assert [json.loads(line)["r"]["user_id"] for line in f] == [1, 3]
+
+
+def test_journal_branch_group_commit_batches_fsync(tmp_path, monkeypatch):
+    """
+    Tests that the journal forces changes to disk once per group of sync_every changes
+    """
+    synced = []
+    monkeypatch.setattr(journal_module.os, "fsync", lambda fd: synced.append(fd))
+
+    journal = Journal(str(tmp_path / "data.json.journal"), sync_every=3, sync_interval=3600)
+    try:
+        journal.append("ratings", "put", {"user_id": 1, "school_id": 1, "value": 4})
+        journal.append("ratings", "put", {"user_id": 2, "school_id": 1, "value": 4})
+        assert synced == []
+        assert journal.unsynced == 2
+
+        journal.append("ratings", "delete", {"user_id": 1, "school_id": 1, "value": 4})
+        assert len(synced) == 1
+        assert journal.unsynced == 0
+
+        journal.append("ratings", "put", {"user_id": 3, "school_id": 1, "value": 1})
+    finally:
+        journal.close()
+
+    # closing forces the last, incomplete group to disk
+    assert len(synced) == 2
+
+
+def test_journal_branch_reopen_drops_torn_last_line(tmp_path):
+    """
+    Tests that reopening a journal cuts off a partly written last line before appending
+    """
+    path = str(tmp_path / "data.json.journal")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"c":"users","op":"delete","r":{"user_id":1}}\n{"c":"users","op":"del')
+
+    journal = Journal(path)
+    journal.append("users", "delete", {"user_id": 2})
+    journal.close()
+
+    assert [e["r"]["user_id"] for e in read_journal(path)] == [1, 2]
+
+
+def test_journal_branch_discard_before_keeps_later_changes(tmp_path):
+    """
+    Tests that dropping the start of the journal keeps the changes appended after the offset
+    """
+    journal = Journal(str(tmp_path / "data.json.journal"))
+    journal.append("users", "delete", {"user_id": 1})
+    journal.append("users", "delete", {"user_id": 2})
+    offset = journal.size
+    journal.append("users", "delete", {"user_id": 3})
+
+    journal.discard_before(offset)
+    journal.append("users", "delete", {"user_id": 4})
+    journal.close()
+
+    assert [e["r"]["user_id"] for e in read_journal(journal.path)] == [3, 4]
+    assert not os.path.exists(journal.path + ".tmp")
+
+
+def test_write_json_snapshot_branch_matches_indented_json_dump():
+    """
+    Tests that the snapshot writer lays out flat, nested and empty records like json.dump(indent=2)
+    """
+    records = [
+        {"user_id": 1, "text": "line\nbreak é", "value": 2.5, "flag": True, "created_at": None},
+        {"nested": {"a": [1, {"b": 2}]}, "empty": []},
+        {},
+    ]
+    sections = [("records", records), ("empty", []), ("sequences", {"users": 1})]
+
+    out = io.StringIO()
+    persistence.write_json_snapshot(out, sections)
+
+    assert out.getvalue() == json.dumps(dict(sections), indent=2, ensure_ascii=False)
+
+
+def test_save_system_data_branch_gzip_suffix_compresses_atomically(tmp_path):
+    """
+    Tests that a .gz snapshot path is written gzip-compressed and leaves no temporary file behind
+    """
+    reset_state()
+    USERS.append({"user_id": 1, "username": "u1", "password": "password123", "role": "student"})
+
+    file_path = str(tmp_path / "system_data.json.gz")
+    assert save_system_data(file_path, print_func=lambda _: None) is True
+
+    with open(file_path, "rb") as f:
+        assert f.read(2) == b"\x1f\x8b"
+    with gzip.open(file_path, "rt", encoding="utf-8") as f:
+        assert json.load(f)["users"][0]["username"] == "u1"
+    assert os.listdir(tmp_path) == ["system_data.json.gz"]
+
+
+def test_save_system_data_branch_only_if_changed_skips_unchanged_state(tmp_path):
+    """
+    Tests that an unchanged state is not rewritten, while an in-place change or an outside edit of the file is
+    """
+    reset_state()
+    USERS.append({"user_id": 1, "username": "u1", "password": "password123", "role": "student"})
+    set_rating(1, 1, 3)
+    file_path = str(tmp_path / "system_data.json")
+    outputs = []
+
+    assert save_system_data(file_path, print_func=outputs.append, only_if_changed=True) is True
+    assert persistence.changed_sections(file_path) == []
+    assert save_system_data(file_path, print_func=outputs.append, only_if_changed=True) is True
+    assert "up to date" in outputs[-1]
+
+    set_rating(1, 1, 5)
+    assert persistence.changed_sections(file_path) == ["ratings"]
+    assert save_system_data(file_path, print_func=outputs.append, only_if_changed=True) is True
+    assert "saved successfully" in outputs[-1]
+
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write("{}")
+    assert len(persistence.changed_sections(file_path)) == 6
+    assert save_system_data(file_path, print_func=outputs.append, only_if_changed=True) is True
+    with open(file_path, encoding="utf-8") as f:
+        assert json.load(f)["ratings"][0]["value"] == 5
+
+
+def wait_for(condition, timeout=5.0):
+    """
+    Polls condition() until it is true or the timeout passes
+    """
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def store_lock_is_free():
+    """
+    Tells whether another thread could take STORE_LOCK right now
+    """
+    taken = []
+
+    def try_lock():
+        if STORE_LOCK.acquire(timeout=0.05):
+            STORE_LOCK.release()
+            taken.append(True)
+
+    thread = threading.Thread(target=try_lock)
+    thread.start()
+    thread.join()
+    return bool(taken)
+
+
+def test_store_lock_branch_held_only_while_a_store_changes(monkeypatch, tmp_path):
+    """
+    Tests that STORE_LOCK is held while a change is made and its listeners run,
+    and that the menu holds it neither while waiting for a choice nor at a submenu prompt
+    """
+    import app.main as main_mod
+
+    reset_state()
+    seen = {"listener": [], "prompts": []}
+
+    def listener(collection, action, record):
+        seen["listener"].append(store_lock_is_free())
+
+    def submenu(input_func):
+        seen["prompts"].append(store_lock_is_free())
+        input_func("Enter your Username: ")
+        add_school({"school_id": 1, "name": "S1", "level": "primary", "location": "Leicester"})
+
+    def prompt(_=""):
+        seen["prompts"].append(store_lock_is_free())
+        return next(inputs)
+
+    inputs = iter(["1", "bob", "0"])
+    monkeypatch.setattr(builtins, "input", prompt)
+    monkeypatch.setattr(main_mod, "DEFAULT_SYSTEM_DATA_PATH", str(tmp_path / "system_data.json"))
+    monkeypatch.setattr(main_mod, "BUFFERED_LOGGING", False)
+    monkeypatch.setattr(main_mod, "example_users", lambda: None)
+    monkeypatch.setattr(main_mod, "show_main_menu", lambda: None)
+    monkeypatch.setattr(main_mod, "register_user", submenu)
+
+    add_mutation_listener(listener)
+    try:
+        main_mod.main()
+    finally:
+        remove_mutation_listener(listener)
+
+    assert seen["listener"] == [False]
+    assert seen["prompts"] == [True, True, True, True]
+    assert store_lock_is_free()
+
+
+def test_main_branch_reports_a_change_that_was_not_saved(monkeypatch, tmp_path, capsys):
+    """
+    Tests that the menu prints a refused change as an error and keeps running
+    """
+    import app.main as main_mod
+
+    reset_state()
+
+    def refuse(collection, action, record):
+        raise ChangeNotSavedError("The change could not be saved: disk full")
+
+    def submenu(input_func):
+        add_school({"school_id": 1, "name": "S1", "level": "primary", "location": "Leicester"})
+
+    inputs = iter(["1", "6", "0"])
+    monkeypatch.setattr(builtins, "input", lambda _="": next(inputs))
+    monkeypatch.setattr(main_mod, "DEFAULT_SYSTEM_DATA_PATH", str(tmp_path / "system_data.json"))
+    monkeypatch.setattr(main_mod, "BUFFERED_LOGGING", False)
+    monkeypatch.setattr(main_mod, "example_users", lambda: None)
+    monkeypatch.setattr(main_mod, "show_main_menu", lambda: None)
+    monkeypatch.setattr(main_mod, "register_user", submenu)
+
+    add_mutation_listener(refuse)
+    try:
+        main_mod.main()
+    finally:
+        remove_mutation_listener(refuse)
+
+    assert "The change could not be saved: disk full. Nothing was changed." in capsys.readouterr().out
+    assert get_schools() == []
+
+
+def test_autosave_branch_saves_after_every_n_changes(tmp_path):
+    """
+    Tests that the autosave thread writes a snapshot once the change threshold is reached
+    """
+    reset_state()
+    file_path = str(tmp_path / "system_data.json")
+    autosave = start_autosave(file_path, interval=60, every=3)
+
+    try:
+        set_rating(1, 1, 4)
+        set_rating(2, 1, 5)
+        time.sleep(0.05)
+        assert not os.path.exists(file_path)
+
+        set_rating(3, 1, 1)
+        assert wait_for(lambda: autosave.saves == 1)
+        with open(file_path, encoding="utf-8") as f:
+            assert len(json.load(f)["ratings"]) == 3
+        assert persistence.changed_sections(file_path) == []
+    finally:
+        stop_autosave()
+
+
+def test_autosave_branch_coalesces_changes_while_stores_are_busy(tmp_path):
+    """
+    Tests that changes made while an action holds STORE_LOCK are saved together once it is released
+    """
+    reset_state()
+    file_path = str(tmp_path / "system_data.json")
+    autosave = start_autosave(file_path, interval=60, every=2)
+
+    try:
+        with STORE_LOCK:
+            for user_id in range(1, 11):
+                set_rating(user_id, 1, 3)
+            time.sleep(0.05)
+            assert not os.path.exists(file_path)
+
+        assert wait_for(lambda: autosave.saves == 1 and autosave.pending == 0)
+        with open(file_path, encoding="utf-8") as f:
+            assert len(json.load(f)["ratings"]) == 10
+    finally:
+        stop_autosave()
+
+
+def test_autosave_branch_interval_saves_a_single_change_and_stop_starts_no_save(tmp_path):
+    """
+    Tests that a lone change is saved once the interval passes, and that stopping does not save pending changes
+    """
+    reset_state()
+    file_path = str(tmp_path / "system_data.json")
+    autosave = start_autosave(file_path, interval=0.05, every=100)
+
+    try:
+        set_rating(1, 1, 2)
+        assert wait_for(lambda: autosave.saves == 1)
+    finally:
+        stop_autosave()
+
+    autosave = start_autosave(file_path, interval=60, every=100)
+    set_rating(1, 1, 5)
+    stop_autosave()
+    assert autosave.saves == 0
+    with open(file_path, encoding="utf-8") as f:
+        assert json.load(f)["ratings"][0]["value"] == 2
+
+
+def test_write_system_snapshot_branch_drops_journaled_changes_the_copy_holds(tmp_path):
+    """
+    Tests that writing a copy cuts the journal down to the changes made after the copy was taken
+    """
+    reset_state()
+    file_path = str(tmp_path / "system_data.json")
+    journal = enable_journal(file_path)
+
+    try:
+        set_rating(1, 1, 2)
+        set_rating(2, 1, 3)
+        snapshot, versions = capture_system_snapshot()
+        offset = journal_offset_for(file_path)
+        set_rating(3, 1, 4)
+
+        assert journal_offset_for(str(tmp_path / "other.json")) is None
+        assert write_system_snapshot(file_path, snapshot, versions, journal_offset=offset) is True
+        assert [e["r"]["user_id"] for e in read_journal(journal.path)] == [3]
+    finally:
+        disable_journal()
+
+    reset_state()
+    load_system_data(file_path, print_func=lambda _: None)
+    assert sorted(r["user_id"] for r in RATINGS) == [1, 2, 3]
+
+
+def test_autosave_branch_takes_over_journal_checkpoints(tmp_path, monkeypatch):
+    """
+    Tests that a journal past its checkpoint size asks the autosave worker for a save
+    instead of writing the checkpoint on the thread that made the change
+    """
+    reset_state()
+    file_path = str(tmp_path / "system_data.json")
+    checkpoints = []
+    monkeypatch.setattr(persistence, "checkpoint_system_data", lambda *args, **kwargs: checkpoints.append(1))
+
+    journal = enable_journal(file_path, checkpoint_bytes=1)
+    autosave = start_autosave(file_path, interval=60, every=100)
+
+    try:
+        set_rating(1, 1, 4)
+        set_rating(2, 1, 4)
+        assert wait_for(lambda: autosave.saves == 1)
+        assert checkpoints == []
+        assert journal.size == 0
+        with open(file_path, encoding="utf-8") as f:
+            assert len(json.load(f)["ratings"]) == 2
+    finally:
+        stop_autosave()
+
+    assert persistence.CHECKPOINT_SCHEDULER is None
+    set_rating(3, 1, 4)
+    set_rating(4, 1, 4)
+    disable_journal()
+    assert checkpoints == [1]
+
+
+def test_write_system_snapshot_branch_skips_copy_older_than_file(tmp_path):
+    """
+    Tests that a copy taken before a later save does not overwrite that save
+    """
+    reset_state()
+    set_rating(1, 1, 2)
+    snapshot, versions = capture_system_snapshot()
+    set_rating(1, 1, 5)
+    assert snapshot["ratings"][0]["value"] == 2
+
+    file_path = str(tmp_path / "system_data.bin")
+    save_system_data(file_path, print_func=lambda _: None)
+    assert write_system_snapshot(file_path, snapshot, versions) is False
+
+    other_path = str(tmp_path / "other.bin")
+    assert write_system_snapshot(other_path, snapshot, versions) is True
+    assert persistence.changed_sections(other_path) == ["ratings"]
@@ -11,13 +11,35 @@ They ensure all key path behaviours are covered:
 - non-string created_at
 - file missing branch
 - invalid snapshot keys branch
+- journal replay over (or without) a snapshot
+- the streaming snapshot reader
+- the binary snapshot format and the JSON/binary converter
+- gzip/bz2/lzma-compressed snapshots
+- section versions recorded on load
+- sharded snapshot directories
+- lazily loaded comment text
+- the memory-mapped snapshot view
 """
 
+import io
 import json
+import os
+from datetime import datetime, timedelta, timezone
 
-from app.persistence import deserialize_comment, load_system_data
-from app.data_store import USERS, SCHOOLS
-from app.reviews import RATINGS, COMMENTS
+import pytest
+
+from app.persistence import deserialize_comment, load_system_data, enable_journal, disable_journal
+from app.persistence import save_system_data, convert_snapshot, changed_sections
+from app import persistence
+from app.binary_snapshot import MAGIC, KIND_RECORDS, encode_section, decode_section
+from app.data_store import USERS, SCHOOLS, get_next_school_id, set_user_password
+from app.auth import get_next_user_id
+from app.snapshot_reader import SnapshotReader
+from app.reviews import RATINGS, COMMENTS, FAVOURITES
+from app.reviews import set_rating, add_comment_record, delete_comment_record, add_favourite_record
+from app.reviews import edit_comment_record, view_comments_for_school
+from app.comment_bodies import CommentBodies, LazyComment
+from app.snapshot_view import open_snapshot_view
 
 
 def reset_state():
@@ -143,3 +165,552 @@ def test_load_system_data_branch_success_restores_in_place(tmp_path):
     assert len(SCHOOLS) == 1
     assert len(RATINGS) == 1
     assert len(COMMENTS) == 1
+
+
+def test_load_system_data_branch_restores_id_sequences(tmp_path):
+    """
+    Tests the load_system_data branch where saved ID sequences are restored, so IDs of
+    records deleted before the save are not handed out again
+    """
+    reset_state()
+
+    file_path = tmp_path / "system_data.json"
+    snapshot = {
+        "users": [{"user_id": 1, "username": "u1", "password": "password123", "role": "student"}],
+        "schools": [{"school_id": 2, "name": "S2", "level": "primary", "location": "Edinburgh"}],
+        "ratings": [],
+        "comments": [{"comment_id": 3, "user_id": 1, "school_id": 2, "text": "ok", "created_at": None}],
+        "sequences": {"users": 5, "schools": 7, "comments": 9},
+    }
+    write_snapshot(str(file_path), snapshot)
+
+    success = load_system_data(str(file_path), print_func=lambda _: None)
+
+    assert success is True
+    assert get_next_user_id(USERS) == 6
+    assert get_next_school_id(SCHOOLS) == 8
+    assert COMMENTS.next_id() == 10
+
+
+def test_load_system_data_branch_without_sequences_uses_highest_ids(tmp_path):
+    """
+    Tests the load_system_data branch for older snapshots without sequences, where the
+    next IDs follow the highest stored IDs
+    """
+    reset_state()
+
+    file_path = tmp_path / "system_data.json"
+    snapshot = {
+        "users": [{"user_id": 4, "username": "u4", "password": "password123", "role": "student"}],
+        "schools": [{"school_id": 3, "name": "S3", "level": "primary", "location": "Edinburgh"}],
+        "ratings": [],
+        "comments": [{"user_id": 4, "school_id": 3, "text": "ok", "created_at": None}],
+    }
+    write_snapshot(str(file_path), snapshot)
+
+    success = load_system_data(str(file_path), print_func=lambda _: None)
+
+    assert success is True
+    assert get_next_user_id(USERS) == 5
+    assert get_next_school_id(SCHOOLS) == 4
+    assert COMMENTS[0]["comment_id"] == 1
+    assert COMMENTS.next_id() == 2
+
+
+def test_load_system_data_branch_migrates_string_school_ids(tmp_path):
+    """
+    Tests that school IDs stored as typed strings in older snapshots are loaded as ints
+    """
+    reset_state()
+
+    file_path = tmp_path / "system_data.json"
+    snapshot = {
+        "users": [{"user_id": 1, "username": "u1", "password": "password123", "role": "student"}],
+        "schools": [{"school_id": 7, "name": "S7", "level": "primary", "location": "Leicester"}],
+        "ratings": [
+            {"user_id": 1, "school_id": "007", "value": 4},
+            {"user_id": 2, "school_id": "7", "value": 2},
+        ],
+        "comments": [{"user_id": 1, "school_id": " 7", "text": "ok", "created_at": None}],
+        "favourites": [{"user_id": 1, "school_id": "SCH-1"}],
+    }
+    write_snapshot(str(file_path), snapshot)
+
+    success = load_system_data(str(file_path), print_func=lambda _: None)
+
+    assert success is True
+    assert [r["school_id"] for r in RATINGS] == [7, 7]
+    assert RATINGS.get_averages() == {7: 3.0}
+    assert COMMENTS[0]["school_id"] == 7
+    assert FAVOURITES[0]["school_id"] == "SCH-1"
+
+
+def test_load_system_data_branch_replays_journal_over_snapshot(tmp_path):
+    """
+    Tests that changes journaled after the last snapshot are replayed on load
+    """
+    reset_state()
+
+    file_path = str(tmp_path / "system_data.json")
+    write_snapshot(file_path, {
+        "users": [{"user_id": 1, "username": "u1", "password": "password123", "role": "student"}],
+        "schools": [{"school_id": 1, "name": "S1", "level": "primary", "location": "Leicester"}],
+        "ratings": [{"user_id": 1, "school_id": 1, "value": 2}],
+        "comments": [],
+    })
+
+    enable_journal(file_path)
+    try:
+        load_system_data(file_path, print_func=lambda _: None)
+        set_rating(1, 1, 5)
+        add_comment_record(1, 1, "Great")
+        add_favourite_record(1, 1)
+        set_user_password(USERS[0], "newpass123")
+        delete_comment_record(add_comment_record(1, 1, "Oops"))
+    finally:
+        disable_journal()
+
+    reset_state()
+    FAVOURITES.clear()
+    outputs = []
+
+    success = load_system_data(file_path, print_func=outputs.append)
+
+    assert success is True
+    assert any("Recovered 6 un-checkpointed change(s)" in line for line in outputs)
+    assert USERS[0]["password"] == "newpass123"
+    assert [r["value"] for r in RATINGS] == [5]
+    assert [c["text"] for c in COMMENTS] == ["Great"]
+    assert isinstance(COMMENTS[0]["created_at"], datetime)
+    assert COMMENTS.next_id() == 3
+    assert len(FAVOURITES) == 1
+
+
+def test_load_system_data_branch_journal_without_snapshot(tmp_path):
+    """
+    Tests that a journal is replayed even if no full snapshot was written yet,
+    and that a partly written last line is ignored
+    """
+    reset_state()
+
+    file_path = str(tmp_path / "system_data.json")
+    with open(file_path + ".journal", "w", encoding="utf-8") as f:
+        f.write('{"c":"schools","op":"put","r":{"school_id":4,"name":"S4","level":"primary","location":"York"}}\n')
+        f.write('{"c":"schools","op":"delete","r":{"school_')
+
+    success = load_system_data(file_path, print_func=lambda _: None)
+
+    assert success is True
+    assert [s["school_id"] for s in SCHOOLS] == [4]
+    assert get_next_school_id(SCHOOLS) == 5
+
+
+def test_snapshot_reader_branch_matches_json_load_across_chunk_boundaries():
+    """
+    Tests that the streaming reader yields the same sections as json.load, including
+    strings containing braces, nested values and numbers split between chunks
+    """
+    snapshot = {
+        "users": [{"user_id": 123456789, "username": "a}b", "password": "x", "role": "student"}],
+        "schools": [],
+        "ratings": [{"user_id": i, "school_id": 7, "value": 3} for i in range(40)],
+        "comments": [{"comment_id": 1, "text": "}, {\"nested\": [1, 2]} ]", "meta": {"a": [1, {"b": 2}]}}],
+        "sequences": {"users": 123456789, "schools": 0, "comments": 1},
+    }
+    text = json.dumps(snapshot, indent=2)
+
+    for chunk_size in (1, 7, 64, 4096):
+        sections = []
+        for key, value in SnapshotReader(io.StringIO(text), chunk_size=chunk_size).sections():
+            sections.append((key, value if isinstance(value, dict) else list(value)))
+        assert dict(sections) == snapshot
+
+
+def test_snapshot_reader_branch_unread_sections_are_skipped():
+    """
+    Tests that arrays the caller does not consume are skipped over
+    """
+    text = json.dumps({"extra": [{"x": 1}, {"x": 2}], "users": [{"user_id": 1}]})
+
+    sections = SnapshotReader(io.StringIO(text), chunk_size=5).sections()
+
+    assert next(sections)[0] == "extra"
+    key, users = next(sections)
+    assert (key, list(users)) == ("users", [{"user_id": 1}])
+
+
+def test_load_system_data_branch_streaming_failure_keeps_previous_state(tmp_path):
+    """
+    Tests that a snapshot that breaks off part-way does not replace the loaded state
+    """
+    reset_state()
+    SCHOOLS.append({"school_id": 9, "name": "Old", "level": "primary", "location": "York"})
+
+    file_path = tmp_path / "system_data.json"
+    file_path.write_text('{"users": [{"user_id": 1, "username": "u1"}], "schools": [{"school_id": 1', encoding="utf-8")
+
+    success = load_system_data(str(file_path), print_func=lambda _: None)
+
+    assert success is False
+    assert len(USERS) == 0
+    assert [s["school_id"] for s in SCHOOLS] == [9]
+    assert SCHOOLS.get_by_id(9)["name"] == "Old"
+
+
+def test_load_system_data_branch_non_streaming_loader(tmp_path):
+    """
+    Tests the load_system_data branch that parses the whole snapshot with json.load
+    """
+    reset_state()
+
+    file_path = tmp_path / "system_data.json"
+    write_snapshot(str(file_path), {
+        "users": [{"user_id": 2, "username": "u2", "password": "password123", "role": "student"}],
+        "schools": [],
+        "ratings": [{"user_id": 2, "school_id": "3", "value": 5}],
+        "comments": [{"comment_id": 4, "user_id": 2, "school_id": 3, "text": "ok", "created_at": "2025-12-17T12:00:00+00:00"}],
+    })
+
+    success = load_system_data(str(file_path), print_func=lambda _: None, streaming=False)
+
+    assert success is True
+    assert RATINGS[0]["school_id"] == 3
+    assert isinstance(COMMENTS[0]["created_at"], datetime)
+    assert COMMENTS.next_id() == 5
+
+
+def test_load_system_data_branch_binary_snapshot_round_trip(tmp_path):
+    """
+    Tests that a binary snapshot (picked by the .bin suffix) restores every collection,
+    including string school IDs and aware, naive and missing timestamps
+    """
+    reset_state()
+    FAVOURITES.clear()
+
+    USERS.append({"user_id": 1, "username": "u1", "password": "password123", "role": "student"})
+    SCHOOLS.append({"school_id": 7, "name": "S7", "level": "primary", "location": "Leicester"})
+    RATINGS.append({"user_id": 1, "school_id": 7, "value": 4})
+    RATINGS.append({"user_id": 1, "school_id": "SCH-1", "value": 2})
+    add_comment_record(1, 7, "Great", created_at=datetime(2025, 1, 1, 9, 30, tzinfo=timezone(timedelta(hours=2))))
+    add_comment_record(1, "SCH-1", "Naive", created_at=datetime(2024, 5, 6, 7, 8, 9, 10))
+    COMMENTS.append({"comment_id": 5, "user_id": 1, "school_id": 7, "text": "None", "created_at": None})
+    add_favourite_record(1, 7)
+    expected = [[dict(r) for r in store] for store in (USERS, SCHOOLS, RATINGS, COMMENTS, FAVOURITES)]
+
+    file_path = str(tmp_path / "system_data.bin")
+    assert save_system_data(file_path, print_func=lambda _: None) is True
+    with open(file_path, "rb") as f:
+        assert f.read(len(MAGIC)) == MAGIC
+
+    reset_state()
+    FAVOURITES.clear()
+    success = load_system_data(file_path, print_func=lambda _: None)
+
+    assert success is True
+    assert [[dict(r) for r in store] for store in (USERS, SCHOOLS, RATINGS, COMMENTS, FAVOURITES)] == expected
+    assert COMMENTS[0]["created_at"].utcoffset() == timedelta(hours=2)
+    assert COMMENTS.next_id() == 6
+
+
+def test_binary_snapshot_branch_records_that_do_not_fit_fall_back_to_json():
+    """
+    Tests that a section with records outside the fixed-width layout is stored as JSON records
+    """
+    odd_ratings = [{"user_id": 1, "school_id": 1}, {"user_id": 2, "school_id": 1, "value": 5}]
+
+    kind, payload = encode_section("ratings", odd_ratings)
+
+    assert kind == KIND_RECORDS
+    assert list(decode_section(kind, memoryview(payload))) == odd_ratings
+
+
+def test_convert_snapshot_branch_json_to_binary_and_back(tmp_path):
+    """
+    Tests that converting JSON to binary and back gives the same JSON document
+    """
+    reset_state()
+
+    json_path = str(tmp_path / "system_data.json")
+    write_snapshot(json_path, {
+        "users": [{"user_id": 1, "username": "u1", "password": "password123", "role": "student"}],
+        "schools": [{"school_id": 1, "name": "S1", "level": "primary", "location": "Leicester"}],
+        "ratings": [{"user_id": 1, "school_id": 1, "value": 3}],
+        "comments": [{"comment_id": 1, "user_id": 1, "school_id": 1, "text": "ok", "created_at": "2025-12-17T12:00:00+00:00"}],
+        "favourites": [{"user_id": 1, "school_id": 1, "created_at": None}],
+        "sequences": {"users": 1, "schools": 1, "comments": 1},
+    })
+
+    assert convert_snapshot(json_path, str(tmp_path / "copy.bin"), print_func=lambda _: None) is True
+    assert convert_snapshot(str(tmp_path / "copy.bin"), str(tmp_path / "copy.json"), print_func=lambda _: None) is True
+
+    with open(json_path, encoding="utf-8") as original, open(tmp_path / "copy.json", encoding="utf-8") as copy:
+        assert json.load(copy) == json.load(original)
+    assert len(USERS) == 0
+
+
+def test_load_system_data_branch_binary_flag_rejects_json_file(tmp_path):
+    """
+    Tests that forcing the binary format on a JSON file fails cleanly
+    """
+    reset_state()
+
+    file_path = str(tmp_path / "system_data.json")
+    write_snapshot(file_path, {"users": [], "schools": [], "ratings": [], "comments": []})
+
+    assert load_system_data(file_path, print_func=lambda _: None, binary=True) is False
+
+
+def test_load_system_data_branch_compressed_snapshots_round_trip(tmp_path):
+    """
+    Tests that JSON and binary snapshots saved with each compression suffix load back unchanged
+    """
+    reset_state()
+    USERS.append({"user_id": 1, "username": "u1", "password": "password123", "role": "student"})
+    SCHOOLS.append({"school_id": 7, "name": "S7", "level": "primary", "location": "Leicester"})
+    RATINGS.append({"user_id": 1, "school_id": 7, "value": 4})
+    add_comment_record(1, 7, "Great", created_at=datetime(2025, 1, 1, 9, 30, tzinfo=timezone.utc))
+    expected = [[dict(r) for r in store] for store in (USERS, SCHOOLS, RATINGS, COMMENTS)]
+
+    for name in ("data.json.gz", "data.json.bz2", "data.json.xz", "data.bin.gz", "data.bin.lzma"):
+        file_path = str(tmp_path / name)
+        assert save_system_data(file_path, print_func=lambda _: None) is True
+
+        for streaming in (True, False):
+            reset_state()
+            assert load_system_data(file_path, print_func=lambda _: None, streaming=streaming) is True
+            assert [[dict(r) for r in store] for store in (USERS, SCHOOLS, RATINGS, COMMENTS)] == expected
+
+
+def test_load_system_data_branch_records_versions_before_journal_replay(tmp_path):
+    """
+    Tests that a freshly loaded snapshot counts as unchanged, but replayed journal changes do not
+    """
+    reset_state()
+    file_path = str(tmp_path / "system_data.json")
+    USERS.append({"user_id": 1, "username": "u1", "password": "password123", "role": "student"})
+    save_system_data(file_path, print_func=lambda _: None)
+
+    reset_state()
+    assert load_system_data(file_path, print_func=lambda _: None) is True
+    assert changed_sections(file_path) == []
+
+    enable_journal(file_path)
+    try:
+        set_rating(1, 1, 4)
+    finally:
+        disable_journal()
+
+    reset_state()
+    assert load_system_data(file_path, print_func=lambda _: None) is True
+    assert changed_sections(file_path) == ["ratings"]
+
+
+def test_load_system_data_branch_sharded_directory_round_trip(tmp_path):
+    """
+    Tests that a sharded snapshot directory (JSON or binary section files) loads back unchanged
+    """
+    reset_state()
+    USERS.append({"user_id": 1, "username": "u1", "password": "password123", "role": "student"})
+    SCHOOLS.append({"school_id": 7, "name": "S7", "level": "primary", "location": "Leicester"})
+    RATINGS.append({"user_id": 1, "school_id": 7, "value": 4})
+    add_comment_record(1, 7, "Great", created_at=datetime(2025, 1, 1, 9, 30, tzinfo=timezone.utc))
+    add_favourite_record(1, 7)
+    expected = [[dict(r) for r in store] for store in (USERS, SCHOOLS, RATINGS, COMMENTS, FAVOURITES)]
+
+    for binary in (False, True):
+        directory = str(tmp_path / f"data_{binary}") + "/"
+        assert save_system_data(directory, print_func=lambda _: None, binary=binary) is True
+        suffix = ".bin" if binary else ".json"
+        assert sorted(os.listdir(directory)) == sorted(
+            name + suffix for name in ("users", "schools", "ratings", "comments", "favourites", "sequences")
+        )
+
+        reset_state()
+        FAVOURITES.clear()
+        assert load_system_data(directory, print_func=lambda _: None) is True
+        assert [[dict(r) for r in store] for store in (USERS, SCHOOLS, RATINGS, COMMENTS, FAVOURITES)] == expected
+        assert COMMENTS.next_id() == 2
+
+
+def test_save_system_data_branch_sharded_rewrites_only_changed_sections(tmp_path):
+    """
+    Tests that saving a sharded snapshot again only replaces the files of sections that changed
+    """
+    reset_state()
+    USERS.append({"user_id": 1, "username": "u1", "password": "password123", "role": "student"})
+    set_rating(1, 1, 3)
+    directory = str(tmp_path / "data") + "/"
+    save_system_data(directory, print_func=lambda _: None)
+    inodes = {name: os.stat(os.path.join(directory, name)).st_ino for name in os.listdir(directory)}
+
+    set_rating(1, 1, 5)
+    assert save_system_data(directory, print_func=lambda _: None) is True
+
+    replaced = {name for name in os.listdir(directory) if os.stat(os.path.join(directory, name)).st_ino != inodes[name]}
+    assert replaced == {"ratings.json"}
+
+
+def test_load_system_data_branch_sharded_directory_missing_section_fails(tmp_path):
+    """
+    Tests that a sharded snapshot without a required section file fails and keeps the loaded state
+    """
+    reset_state()
+    USERS.append({"user_id": 1, "username": "u1", "password": "password123", "role": "student"})
+    directory = str(tmp_path / "data") + "/"
+    save_system_data(directory, print_func=lambda _: None)
+    os.remove(os.path.join(directory, "comments.json"))
+
+    USERS.clear()
+    USERS.append({"user_id": 5, "username": "u5", "password": "password123", "role": "student"})
+
+    assert load_system_data(directory, print_func=lambda _: None) is False
+    assert [u["user_id"] for u in USERS] == [5]
+
+
+def test_load_system_data_branch_bad_journal_keeps_previous_state(tmp_path):
+    """
+    Tests that a journal that cannot be replayed rolls the stores back to the state before the load
+    """
+    reset_state()
+    file_path = tmp_path / "system_data.json"
+    write_snapshot(str(file_path), {
+        "users": [{"user_id": 1, "username": "u1", "password": "password123", "role": "student"}],
+        "schools": [], "ratings": [], "comments": [],
+    })
+    with open(f"{file_path}.journal", "w", encoding="utf-8") as f:
+        f.write('{"c":"users","op":"delete","r":{"user_id":1}}\n{"c":"nope","op":"put","r":{}}\n')
+
+    USERS.append({"user_id": 7, "username": "u7", "password": "password123", "role": "student"})
+    USERS.restore_sequence(40)
+
+    assert load_system_data(str(file_path), print_func=lambda _: None) is False
+    assert [u["user_id"] for u in USERS] == [7]
+    assert USERS.get_by_id(7)["username"] == "u7"
+    assert USERS.next_id() == 41
+
+
+def test_convert_snapshot_branch_single_file_to_sharded_directory(tmp_path):
+    """
+    Tests that a single-file snapshot can be split into a sharded directory and loaded from it
+    """
+    reset_state()
+    json_path = str(tmp_path / "system_data.json")
+    write_snapshot(json_path, {
+        "users": [{"user_id": 1, "username": "u1", "password": "password123", "role": "student"}],
+        "schools": [], "ratings": [], "comments": [],
+    })
+    directory = str(tmp_path / "data") + "/"
+
+    assert convert_snapshot(json_path, directory, print_func=lambda _: None) is True
+    assert load_system_data(directory, print_func=lambda _: None) is True
+    assert USERS[0]["username"] == "u1"
+
+
+def test_load_system_data_branch_lazy_comments_page_text_in_on_demand(tmp_path):
+    """
+    Tests that lazily loaded comments keep their text out of memory but still view, edit, delete and save normally
+    """
+    reset_state()
+    SCHOOLS.append({"school_id": 7, "name": "S7", "level": "primary", "location": "Leicester"})
+    for text in ("First", "Second ü", "Third"):
+        add_comment_record(1, 7, text, created_at=datetime(2025, 1, 1, tzinfo=timezone.utc))
+    expected = [dict(c) for c in COMMENTS]
+    file_path = str(tmp_path / "system_data.json")
+    save_system_data(file_path, print_func=lambda _: None)
+
+    reset_state()
+    assert load_system_data(file_path, print_func=lambda _: None, lazy_comments=True) is True
+    assert all("text" not in dict.keys(c) for c in COMMENTS)
+    assert [dict(c) for c in COMMENTS] == expected
+    assert COMMENTS[1]["text"] == "Second ü" and COMMENTS[1].get("text") == "Second ü"
+
+    outputs = []
+    view_comments_for_school(input_func=lambda _: "7", print_func=outputs.append)
+    assert any("Third" in line for line in outputs)
+
+    assert edit_comment_record(COMMENTS.get_by_id(1), "Edited")[0] is True
+    delete_comment_record(COMMENTS.get_by_id(2))
+    save_system_data(file_path, print_func=lambda _: None)
+    save_system_data(str(tmp_path / "system_data.bin"), print_func=lambda _: None)
+
+    for path in (file_path, str(tmp_path / "system_data.bin")):
+        reset_state()
+        load_system_data(path, print_func=lambda _: None)
+        assert sorted((c["comment_id"], c["text"]) for c in COMMENTS) == [(1, "Edited"), (3, "Third")]
+
+
+def test_load_system_data_branch_lazy_reload_closes_replaced_comment_bodies(tmp_path):
+    """
+    Tests that a lazy load closes the comment text file of the stores it replaces,
+    and that a failed load closes its own file and keeps the loaded one open
+    """
+    reset_state()
+    add_comment_record(1, 7, "Kept", created_at=datetime(2025, 1, 1, tzinfo=timezone.utc))
+    file_path = str(tmp_path / "system_data.json")
+    save_system_data(file_path, print_func=lambda _: None)
+
+    assert load_system_data(file_path, print_func=lambda _: None, lazy_comments=True) is True
+    first = persistence.ACTIVE_COMMENT_BODIES
+    assert load_system_data(file_path, print_func=lambda _: None, lazy_comments=True) is True
+    second = persistence.ACTIVE_COMMENT_BODIES
+    assert first._file.closed and not second._file.closed
+
+    with open(file_path + ".journal", "w", encoding="utf-8") as f:
+        f.write('{"c":"unknown","op":"put","r":{}}\n')
+    assert load_system_data(file_path, print_func=lambda _: None, lazy_comments=True) is False
+    assert persistence.ACTIVE_COMMENT_BODIES is second
+    assert COMMENTS[0]["text"] == "Kept"
+
+    os.remove(file_path + ".journal")
+    assert load_system_data(file_path, print_func=lambda _: None) is True
+    assert second._file.closed and persistence.ACTIVE_COMMENT_BODIES is None
+
+
+def test_comment_bodies_branch_cache_keeps_only_recent_texts():
+    """
+    Tests that the comment text cache evicts the least recently read text
+    """
+    bodies = CommentBodies(cache_size=2)
+    refs = [bodies.store(text) for text in ("a", "bb", "ccc")]
+
+    assert [bodies.read(ref) for ref in refs] == ["a", "bb", "ccc"]
+    assert bodies.cached == 2
+    assert bodies.read(refs[0]) == "a"
+    bodies.close()
+
+
+def test_snapshot_view_branch_counts_and_totals_without_loading(tmp_path):
+    """
+    Tests that a mapped binary snapshot gives counts, averages and contributions without touching the stores
+    """
+    reset_state()
+    USERS.append({"user_id": 1, "username": "u1", "password": "password123", "role": "student"})
+    SCHOOLS.append({"school_id": 7, "name": "S7", "level": "primary", "location": "Leicester"})
+    RATINGS.append({"user_id": 1, "school_id": 7, "value": 4})
+    RATINGS.append({"user_id": 2, "school_id": 7, "value": 1})
+    RATINGS.append({"user_id": 1, "school_id": "SCH-1", "value": 2})
+    add_comment_record(1, 7, "Great")
+    add_comment_record(2, 7, "Fine ü")
+    file_path = str(tmp_path / "system_data.bin")
+    save_system_data(file_path, print_func=lambda _: None)
+    reset_state()
+
+    with open_snapshot_view(file_path) as view:
+        assert [view.count(name) for name in ("users", "schools", "ratings", "comments", "favourites")] == [1, 1, 3, 2, 0]
+        assert view.average_ratings() == {7: 2.5, "SCH-1": 2.0}
+        assert view.contribution_counts() == {1: 3, 2: 2}
+        assert view.records("schools")[0]["name"] == "S7"
+        assert view.value("sequences")["comments"] == 2
+    assert len(RATINGS) == 0
+
+
+def test_snapshot_view_branch_rejects_compressed_snapshot(tmp_path):
+    """
+    Tests that only an uncompressed binary snapshot can be mapped
+    """
+    reset_state()
+    file_path = str(tmp_path / "system_data.bin.gz")
+    save_system_data(file_path, print_func=lambda _: None)
+
+    with pytest.raises(ValueError):
+        open_snapshot_view(file_path)
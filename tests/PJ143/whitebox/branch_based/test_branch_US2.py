@@ -10,6 +10,7 @@ from app.validation import (
     validate_school_location,
     check_duplicate_school
 )
+from app.data_store import SCHOOLS, update_school, delete_school
 
 
 # validate_school_name branches
@@ -133,3 +134,22 @@ def test_duplicate_whitespace_strip():
     schools = [{"name": "  Test  ", "location": "  London  "}]
     is_unique, _ = check_duplicate_school(schools, "Test", "London")
     assert not is_unique
+
+
+def test_duplicate_global_index_add_update_delete():
+    """Branch: global schools list is checked through its (name, location) index"""
+    SCHOOLS.clear()
+    SCHOOLS.append({"school_id": 1, "name": "  Test  ", "level": "primary", "location": "London"})
+    SCHOOLS.append({"school_id": 2, "name": "Other", "level": "primary", "location": "Leeds"})
+
+    assert check_duplicate_school(SCHOOLS, "test", "LONDON")[0] is False
+    # the school being updated is not a duplicate of itself
+    assert check_duplicate_school(SCHOOLS, "Test", "London", exclude_school_id=1)[0] is True
+    assert check_duplicate_school(SCHOOLS, "Test", "London", exclude_school_id=2)[0] is False
+
+    update_school(SCHOOLS[0], "Renamed", "primary", "London")
+    assert check_duplicate_school(SCHOOLS, "Test", "London")[0] is True
+    assert check_duplicate_school(SCHOOLS, "renamed", "london")[0] is False
+
+    delete_school(1)
+    assert check_duplicate_school(SCHOOLS, "Renamed", "London")[0] is True
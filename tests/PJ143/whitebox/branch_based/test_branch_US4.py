@@ -5,7 +5,7 @@ Testing all execution branches
 """
 
 from app.admin_actions import delete_school_by_id
-from app.data_store import SCHOOLS
+from app.data_store import SCHOOLS, get_school_by_id
 
 
 def test_schools_empty_branch():
@@ -175,3 +175,19 @@ def test_continue_after_empty_input():
 
     assert result is True
     assert len(SCHOOLS) == 0
+
+
+def test_deleted_school_removed_from_index():
+    """Branch: delete through the school_id index keeps list order and index in step"""
+    SCHOOLS.clear()
+    SCHOOLS.append({"school_id": 1, "name": "Test1", "level": "primary", "location": "London"})
+    SCHOOLS.append({"school_id": 2, "name": "Test2", "level": "primary", "location": "London"})
+    SCHOOLS.append({"school_id": 3, "name": "Test3", "level": "primary", "location": "London"})
+
+    inputs = iter(["2", "2"])
+    result = delete_school_by_id(lambda _: next(inputs), lambda _: None)
+
+    assert result is True
+    assert [s["school_id"] for s in SCHOOLS] == [1, 3]
+    assert get_school_by_id(2) is None
+    assert get_school_by_id("3")["name"] == "Test3"
@@ -1,5 +1,5 @@
 from app.school_actions import _calculate_average_ratings
-from app.reviews import RATINGS
+from app.reviews import RATINGS, set_rating
 
 def test_average_rating_empty_list():
 
@@ -16,4 +16,23 @@ def test_average_rating_single_entry():
     )
 
     avgs = _calculate_average_ratings()
-    assert avgs["1"] == 5.0
\ No newline at end of file
+    assert avgs[1] == 5.0
+
+def test_average_rating_follows_rating_changes():
+
+    RATINGS.clear()
+    set_rating(1, "1", 5)
+    set_rating(2, "1", 3)
+
+    assert _calculate_average_ratings()[1] == 4.0
+
+    # changing an existing rating adjusts the running totals
+    set_rating(2, "1", 1)
+    assert _calculate_average_ratings()[1] == 3.0
+
+    # removing a rating takes it back out of the totals
+    RATINGS.pop()
+    assert _calculate_average_ratings()[1] == 5.0
+
+    RATINGS.pop()
+    assert _calculate_average_ratings() == {}
@@ -21,3 +21,36 @@ def test_export_file_write_failure(monkeypatch, capsys):
     assert result is False
     assert "No schools available to export" in out
 
+
+def test_export_from_snapshot_view_matches_loaded_stores(tmp_path):
+    """Test that a report exported from a mapped binary snapshot matches one from the loaded stores."""
+    from app.data_store import SCHOOLS
+    from app.reviews import RATINGS
+    from app.persistence import save_system_data
+    from app.snapshot_view import open_snapshot_view
+
+    SCHOOLS.clear()
+    RATINGS.clear()
+    SCHOOLS.append({"school_id": 1, "name": "A", "level": "primary", "location": "L"})
+    SCHOOLS.append({"school_id": 2, "name": "B", "level": "primary", "location": "L"})
+    SCHOOLS.append({"school_id": "SCH-3", "name": "C", "level": "secondary", "location": "L"})
+    RATINGS.extend([
+        {"user_id": 1, "school_id": 1, "value": 2},
+        {"user_id": 2, "school_id": 2, "value": 5},
+        {"user_id": 1, "school_id": "SCH-3", "value": 4},
+    ])
+    path = str(tmp_path / "system_data.bin")
+    save_system_data(path, print_func=lambda _: None)
+
+    assert export_top_schools_report(str(tmp_path / "stores.txt"), print_func=lambda _: None) is True
+    SCHOOLS.clear()
+    RATINGS.clear()
+    with open_snapshot_view(path) as view:
+        assert export_top_schools_report(str(tmp_path / "view.txt"), print_func=lambda _: None, snapshot=view) is True
+
+    def body(name):
+        lines = (tmp_path / name).read_text(encoding="utf-8").splitlines()
+        return [line for line in lines if not line.startswith("Generated on")]
+
+    assert body("view.txt") == body("stores.txt")
+    assert "B (ID 2) - Avg Rating: 5.00" in "\n".join(body("view.txt"))
@@ -1,5 +1,5 @@
 from app.admin_actions import delete_user_by_id, list_all_users
-from app.data_store import USERS, add_user
+from app.data_store import USERS, add_user, get_user_by_id
 
 def setup_users_multiple():
     USERS.clear()
@@ -27,4 +27,16 @@ def test_whitebox_empty_list_no_users():
 
     assert result is False
     assert outputs[0] == "Error: User does not exist."
-    assert USERS == []
\ No newline at end of file
+    assert USERS == []
+
+def test_whitebox_delete_student_updates_index():
+    setup_users_multiple()
+    outputs = []
+    mock_print = lambda msg: outputs.append(msg)
+
+    result = delete_user_by_id(2, mock_print)
+
+    assert result is True
+    assert outputs[0] == "User 'john' (ID 2) has been deleted."
+    assert get_user_by_id(2) is None
+    assert [u["user_id"] for u in USERS] == [1, 3]
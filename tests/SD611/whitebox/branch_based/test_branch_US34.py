@@ -25,4 +25,24 @@ def test_delete_comment_boundary_first_item():
 
     assert result is True
     assert outputs[0] == "Comment #1 from user 10 has been deleted."
-    assert len(COMMENTS) == 0
\ No newline at end of file
+    assert len(COMMENTS) == 0
+
+def test_delete_comment_ids_stay_stable():
+    """Ensures comment IDs do not shift after an earlier comment is deleted."""
+    clear_comments()
+    add_comment_record(1, "S1", "First")
+    add_comment_record(2, "S1", "Second")
+    third = add_comment_record(3, "S1", "Third")
+
+    outputs = []
+    mock_print = lambda msg: outputs.append(msg)
+
+    assert delete_comment_by_id(1, mock_print) is True
+    assert third["comment_id"] == 3
+
+    # the old ID is not reused and later IDs still point at the same comments
+    assert delete_comment_by_id(1, mock_print) is False
+    assert delete_comment_by_id(3, mock_print) is True
+    assert outputs[-1] == "Comment #3 from user 3 has been deleted."
+    assert [c["text"] for c in COMMENTS] == ["Second"]
+    assert add_comment_record(4, "S1", "Fourth")["comment_id"] == 4
@@ -38,4 +38,188 @@ def test_statistics_partial_empty_lists():
     assert "Total Users: 1" in outputs[1]
     assert "Total Schools: 0" in outputs[2]
     assert "Total Ratings: 2" in outputs[3]
-    assert "Total Comments: 0" in outputs[4]
\ No newline at end of file
+    assert "Total Comments: 0" in outputs[4]
+
+
+def test_statistics_from_snapshot_view_branch(tmp_path):
+    """Test branch where the counts come from a mapped binary snapshot instead of the stores."""
+    from app.admin_actions import view_system_statistics
+    from app.data_store import USERS, SCHOOLS
+    from app.reviews import RATINGS, COMMENTS
+    from app.persistence import save_system_data
+    from app.snapshot_view import open_snapshot_view
+
+    USERS.clear()
+    SCHOOLS.clear()
+    RATINGS.clear()
+    COMMENTS.clear()
+
+    USERS.append({"user_id": 1})
+    SCHOOLS.append({"school_id": 1, "name": "S1", "level": "primary", "location": "L"})
+    RATINGS.extend([{"user_id": 1, "school_id": 1, "value": 5}, {"user_id": 2, "school_id": 1, "value": 3}])
+    path = str(tmp_path / "system_data.bin")
+    save_system_data(path, print_func=lambda _: None)
+
+    USERS.clear()
+    RATINGS.clear()
+
+    outputs = []
+    with open_snapshot_view(path) as view:
+        view_system_statistics(print_func=lambda x: outputs.append(x), snapshot=view)
+
+    assert "Total Users: 1" in outputs[1]
+    assert "Total Schools: 1" in outputs[2]
+    assert "Total Ratings: 2" in outputs[3]
+    assert "Total Comments: 0" in outputs[4]
+
+
+def test_metrics_histogram_percentiles_branch():
+    """Test branch where percentiles are read from log buckets within their precision."""
+    from app.metrics import Histogram, _bucket_index, _bucket_upper
+
+    assert _bucket_index(0) == 0
+    for value in list(range(1, 200)) + [10 ** 6 + 7, 3 * 10 ** 9]:
+        index = _bucket_index(value)
+        assert _bucket_upper(index - 1) < value <= _bucket_upper(index)
+
+    histogram = Histogram()
+    assert histogram.percentile(50) == 0
+    for micros in range(1, 1001):
+        histogram.record(micros * 1000)
+
+    assert histogram.count == 1000
+    for percent in (50, 95, 99):
+        exact = percent * 10 * 1000
+        assert exact <= histogram.percentile(percent) <= exact * 1.035
+    assert histogram.percentile(100) == histogram.max_ns == 1_000_000
+
+
+def test_metrics_timed_counts_calls_and_errors_branch():
+    """Test branch where timed functions count every call, including failed ones, unless metrics are disabled."""
+    from app import metrics
+
+    @metrics.timed("test.action")
+    def action(fail):
+        if fail:
+            raise ValueError("bad")
+        return "ok"
+
+    metrics.reset_metrics()
+    assert action(False) == "ok"
+    try:
+        action(True)
+    except ValueError:
+        pass
+    with metrics.measure("test.block"):
+        pass
+
+    metrics.disable_metrics()
+    try:
+        action(False)
+    finally:
+        metrics.enable_metrics()
+
+    # calls timed on another thread are merged into the same action
+    import threading
+    worker = threading.Thread(target=action, args=(False,))
+    worker.start()
+    worker.join()
+
+    snapshot = metrics.metrics_snapshot()
+    assert snapshot["test.action"]["calls"] == 3
+    assert snapshot["test.block"]["calls"] == 1
+    assert action.__name__ == "action"
+
+
+def test_statistics_show_action_latency_branch(tmp_path):
+    """Test branch where timed core actions are listed after the counts and dumped as JSON."""
+    import json
+    from app import metrics
+    from app.reviews import set_rating
+    from app.school_actions import _calculate_average_ratings
+
+    SCHOOLS.clear()
+    SCHOOLS.append({"school_id": 1, "name": "S1", "level": "primary", "location": "L"})
+    metrics.reset_metrics()
+    for user_id in range(1, 4):
+        set_rating(user_id, 1, 4)
+    _calculate_average_ratings()
+
+    outputs = []
+    view_system_statistics(print_func=lambda x: outputs.append(x))
+
+    assert outputs[5] == "\n=== Action Latency (ms) ==="
+    assert any(line.startswith("set_rating: 3 calls | p50 ") for line in outputs[6:])
+    assert any(line.startswith("calculate_average_ratings: 1 calls") for line in outputs[6:])
+
+    path = tmp_path / "metrics.json"
+    metrics.dump_metrics(str(path))
+    dumped = json.loads(path.read_text())["actions"]
+    assert dumped["set_rating"]["calls"] == 3
+    assert set(dumped["set_rating"]) >= {"p50_ms", "p95_ms", "p99_ms", "max_ms"}
+
+
+def test_statistics_without_timed_actions_branch():
+    """Test branch where nothing was timed yet, so only the counts are shown."""
+    from app import metrics
+
+    metrics.reset_metrics()
+    outputs = []
+    view_system_statistics(print_func=lambda x: outputs.append(x))
+
+    assert len(outputs) == 5
+
+
+def test_main_menu_dispatch_is_timed_branch(monkeypatch, tmp_path):
+    """Test branch where each menu choice is timed without its prompts and the metrics are written on exit when asked."""
+    import builtins
+    import json
+    import time
+    import app.main as main_mod
+    from app import metrics
+
+    def slow_search(input_func):
+        input_func("Enter search: ")
+
+    def slow_input(_=""):
+        time.sleep(0.05)
+        return next(inputs)
+
+    monkeypatch.setattr(main_mod, "DEFAULT_SYSTEM_DATA_PATH", str(tmp_path / "system.json"))
+    monkeypatch.setattr(main_mod, "METRICS_FILE", str(tmp_path / "metrics.json"))
+    monkeypatch.setattr(main_mod, "BUFFERED_LOGGING", False)
+    monkeypatch.setattr(main_mod, "example_users", lambda: None)
+    monkeypatch.setattr(main_mod, "show_main_menu", lambda: None)
+    monkeypatch.setattr(main_mod, "search_schools_by_name", slow_search)
+    inputs = iter(["6", "6", "8", "x", "0"])
+    monkeypatch.setattr(builtins, "input", slow_input)
+
+    metrics.reset_metrics()
+    main_mod.main()
+
+    dumped = json.loads((tmp_path / "metrics.json").read_text())["actions"]
+    assert dumped["menu.rankings"]["calls"] == 2
+    assert dumped["menu.exit"]["calls"] == 1
+    assert dumped["menu.search"]["calls"] == 1
+    assert dumped["menu.search"]["max_ms"] < 40
+    assert dumped["load_system_data"]["calls"] == 1
+    assert dumped["save_system_data"]["calls"] >= 1
+
+
+def test_main_menu_metrics_not_written_unless_asked_branch(monkeypatch, tmp_path):
+    """Test branch where METRICS_FILE is unset, so no metrics file is written."""
+    import builtins
+    import app.main as main_mod
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main_mod, "DEFAULT_SYSTEM_DATA_PATH", str(tmp_path / "system.json"))
+    monkeypatch.setattr(main_mod, "METRICS_FILE", None)
+    monkeypatch.setattr(main_mod, "BUFFERED_LOGGING", False)
+    monkeypatch.setattr(main_mod, "example_users", lambda: None)
+    monkeypatch.setattr(main_mod, "show_main_menu", lambda: None)
+    inputs = iter(["0"])
+    monkeypatch.setattr(builtins, "input", lambda _="": next(inputs))
+
+    main_mod.main()
+
+    assert not (tmp_path / "metrics.json").exists()
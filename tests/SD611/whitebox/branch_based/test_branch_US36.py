@@ -13,4 +13,49 @@ def test_trending_no_activity():
     outputs = []
     view_trending_schools(print_func=lambda x: outputs.append(x))
 
-    assert "No recent activity" in outputs[-1]
\ No newline at end of file
+    assert "No recent activity" in outputs[-1]
+
+def test_trending_from_snapshot_view(tmp_path):
+    """Trending activity is counted by the mapped snapshot view when one is given."""
+    from app.persistence import save_system_data
+    from app.snapshot_view import open_snapshot_view
+
+    SCHOOLS.clear()
+    RATINGS.clear()
+    COMMENTS.clear()
+
+    SCHOOLS.extend([{"school_id": 1, "name": "Quiet"}, {"school_id": 2, "name": "Busy"}])
+    RATINGS.extend([{"user_id": 1, "school_id": 2, "value": 5}, {"user_id": 2, "school_id": 2, "value": 4}])
+    path = str(tmp_path / "system_data.bin")
+    save_system_data(path, print_func=lambda _: None)
+    RATINGS.clear()
+
+    outputs = []
+    with open_snapshot_view(path) as view:
+        view_trending_schools(print_func=lambda x: outputs.append(x), snapshot=view)
+
+    assert "1. Busy (ID 2) - Activity Score: 2" in outputs
+
+
+def test_trending_counts_from_per_school_indexes():
+    """Test branch where activity comes from the rating counts and comment buckets of each school."""
+    from datetime import datetime, timezone
+
+    SCHOOLS.append({"school_id": 7, "name": "Busy"})
+    SCHOOLS.append({"school_id": 8, "name": "Quiet"})
+    RATINGS.append({"user_id": 1, "school_id": "007", "value": 4})
+    RATINGS.append({"user_id": 2, "school_id": 7, "value": None})
+    removed = {"user_id": 3, "school_id": 8, "value": 5}
+    RATINGS.append(removed)
+    RATINGS.discard(removed)
+    COMMENTS.append({"comment_id": 1, "user_id": 1, "school_id": "7", "text": "x",
+                     "created_at": datetime.now(timezone.utc)})
+
+    assert RATINGS.count_for_school(7) == 2
+    assert RATINGS.count_for_school(8) == 0
+
+    outputs = []
+    view_trending_schools(print_func=outputs.append)
+
+    assert outputs[1] == "1. Busy (ID 7) - Activity Score: 3"
+    assert outputs[2] == "2. Quiet (ID 8) - Activity Score: 0"
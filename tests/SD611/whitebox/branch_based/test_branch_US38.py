@@ -0,0 +1,214 @@
+import gzip
+import json
+import os
+import re
+import time
+
+import app.system_log as system_log
+from app.system_log import log_event, log_error, enable_buffered_logging, disable_buffered_logging, flush_log
+
+
+def wait_for(condition, timeout=5.0):
+    """Polls condition() until it is true or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_buffered_logging_waits_for_flush_branch(tmp_path):
+    """Test branch where lines are queued and only written once a flush is asked for."""
+    log_file = tmp_path / "system.log"
+    system_log.LOG_FILE = str(log_file)
+    enable_buffered_logging(flush_bytes=1 << 20, flush_interval=60)
+
+    try:
+        log_event("first")
+        log_error("second")
+        time.sleep(0.05)
+        assert not log_file.exists() or log_file.read_text() == ""
+
+        flush_log()
+        lines = log_file.read_text().splitlines()
+        assert re.fullmatch(r"\[INFO\] \d{4}-\d\d-\d\d \d\d:\d\d:\d\d - first", lines[0])
+        assert lines[1].startswith("[ERROR]") and lines[1].endswith(" - second")
+    finally:
+        disable_buffered_logging()
+
+
+def test_buffered_logging_size_threshold_branch(tmp_path):
+    """Test branch where enough queued bytes are written without a flush."""
+    log_file = tmp_path / "system.log"
+    system_log.LOG_FILE = str(log_file)
+    enable_buffered_logging(flush_bytes=100, flush_interval=60)
+
+    try:
+        for i in range(5):
+            log_event(f"login failed for user{i}")
+        assert wait_for(lambda: log_file.exists() and log_file.read_text().count("\n") >= 2)
+    finally:
+        disable_buffered_logging()
+
+
+def test_buffered_logging_interval_and_disable_branch(tmp_path):
+    """Test branch where a lone line is written after the interval, and disabling goes back to direct writes."""
+    log_file = tmp_path / "system.log"
+    system_log.LOG_FILE = str(log_file)
+    enable_buffered_logging(flush_bytes=1 << 20, flush_interval=0.05)
+
+    log_event("timed")
+    assert wait_for(lambda: log_file.exists() and "timed" in log_file.read_text())
+
+    log_event("queued")
+    disable_buffered_logging()
+    log_event("direct")
+
+    lines = log_file.read_text().splitlines()
+    assert [line.split(" - ")[1] for line in lines] == ["timed", "queued", "direct"]
+
+
+def test_structured_json_lines_branch(tmp_path, monkeypatch):
+    """Test branch where each event is written as one JSON object with its typed fields."""
+    log_file = tmp_path / "system.log"
+    monkeypatch.setattr(system_log, "LOG_FILE", str(log_file))
+    monkeypatch.setattr(system_log, "LOG_FORMAT", "json")
+
+    before = time.time()
+    log_error("Login failed", event="login_failed", user_id=3, username="bob")
+    log_event("School added")
+
+    first, second = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert list(first)[:6] == ["level", "ts", "event", "user_id", "school_id", "message"]
+    assert first["level"] == "ERROR" and first["event"] == "login_failed"
+    assert first["user_id"] == 3 and first["school_id"] is None and first["username"] == "bob"
+    assert before <= first["ts"] <= time.time()
+    assert second["event"] is None and second["message"] == "School added"
+
+
+def test_text_format_appends_fields_branch(tmp_path, monkeypatch):
+    """Test branch where the text format lists the fields after the message."""
+    log_file = tmp_path / "system.log"
+    monkeypatch.setattr(system_log, "LOG_FILE", str(log_file))
+
+    log_event("User deleted", event="user_deleted", user_id=4, username="amy")
+
+    assert log_file.read_text().endswith(" - User deleted (event='user_deleted', user_id=4, username='amy')\n")
+
+
+def test_size_rotation_keeps_compressed_backups_branch(tmp_path, monkeypatch):
+    """Test branch where the log is rotated by size and only LOG_BACKUPS compressed backups are kept."""
+    log_file = tmp_path / "system.log"
+    monkeypatch.setattr(system_log, "LOG_FILE", str(log_file))
+    monkeypatch.setattr(system_log, "ROTATE_BYTES", 200)
+    monkeypatch.setattr(system_log, "LOG_BACKUPS", 2)
+    monkeypatch.setattr(system_log, "COMPRESS_BACKUPS", True)
+
+    for i in range(20):
+        log_event(f"event number {i:02d}")
+
+    paths = system_log.log_file_paths()
+    assert [os.path.basename(path) for path in paths] == ["system.log.2.gz", "system.log.1.gz", "system.log"]
+    assert os.path.getsize(log_file) <= 200
+    with gzip.open(paths[1], "rt", encoding="utf-8") as f:
+        last_backed_up = int(f.read().splitlines()[-1][-2:])
+    live = [int(line[-2:]) for line in log_file.read_text().splitlines()]
+    assert live[0] == last_backed_up + 1 and live[-1] == 19
+
+
+def test_time_rotation_branch(tmp_path, monkeypatch):
+    """Test branch where a new rotation period moves the old log to a backup, also when buffered."""
+    log_file = tmp_path / "system.log"
+    monkeypatch.setattr(system_log, "LOG_FILE", str(log_file))
+    monkeypatch.setattr(system_log, "ROTATE_SECONDS", 60)
+
+    log_event("yesterday")
+    old = time.time() - 3600
+    os.utime(log_file, (old, old))
+    log_event("today")
+
+    assert (tmp_path / "system.log.1").read_text().count("\n") == 1
+    assert "today" in log_file.read_text() and "yesterday" not in log_file.read_text()
+
+    enable_buffered_logging(flush_bytes=1 << 20, flush_interval=60)
+    try:
+        os.utime(log_file, (old, old))
+        log_event("buffered")
+        flush_log()
+    finally:
+        disable_buffered_logging()
+    assert "today" in (tmp_path / "system.log.1").read_text()
+    assert "yesterday" in (tmp_path / "system.log.2").read_text()
+
+
+def write_lines(log_file, events, log_format):
+    """Writes (minute, level, message, fields) events with fixed times straight to a log file."""
+    base = 1_750_000_000 // 60 * 60
+    with open(log_file, "a", encoding="utf-8") as f:
+        for minute, level, message, fields in events:
+            f.write(system_log.format_line(level, base + minute * 60 + 5, message, fields, log_format))
+    return base
+
+
+def test_log_query_time_and_level_branch(tmp_path):
+    """Test branch where only the blocks of the asked minutes and level are read."""
+    from app.log_query import LogIndex
+
+    for log_format in ("text", "json"):
+        log_file = str(tmp_path / f"{log_format}.log")
+        events = [(minute, "INFO", f"tick {minute}", {"event": "tick"}) for minute in range(30)]
+        events.insert(10, (9, "ERROR", "Disk failure", {"event": "disk", "path": "a, b"}))
+        events.insert(25, (23, "ERROR", "Disk failure", {"event": "disk", "path": "c"}))
+        base = write_lines(log_file, events, log_format)
+
+        index = LogIndex(log_file)
+        assert index.update() == 32
+        entry = next(iter(index.files.values()))
+        assert len(index._blocks(entry, "ERROR", None, None, None)) == 2
+        assert len(index._blocks(entry, None, None, base + 5 * 60, base + 7 * 60)) == 3
+
+        errors = list(index.query(level="ERROR", since=base + 20 * 60))
+        assert [(r["event"], r["path"], r["ts"]) for r in errors] == [("disk", "c", base + 23 * 60 + 5)]
+        assert [r["path"] for r in index.query(event="disk")] == ["a, b", "c"]
+        assert [r["message"] for r in index.query(since=base + 29 * 60)] == ["tick 29"]
+
+
+def test_log_query_incremental_update_branch(tmp_path):
+    """Test branch where an update only indexes the lines appended since the last one."""
+    from app.log_query import LogIndex, query_log
+
+    log_file = str(tmp_path / "system.log")
+    write_lines(log_file, [(0, "ERROR", "Login failed", {"event": "login_failed", "username": "bob"})], "text")
+    assert LogIndex(log_file).update() == 1
+
+    write_lines(log_file, [(1, "ERROR", "Login failed", {"event": "login_failed", "username": "amy"})], "text")
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write("[INFO] 2025-06-15 12:00:00 - half writ")
+    index = LogIndex(log_file)
+    assert index.update() == 1
+    assert index.update() == 0
+
+    records = query_log(log_file, event="login_failed", fields={"username": "amy"})
+    assert [(r["level"], r["username"]) for r in records] == [("ERROR", "amy")]
+
+
+def test_log_query_across_rotated_backups_branch(tmp_path, monkeypatch):
+    """Test branch where rotated and compressed backups are indexed and queried with the live log."""
+    from app.log_query import LogIndex
+
+    log_file = tmp_path / "system.log"
+    monkeypatch.setattr(system_log, "LOG_FILE", str(log_file))
+    monkeypatch.setattr(system_log, "LOG_FORMAT", "json")
+
+    log_error("Login failed", event="login_failed", username="bob")
+    index = LogIndex()
+    assert index.update() == 1
+
+    system_log.rotate_log()
+    monkeypatch.setattr(system_log, "COMPRESS_BACKUPS", True)
+    log_error("Login failed", event="login_failed", username="bob")
+    system_log.rotate_log()
+    log_error("Login failed", event="login_failed", username="bob")
+
+    index = LogIndex()
+    assert index.update() == 2  # the renamed first log keeps its index entry
+    assert len(list(index.query(event="login_failed", fields={"username": "bob"}))) == 3
@@ -13,6 +13,6 @@ def test_average_rating_concolic():
     avgs = _calculate_average_ratings()
 
     # Path 1: aggregation
-    assert avgs["1"] == 4.0
+    assert avgs[1] == 4.0
     # Path 2: single entry
-    assert avgs["2"] == 4.0
\ No newline at end of file
+    assert avgs[2] == 4.0
\ No newline at end of file
@@ -13,5 +13,5 @@ def test_average_rating_uneven_counts():
 
     avgs = _calculate_average_ratings()
 
-    assert avgs["1"] == 3.0
-    assert avgs["2"] == 4.0
+    assert avgs[1] == 3.0
+    assert avgs[2] == 4.0
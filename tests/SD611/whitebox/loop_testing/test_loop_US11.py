@@ -12,5 +12,5 @@ def test_average_rating_multiple_schools():
 
     avgs = _calculate_average_ratings()
 
-    assert avgs["1"] == 5.0
-    assert avgs["2"] == 3.0
\ No newline at end of file
+    assert avgs[1] == 5.0
+    assert avgs[2] == 3.0
\ No newline at end of file
@@ -8,8 +8,15 @@ Hits branches:
 - favourites exist
 """
 
-from app.reviews import view_favourite_schools, FAVOURITES
-from app.data_store import set_current_user, clear_current_user
+from app.reviews import (
+    view_favourite_schools,
+    add_favourite_record,
+    remove_favourite_record,
+    find_favourite,
+    count_favourites_for_school,
+    FAVOURITES,
+)
+from app.data_store import set_current_user, clear_current_user, SCHOOLS
 
 
 def reset_state():
@@ -48,3 +55,28 @@ def test_branch_has_favourites():
     ok, result = view_favourite_schools(input_func=lambda _: "", print_func=lambda _: None)
     assert ok is True
     assert len(result) == 1
+
+
+def test_branch_favourites_resolve_names_and_follow_removal():
+    reset_state()
+    SCHOOLS.append({"school_id": 1, "name": "Alpha School", "level": "primary", "location": "Leeds"})
+    SCHOOLS.append({"school_id": 2, "name": "Beta School", "level": "primary", "location": "Leeds"})
+    add_favourite_record(1, "1")
+    add_favourite_record(1, "2")
+    add_favourite_record(2, "2")
+
+    assert count_favourites_for_school("2") == 2
+
+    set_current_user({"user_id": 1, "username": "u", "role": "student"})
+    outputs = []
+    ok, result = view_favourite_schools(input_func=lambda _: "", print_func=outputs.append)
+    assert ok is True
+    assert "- 1: Alpha School" in outputs
+    assert "- 2: Beta School" in outputs
+
+    assert remove_favourite_record(1, "2") is True
+    assert remove_favourite_record(1, "2") is False
+    assert find_favourite(1, "2") is None
+    assert find_favourite(2, "2") is not None
+    assert count_favourites_for_school("2") == 1
+    assert len(FAVOURITES) == 2
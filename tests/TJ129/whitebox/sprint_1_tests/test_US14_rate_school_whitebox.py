@@ -4,7 +4,14 @@ White-box tests for US14 - Rate a School.
 These tests focus on exercising different internal branches in rate_school.
 """
 
-from app.reviews import rate_school, clear_ratings, set_rating, RATINGS
+from app.reviews import (
+    rate_school,
+    clear_ratings,
+    set_rating,
+    find_rating,
+    get_average_rating_for_school,
+    RATINGS,
+)
 from app.data_store import set_current_user, clear_current_user
 
 
@@ -69,3 +76,61 @@ def test_branch_update_existing_rating():
     assert success is True
     assert len(RATINGS) == 1  
     assert result["value"] == 5
+
+
+def test_branch_find_rating_uses_pair_index():
+    """
+    Branch: find_rating resolves (user, school) pairs through the index,
+    including ratings appended directly to RATINGS.
+    """
+    clear_ratings()
+
+    set_rating(1, "SCH-1", 4)
+    RATINGS.append({"user_id": 2, "school_id": "SCH-1", "value": 2})
+
+    assert find_rating(1, "SCH-1")["value"] == 4
+    assert find_rating(2, "SCH-1")["value"] == 2
+    assert find_rating(1, "SCH-2") is None
+
+    # the same pair again updates in place instead of adding a rating
+    set_rating(2, "SCH-1", 5)
+    assert len(RATINGS) == 2
+    assert find_rating(2, "SCH-1")["value"] == 5
+
+
+def test_branch_removing_a_rating_keeps_indexes_and_totals():
+    """
+    Branch: removing a rating moves the last rating into its slot and keeps the pair index and totals in step.
+    """
+    clear_ratings()
+
+    first = set_rating(1, "SCH-1", 4)
+    set_rating(2, "SCH-1", 2)
+    set_rating(3, "SCH-2", 1)
+
+    assert RATINGS.discard(first) is True
+    assert find_rating(1, "SCH-1") is None
+    assert [r["user_id"] for r in RATINGS] == [3, 2]
+    assert get_average_rating_for_school("SCH-1") == 2
+    assert find_rating(3, "SCH-2")["value"] == 1
+
+    assert RATINGS.discard(first) is False
+
+
+def test_branch_numeric_school_id_is_stored_as_int():
+    """
+    Branch: a numeric school ID is normalized to an int, so "007" and "7"
+    rate the same school.
+    """
+    clear_ratings()
+    clear_current_user()
+
+    set_current_user({"user_id": 10, "username": "tester", "password": "pw", "role": "student"})
+
+    inputs = iter([" 007 ", "4"])
+    success, result = rate_school(input_func=lambda _: next(inputs, ""), print_func=lambda _: None)
+
+    assert success is True
+    assert result["school_id"] == 7
+    assert find_rating(10, "7") is result
+    assert find_rating(10, 7) is result
@@ -6,6 +6,9 @@ from app.reviews import (
     clear_comments,
     add_comment_record,
     get_comments_for_school,
+    get_user_comments_for_school,
+    edit_comment_record,
+    delete_comment_record,
 )
 
 def test_get_comments_sorted_newest_first():
@@ -27,3 +30,95 @@ def test_get_comments_sorted_oldest_first():
     result = get_comments_for_school("SCH-9", newest_first=False)
     assert result[0]["text"] == "Old"
     assert result[1]["text"] == "New"
+
+
+def test_get_comments_index_follows_edit_and_delete():
+    clear_comments()
+    t1 = datetime.now(timezone.utc) - timedelta(minutes=20)
+    t2 = datetime.now(timezone.utc) - timedelta(minutes=10)
+    first = add_comment_record(1, "SCH-9", "First", t1)
+    add_comment_record(2, "SCH-9", "Second", t2)
+    add_comment_record(1, "SCH-8", "Elsewhere", t2)
+
+    # editing refreshes the timestamp, so the edited comment becomes the newest
+    ok, _ = edit_comment_record(first, "First (edited)")
+    assert ok is True
+    result = get_comments_for_school("SCH-9")
+    assert [c["text"] for c in result] == ["First (edited)", "Second"]
+    assert [c["text"] for c in get_user_comments_for_school(1, "SCH-9")] == ["First (edited)"]
+
+    delete_comment_record(first)
+    assert [c["text"] for c in get_comments_for_school("SCH-9")] == ["Second"]
+    assert get_user_comments_for_school(1, "SCH-9") == []
+
+
+def test_get_comments_limit_returns_newest_page():
+    clear_comments()
+    base = datetime.now(timezone.utc)
+    for i in range(5):
+        add_comment_record(1, "SCH-7", f"c{i}", base + timedelta(minutes=i))
+
+    assert [c["text"] for c in get_comments_for_school("SCH-7", limit=2)] == ["c4", "c3"]
+    assert [c["text"] for c in get_comments_for_school("SCH-7", newest_first=False, limit=2)] == ["c0", "c1"]
+
+
+def test_get_comments_equal_timestamps_keep_insertion_order():
+    clear_comments()
+    base = datetime.now(timezone.utc)
+    add_comment_record(1, "SCH-6", "a", base)
+    add_comment_record(2, "SCH-6", "b", base + timedelta(minutes=1))
+    add_comment_record(3, "SCH-6", "c", base + timedelta(minutes=1))
+    add_comment_record(4, "SCH-6", "d", base + timedelta(minutes=2))
+
+    assert [c["text"] for c in get_comments_for_school("SCH-6", newest_first=False)] == ["a", "b", "c", "d"]
+    assert [c["text"] for c in get_comments_for_school("SCH-6", newest_first=False, limit=2)] == ["a", "b"]
+    assert [c["text"] for c in get_comments_for_school("SCH-6")] == ["d", "b", "c", "a"]
+
+
+def test_get_comments_offset_returns_later_pages():
+    clear_comments()
+    base = datetime.now(timezone.utc)
+    for i in range(5):
+        add_comment_record(1, "SCH-8", f"c{i}", base + timedelta(minutes=i))
+
+    assert [c["text"] for c in get_comments_for_school("SCH-8", limit=2, offset=2)] == ["c2", "c1"]
+    assert [c["text"] for c in get_comments_for_school("SCH-8", limit=2, offset=4)] == ["c0"]
+    assert [c["text"] for c in get_comments_for_school("SCH-8", newest_first=False, limit=2, offset=3)] == ["c3", "c4"]
+    assert get_comments_for_school("SCH-8", limit=2, offset=5) == []
+
+
+def test_view_comments_pages_until_the_user_stops():
+    from app.reviews import view_comments_for_school
+
+    clear_comments()
+    base = datetime.now(timezone.utc)
+    for i in range(5):
+        add_comment_record(1, "SCH-5", f"c{i}", base + timedelta(minutes=i))
+
+    outputs = []
+    answers = iter(["SCH-5", "", "0"])
+    success, shown = view_comments_for_school(
+        input_func=lambda _: next(answers), print_func=outputs.append, page_size=2,
+    )
+
+    assert success is True
+    assert [c["text"] for c in shown] == ["c4", "c3", "c2", "c1"]
+    assert "(showing 2 of 5 comments)" in outputs
+    assert "(showing 4 of 5 comments)" in outputs
+    assert not any("c0" in line for line in outputs)
+
+
+def test_view_comments_last_page_ends_without_prompt():
+    from app.reviews import view_comments_for_school
+
+    clear_comments()
+    base = datetime.now(timezone.utc)
+    for i in range(3):
+        add_comment_record(1, "SCH-4", f"c{i}", base + timedelta(minutes=i))
+
+    answers = iter(["SCH-4", ""])
+    success, shown = view_comments_for_school(input_func=lambda _: next(answers), print_func=lambda _: None, page_size=2)
+
+    assert success is True
+    assert [c["text"] for c in shown] == ["c2", "c1", "c0"]
+    assert next(answers, None) is None
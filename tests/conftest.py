@@ -2,6 +2,7 @@ import pytest
 
 from app import data_store
 from app import reviews
+from app import system_log
 
 
 @pytest.fixture(autouse=True)
@@ -28,3 +29,14 @@ def reset_globals():
     reviews.RATINGS.clear()
     reviews.COMMENTS.clear()
     reviews.FAVOURITES.clear()
+
+
+@pytest.fixture(autouse=True)
+def log_file(tmp_path, monkeypatch):
+    """
+    Sends the system log of each test to its tmp directory instead of the working tree.
+    """
+    path = tmp_path / "system.log"
+    monkeypatch.setattr(system_log, "LOG_FILE", str(path))
+    return path
+